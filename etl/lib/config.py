@@ -9,6 +9,8 @@ dotenv.load_dotenv()
 logger = get_logger(__name__)
 
 REDIS_KEY = os.environ.get('REDIS_STATE_KEY', 'etl_state')
+REDIS_INVALIDATION_CHANNEL = os.environ.get('REDIS_INVALIDATION_CHANNEL', 'cache_invalidation')
+EXISTENCE_FILTER_ERROR_RATE = float(os.environ.get('EXISTENCE_FILTER_ERROR_RATE', 0.01))
 CLEAN_ELASTIC_ON_START = os.environ.get('CLEAN_ELASTIC_ON_START', 'False').lower() == 'true'
 CLEAN_REDIS_ON_START = os.environ.get('CLEAN_REDIS_ON_START', 'False').lower() == 'true'
 
@@ -3,6 +3,8 @@ import logging
 from abc import ABC, abstractmethod
 
 from lib.models.etl import Pipeline
+from lib.providers.existence_filter import BaseExistenceFilter
+from lib.providers.notifier import BaseNotifier
 from lib.providers.state import BaseStateProvider
 
 
@@ -14,6 +16,9 @@ class Process(ABC):
         - Экстрактор, позволящий достававть данные из хранилища
         - Трансформер, преобразующий данные в пригодный вид для последующей загрузки
         - Загрузчик, склыдвающий в быстрое хранилище подготовленные данные
+        - Оповещатель, сообщающий потребителям об измененных документах
+        - Фильтр существования документов, по которому API отсекает неизвестные ID
+        - Материализованные списки документов (задаются в пайплайне)
     """
 
     @abstractmethod
@@ -28,18 +33,33 @@ class ETLProcess(Process):
             pipeline: Pipeline,
             state_provider: BaseStateProvider,
             logger: logging.Logger = None,
+            notifier: BaseNotifier = None,
+            existence_filter: BaseExistenceFilter = None,
     ):
         self.pipeline = pipeline
 
         self.extractor = pipeline.extractor
         self.transformer = pipeline.transformer
         self.loader = pipeline.loader
+        self.list_views = pipeline.list_views
+        self.list_views_ready = False
 
         self.state = state_provider
+        self.notifier = notifier
+        self.existence_filter = existence_filter
+        self.existence_filter_ready = False
         self.logger = logger
         self.__init_logger()
 
     async def run(self):
+        # Фильтр строится заново при первом запуске и при исчерпании его емкости
+        if self.existence_filter and not self.existence_filter_ready:
+            await self.__rebuild_existence_filter()
+        # Списки строятся заново при первом запуске: пока процесс не работал,
+        # документы могли измениться без обновления списков
+        if self.list_views and not self.list_views_ready:
+            await self.__rebuild_list_views()
+
         ids = set()
         for f in self.pipeline.filters:
             self.log(f"search by {f.state_key}")
@@ -78,6 +98,35 @@ class ETLProcess(Process):
                 result = self.loader.load(transformed_data)
                 self.log(result)
                 self.log(f"Loaded {len(chunk)} rows")
+                loaded_ids = [str(item.id) for item in transformed_data]
+
+                # Новые документы попадают в фильтр до оповещения,
+                # чтобы API не ответил на них 404 по устаревшему фильтру
+                if self.existence_filter and not await self.existence_filter.add(
+                    index=self.loader.index_name,
+                    ids=loaded_ids,
+                ):
+                    await self.__rebuild_existence_filter()
+                    # Только что загруженные документы поиск ES может еще
+                    # не видеть, поэтому они добавляются в новый фильтр явно
+                    await self.existence_filter.add(
+                        index=self.loader.index_name,
+                        ids=loaded_ids,
+                    )
+
+                # Списки обновляются до оповещения, чтобы сброшенный кэш
+                # API заполнился уже по новым спискам
+                if self.list_views:
+                    await self.list_views.update(
+                        [item.dict() for item in transformed_data]
+                    )
+
+                # Сообщаем об измененных документах, чтобы API сбросил их кэш
+                if self.notifier:
+                    await self.notifier.notify(
+                        index=self.loader.index_name,
+                        ids=loaded_ids,
+                    )
 
         self.log("=" * 50)
 
@@ -85,6 +134,18 @@ class ETLProcess(Process):
         """Обертка логирования для упрощенного доступа"""
         self.logger.log(level=level or logging.INFO, msg=msg)
 
+    async def __rebuild_existence_filter(self):
+        ids = self.loader.get_ids()
+        await self.existence_filter.rebuild(index=self.loader.index_name, ids=ids)
+        self.existence_filter_ready = True
+        self.log(f"Existence filter rebuilt for {len(ids)} documents")
+
+    async def __rebuild_list_views(self):
+        documents = self.loader.get_documents(self.list_views.source_fields)
+        await self.list_views.rebuild(documents)
+        self.list_views_ready = True
+        self.log(f"List views rebuilt for {len(documents)} documents")
+
     async def __get_state(self, state_key: str):
         value = await self.state.get(state_key)
         if value:
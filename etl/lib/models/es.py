@@ -44,3 +44,6 @@ class ESFilmWorkRecord(ESBaseModel):
     directors: List[ESFilmWorkPerson] = None
     actors: List[ESFilmWorkPerson] = None
     writers: List[ESFilmWorkPerson] = None
+    # Плоские списки идентификаторов для фильтрации без nested-запросов
+    genre_ids: List[UUID4] = None
+    person_ids: List[UUID4] = None
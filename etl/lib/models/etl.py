@@ -1,9 +1,10 @@
-from typing import List, Type
+from typing import List, Optional, Type
 
 from pydantic import BaseModel
 
 from lib.models.db import PGBaseModel
 from lib.providers.extractor import DBExtractor
+from lib.providers.list_views import BaseListViews
 from lib.providers.loader import Loader
 from lib.providers.transformers import DataTransformer
 
@@ -36,5 +37,8 @@ class Pipeline(BaseModel):
     # Основной запрос для выборки нужных полей по ID сущности
     collect_query: str
 
+    # Списки в Redis, которые API отдает без запросов к ES
+    list_views: Optional[BaseListViews] = None
+
     class Config:
         arbitrary_types_allowed = True
@@ -0,0 +1,117 @@
+import hashlib
+import math
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator
+
+import aioredis
+
+from lib.config import EXISTENCE_FILTER_ERROR_RATE, REDIS_CONN
+
+# Запас емкости фильтра под документы, добавленные после его построения
+CAPACITY_FACTOR = 2
+MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """
+    Вероятностное множество строк: может ошибочно сообщить, что строка
+    в нем есть, но никогда не ошибается в обратную сторону.
+    Формат должен совпадать с фильтром, который читает API
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+
+    def positions(self, item: str) -> Iterator[int]:
+        # Двойное хэширование: k позиций из двух половин одного дайджеста
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> bool:
+        """
+        Добавляет строку в множество.
+        :return: False, если все ее биты уже были установлены. Такая строка
+            (обычно повторно загруженный документ) не расходует емкость фильтра
+        """
+        added = False
+        for position in self.positions(item):
+            # Порядок бит в байте как у SETBIT в Redis: от старшего к младшему
+            mask = 0x80 >> (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+
+class BaseExistenceFilter(ABC):
+    @abstractmethod
+    def rebuild(self, index: str, ids: Iterable[str]):
+        """Building filter from all documents of the index"""
+        ...
+
+    @abstractmethod
+    def add(self, index: str, ids: Iterable[str]) -> bool:
+        """Adding loaded documents to filter. False if filter must be rebuilt"""
+        ...
+
+
+class RedisExistenceFilter(BaseExistenceFilter):
+    """
+    Фильтры Блума с идентификаторами всех документов индексов.
+    API по ним отвечает 404 на неизвестные идентификаторы без запроса к ES.
+    Биты хранятся в ключе "bloom:<индекс>", параметры - в "bloom:<индекс>:params"
+    """
+
+    async def rebuild(self, index: str, ids: Iterable[str]):
+        ids = list(ids)
+        bloom_filter = BloomFilter(
+            capacity=max(len(ids) * CAPACITY_FACTOR, MIN_CAPACITY),
+            error_rate=EXISTENCE_FILTER_ERROR_RATE,
+        )
+        for id_ in ids:
+            bloom_filter.add(id_)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._bits_key(index), bytes(bloom_filter.bits))
+            pipe.hset(
+                self._params_key(index),
+                mapping={"size": bloom_filter.size, "hashes": bloom_filter.hashes},
+            )
+            await pipe.execute()
+        self.filters[index] = bloom_filter
+
+    async def add(self, index: str, ids: Iterable[str]) -> bool:
+        bloom_filter = self.filters.get(index)
+        if bloom_filter is None or bloom_filter.count >= bloom_filter.capacity:
+            return False
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for id_ in ids:
+                # Биты уже загруженных документов в Redis уже установлены
+                if not bloom_filter.add(id_):
+                    continue
+                for position in bloom_filter.positions(id_):
+                    pipe.setbit(self._bits_key(index), position, 1)
+            await pipe.execute()
+        return True
+
+    @staticmethod
+    def _bits_key(index: str) -> str:
+        return f"bloom:{index}"
+
+    @staticmethod
+    def _params_key(index: str) -> str:
+        return f"bloom:{index}:params"
+
+    def __init__(self):
+        self.redis = aioredis.from_url(f"redis://{REDIS_CONN['host']}:{REDIS_CONN['port']}")
+        self.filters: Dict[str, BloomFilter] = {}
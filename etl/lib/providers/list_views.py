@@ -0,0 +1,95 @@
+import json
+import math
+import struct
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Tuple
+
+import aioredis
+
+from lib.config import REDIS_CONN
+
+# Ключи должны совпадать с теми, которые читает API (src/services/list_views.py)
+RATING_VIEW_KEY = "films:rating"
+GENRE_VIEW_KEY_PREFIX = "films:rating:genre:"
+VIEW_GENRES_KEY = "films:rating:genres"
+VIEW_READY_KEY = "films:rating:ready"
+
+
+class BaseListViews(ABC):
+    # Поля документа, нужные для построения списков
+    source_fields: List[str] = []
+
+    @abstractmethod
+    def rebuild(self, documents: Iterable[dict]):
+        """Building lists from all documents of the index"""
+        ...
+
+    @abstractmethod
+    def update(self, documents: Iterable[dict]):
+        """Updating lists with loaded documents"""
+        ...
+
+
+class RedisFilmRatingViews(BaseListViews):
+    """
+    Идентификаторы фильмов в сортированных множествах Redis с рейтингом
+    в качестве оценки: "films:rating" - все фильмы, "films:rating:genre:<id>" -
+    фильмы жанра. API отдает из них списки фильмов по убыванию рейтинга
+    без запроса к ES. Фильмы с одинаковым рейтингом Redis упорядочивает
+    по идентификатору, как и сортировка в ES. Рейтинг приводится к float,
+    в котором его хранит ES, чтобы оценки совпадали со значениями сортировки
+    в курсорах страниц. Фильмы без рейтинга получают оценку -inf
+    и оказываются в конце, как и в ES.
+    Жанры каждого фильма хранятся в "films:rating:genres", чтобы убрать фильм
+    из множеств жанров, к которым он больше не относится
+    """
+
+    source_fields = ["imdb_rating", "genre_ids"]
+
+    async def rebuild(self, documents: Iterable[dict]):
+        films = [self._parse(doc) for doc in documents]
+        genre_keys = [
+            key async for key in self.redis.scan_iter(match=f"{GENRE_VIEW_KEY_PREFIX}*")
+        ]
+        # Транзакция: API не увидит списки частично построенными
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(RATING_VIEW_KEY, VIEW_GENRES_KEY, *genre_keys)
+            for id_, score, genre_ids in films:
+                self._add(pipe, id_, score, genre_ids)
+            pipe.set(VIEW_READY_KEY, 1)
+            await pipe.execute()
+
+    async def update(self, documents: Iterable[dict]):
+        films = [self._parse(doc) for doc in documents]
+        if not films:
+            return
+        previous = await self.redis.hmget(VIEW_GENRES_KEY, [id_ for id_, _, _ in films])
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for (id_, score, genre_ids), old_genre_ids in zip(films, previous):
+                old_genre_ids = set(json.loads(old_genre_ids)) if old_genre_ids else set()
+                for genre_id in old_genre_ids - set(genre_ids):
+                    pipe.zrem(self._genre_key(genre_id), id_)
+                self._add(pipe, id_, score, genre_ids)
+            await pipe.execute()
+
+    def _add(self, pipe, id_: str, score: float, genre_ids: List[str]):
+        pipe.zadd(RATING_VIEW_KEY, {id_: score})
+        for genre_id in genre_ids:
+            pipe.zadd(self._genre_key(genre_id), {id_: score})
+        pipe.hset(VIEW_GENRES_KEY, id_, json.dumps(genre_ids))
+
+    @staticmethod
+    def _parse(doc: dict) -> Tuple[str, float, List[str]]:
+        rating: Optional[float] = doc.get("imdb_rating")
+        score = -math.inf
+        if rating is not None:
+            score = struct.unpack("f", struct.pack("f", rating))[0]
+        genre_ids = [str(genre_id) for genre_id in doc.get("genre_ids") or []]
+        return str(doc["id"]), score, genre_ids
+
+    @staticmethod
+    def _genre_key(genre_id: str) -> str:
+        return f"{GENRE_VIEW_KEY_PREFIX}{genre_id}"
+
+    def __init__(self):
+        self.redis = aioredis.from_url(f"redis://{REDIS_CONN['host']}:{REDIS_CONN['port']}")
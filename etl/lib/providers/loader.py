@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 
-from elasticsearch import Elasticsearch, helpers
+from elasticsearch import Elasticsearch, RequestError, helpers
 
 from lib.config import CLEAN_ELASTIC_ON_START, ES_HOST, logger
 from lib.models.es import ESBaseModel
@@ -13,6 +13,14 @@ class Loader(ABC):
     def load(self, transformed_data: List[ESBaseModel]):
         ...
 
+    @abstractmethod
+    def get_ids(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def get_documents(self, fields: List[str]) -> List[dict]:
+        ...
+
 
 class ElasticsearchLoader(Loader):
     def __init__(self, index: str, index_schema: dict):
@@ -39,6 +47,26 @@ class ElasticsearchLoader(Loader):
 
         return helpers.bulk(self.es, actions, stats_only=True)
 
+    @backoff(logger=logger)
+    def get_ids(self) -> List[str]:
+        """Идентификаторы всех документов индекса"""
+        hits = helpers.scan(
+            self.es,
+            index=self.index_name,
+            query={"_source": False},
+        )
+        return [hit["_id"] for hit in hits]
+
+    @backoff(logger=logger)
+    def get_documents(self, fields: List[str]) -> List[dict]:
+        """Все документы индекса с идентификатором и полями fields"""
+        hits = helpers.scan(
+            self.es,
+            index=self.index_name,
+            query={"_source": fields},
+        )
+        return [{**hit["_source"], "id": hit["_id"]} for hit in hits]
+
     @backoff(logger=logger)
     def __init_index(self):
         if CLEAN_ELASTIC_ON_START:
@@ -48,4 +76,35 @@ class ElasticsearchLoader(Loader):
             self.es.indices.create(index=self.index_name, body=self.index_schema)
             logger.info(f"Index {self.index_name} created")
         else:
-            logger.info(f"Index {self.index_name} already exists")
+            # Новые поля схемы добавляются в существующий индекс, иначе
+            # документы с ними не пройдут проверку "dynamic": "strict".
+            # Уже загруженные документы получат поля при следующей загрузке
+            try:
+                self.es.indices.put_mapping(
+                    index=self.index_name,
+                    body=self.index_schema["mappings"],
+                )
+            except RequestError as error:
+                # Тип существующего поля (например, nested -> object)
+                # меняется только пересозданием индекса
+                logger.warning(
+                    f"Index {self.index_name} mapping is not updated: "
+                    f"{error.info}. Recreate the index to apply it"
+                )
+            else:
+                logger.info(f"Index {self.index_name} already exists, mapping updated")
+            self.__check_index_sort()
+
+    def __check_index_sort(self):
+        # Сортировка индекса задается только при его создании
+        expected = self.index_schema.get("settings", {}).get("sort.field")
+        settings = self.es.indices.get_settings(index=self.index_name)
+        index_settings = settings[self.index_name]["settings"]["index"]
+        actual = index_settings.get("sort", {}).get("field")
+        if isinstance(actual, str):
+            actual = [actual]
+        if expected != actual:
+            logger.warning(
+                f"Index {self.index_name} is sorted by {actual}, schema "
+                f"expects {expected}. Recreate the index to apply it"
+            )
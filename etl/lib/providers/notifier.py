@@ -0,0 +1,29 @@
+import json
+from abc import ABC, abstractmethod
+from typing import List
+
+import aioredis
+
+from lib.config import REDIS_CONN
+
+
+class BaseNotifier(ABC):
+    @abstractmethod
+    def notify(self, index: str, ids: List[str]):
+        """Notifying consumers that documents of the index were changed"""
+        ...
+
+
+class RedisNotifier(BaseNotifier):
+    """
+    Публикует идентификаторы загруженных документов в канал Redis.
+    API по этим сообщениям сбрасывает закэшированные ответы
+    """
+
+    async def notify(self, index: str, ids: List[str]):
+        message = json.dumps({"index": index, "ids": ids})
+        return await self.redis.publish(self.channel, message)
+
+    def __init__(self, channel: str):
+        self.channel: str = channel
+        self.redis = aioredis.from_url(f"redis://{REDIS_CONN['host']}:{REDIS_CONN['port']}")
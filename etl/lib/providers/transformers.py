@@ -33,6 +33,8 @@ class FilmworkTransformer(DataTransformer):
                             p.person_role == FilmWorkPersonRole.actor]
         es_record.writers = [{'id': p.person_id, 'name': p.person_name} for p in src.persons if
                              p.person_role == FilmWorkPersonRole.writer]
+        es_record.genre_ids = [genre.id for genre in src.genres]
+        es_record.person_ids = list(dict.fromkeys(p.person_id for p in src.persons))
 
         return es_record
 
@@ -2,7 +2,8 @@ import asyncio
 import time
 from typing import List
 
-from lib.config import COLLECT_WAIT_TIME, PG_CONN, REDIS_KEY
+from lib.config import (COLLECT_WAIT_TIME, PG_CONN, REDIS_INVALIDATION_CHANNEL,
+                        REDIS_KEY)
 from lib.db.queries import (filmwork_collect_query,
                             filmwork_filter_by_filmwork_dt,
                             filmwork_filter_by_genre_dt,
@@ -12,8 +13,11 @@ from lib.db.queries import (filmwork_collect_query,
 from lib.etl_process import ETLProcess, Process
 from lib.models.db import FilmWorkGenre, FilmWorkPerson, FilmWorkRecord
 from lib.models.etl import FilterData, Pipeline
+from lib.providers.existence_filter import RedisExistenceFilter
 from lib.providers.extractor import PostgresExtractor
+from lib.providers.list_views import RedisFilmRatingViews
 from lib.providers.loader import ElasticsearchLoader
+from lib.providers.notifier import RedisNotifier
 from lib.providers.state import RedisStateProvider
 from lib.providers.transformers import (FilmworkTransformer, GenreTransformer,
                                         PersonTransformer)
@@ -24,6 +28,8 @@ async def main():
     pg_conn = PostgresExtractor(PG_CONN)
     state_provider = RedisStateProvider(REDIS_KEY)
     await state_provider.load()
+    notifier = RedisNotifier(REDIS_INVALIDATION_CHANNEL)
+    existence_filter = RedisExistenceFilter()
 
     pipelines = [
         Pipeline(
@@ -53,6 +59,7 @@ async def main():
             ],
             model=FilmWorkRecord,
             collect_query=filmwork_collect_query,
+            list_views=RedisFilmRatingViews(),
         ),
         Pipeline(
             name="persons_pipeline",
@@ -98,6 +105,8 @@ async def main():
             pipeline=pipeline,
             state_provider=state_provider,
             logger=get_logger(pipeline.name),
+            notifier=notifier,
+            existence_filter=existence_filter,
         )
         processes.append(process)
 
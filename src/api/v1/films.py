@@ -1,13 +1,39 @@
 from enum import Enum
 from http import HTTPStatus
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import UUID4
 
-from models.api_models import APIFilmFull, APIFilmShort, APIPaginator, get_paginator
+from models.api_models import (
+    APIFilmFull,
+    APIFilmFacets,
+    APIFilmFilter,
+    APIFilmShort,
+    APIGenreFacet,
+    APIPaginator,
+    APIRatingFacet,
+    FILMS_CURSOR_SIZE,
+    GenreMatch,
+    SUGGEST_MAX_SIZE,
+    get_batch_ids,
+    get_cursor_paginator,
+    get_es_fields,
+    get_fields,
+    get_film_filter,
+    get_paginator,
+    set_next_cursor,
+)
+from models.api_wire import film_full_wire, film_short_wire, wire_response
+from services.cache import NOT_FOUND_CACHE_EXPIRE_IN_SECONDS, cache_policy
 from services.films import APIFilmServiceFactory
-from services.films import FilmService
+from services.films import (
+    FilmService,
+    FILM_FACETS_CACHE_EXPIRE_IN_SECONDS,
+    FILM_SEARCH_CACHE_EXPIRE_IN_SECONDS,
+    FILM_SUGGEST_CACHE_EXPIRE_IN_SECONDS,
+)
+from services.genres import APIGenreServiceFactory, GenreService
 from utilites.messages import API_FILM_NOT_FOUND
 
 
@@ -24,96 +50,127 @@ router = APIRouter()
 # с опциональной фильтрацией и пагинацией
 @router.get("/")
 async def films_sorted(
+        response: Response,
         sort: SortField = SortField.rating_desc,
-        filter_field: UUID4 = Query(default=None, alias="filter[genre]"),
-        paginator: APIPaginator = Depends(get_paginator),
+        film_filter: APIFilmFilter = Depends(get_film_filter),
+        paginator: APIPaginator = Depends(get_cursor_paginator(FILMS_CURSOR_SIZE)),
+        fields: Optional[List[str]] = Depends(get_fields(APIFilmShort)),
         film_service: FilmService = Depends(APIFilmServiceFactory.get_service),
 ) -> List[APIFilmShort]:
-    films = await film_service.get_all(
+    page = await film_service.get_all(
         sort_field=sort,
-        filter_field=filter_field,
+        genre_ids=film_filter.genre_ids,
+        genre_match_all=film_filter.genre_match == GenreMatch.all,
+        person_ids=film_filter.person_ids,
+        rating_gte=film_filter.rating_gte,
+        rating_lte=film_filter.rating_lte,
         page_size=paginator.page_size,
         page_number=paginator.page_number,
+        model=film_short_wire,
+        search_after=paginator.search_after,
+        fields=get_es_fields(APIFilmShort, fields),
     )
-    return_data = [
-        APIFilmShort(
-            uuid=film.id,
-            title=film.title,
-            imdb_rating=film.imdb_rating,
-        )
-        for film in films
-    ]
+    set_next_cursor(response, page.search_after)
+    return wire_response(page.items, fields, response)
 
-    return return_data
+
+# Метод для обработки запроса числа фильмов по жанрам и рейтингу
+# с теми же фильтрами, что и у списка фильмов
+@router.get("/facets", response_model=APIFilmFacets)
+@cache_policy(expire=FILM_FACETS_CACHE_EXPIRE_IN_SECONDS)
+async def films_facets(
+        film_filter: APIFilmFilter = Depends(get_film_filter),
+        film_service: FilmService = Depends(APIFilmServiceFactory.get_service),
+        genre_service: GenreService = Depends(APIGenreServiceFactory.get_service),
+) -> APIFilmFacets:
+    facets = await film_service.get_facets(
+        genre_service=genre_service,
+        genre_ids=film_filter.genre_ids,
+        genre_match_all=film_filter.genre_match == GenreMatch.all,
+        person_ids=film_filter.person_ids,
+        rating_gte=film_filter.rating_gte,
+        rating_lte=film_filter.rating_lte,
+    )
+    return APIFilmFacets(
+        total=facets.total,
+        genres=[
+            APIGenreFacet(uuid=genre.id, name=genre.name, count=genre.count)
+            for genre in facets.genres
+        ],
+        imdb_rating=[
+            APIRatingFacet(gte=bucket.gte, lt=bucket.lt, count=bucket.count)
+            for bucket in facets.imdb_rating
+        ],
+    )
 
 
 # Метод для обработки запроса на поиск по фильмам
 @router.get("/search")
+@cache_policy(expire=FILM_SEARCH_CACHE_EXPIRE_IN_SECONDS)
 async def films_search(
         query: str,
         paginator: APIPaginator = Depends(get_paginator),
+        fields: Optional[List[str]] = Depends(get_fields(APIFilmShort)),
         film_service: FilmService = Depends(APIFilmServiceFactory.get_service),
 ) -> List[APIFilmShort]:
     films = await film_service.search(
         search_string=query,
         page_size=paginator.page_size,
         page_number=paginator.page_number,
+        model=film_short_wire,
+        fields=get_es_fields(APIFilmShort, fields),
     )
-    return [
-        APIFilmShort(
-            uuid=film.id,
-            title=film.title,
-            imdb_rating=film.imdb_rating,
-        )
-        for film in films
-    ]
+    return wire_response(films, fields)
+
+
+# Метод для обработки запроса подсказок при вводе названия фильма
+@router.get("/suggest", response_model=List[APIFilmShort])
+@cache_policy(expire=FILM_SUGGEST_CACHE_EXPIRE_IN_SECONDS)
+async def films_suggest(
+        query: str = Query(..., min_length=1),
+        size: int = Query(default=10, ge=1, le=SUGGEST_MAX_SIZE),
+        film_service: FilmService = Depends(APIFilmServiceFactory.get_service),
+) -> List[APIFilmShort]:
+    films = await film_service.suggest(
+        prefix=query,
+        size=size,
+        model=film_short_wire,
+    )
+    return wire_response(films)
+
+
+# Метод для обработки запроса нескольких фильмов по списку идентификаторов.
+# Регистрируется раньше film_details, иначе путь совпадет с /{film_id}
+@router.get("/batch", response_model=List[Optional[APIFilmFull]])
+async def films_batch(
+        film_ids: List[UUID4] = Depends(get_batch_ids),
+        fields: Optional[List[str]] = Depends(get_fields(APIFilmFull)),
+        film_service: FilmService = Depends(APIFilmServiceFactory.get_service),
+) -> List[Optional[APIFilmFull]]:
+    films = await film_service.get_by_ids(
+        film_ids,
+        model=film_full_wire,
+        fields=get_es_fields(APIFilmFull, fields),
+    )
+    return wire_response(films, fields)
 
 
 # С помощью декоратора регистрируем обработчик film_details
 @router.get("/{film_id}", response_model=APIFilmFull)
+@cache_policy(not_found_expire=NOT_FOUND_CACHE_EXPIRE_IN_SECONDS)
 async def film_details(
         film_id: UUID4,
+        fields: Optional[List[str]] = Depends(get_fields(APIFilmFull)),
         film_service: FilmService = Depends(APIFilmServiceFactory.get_service),
 ) -> APIFilmFull:
-    film = await film_service.get_by_id(film_id)
+    film = await film_service.get_by_id(
+        film_id,
+        model=film_full_wire,
+        fields=get_es_fields(APIFilmFull, fields),
+    )
     if not film:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=API_FILM_NOT_FOUND.format(uuid=film_id),
         )
-
-    response = APIFilmFull(
-        uuid=film.id,
-        title=film.title,
-        imdb_rating=film.imdb_rating,
-        description=film.description,
-        genre=[
-            {
-                'uuid': genre.id,
-                'name': genre.name
-            }
-            for genre in film.genre],
-        actors=[
-            {
-                "uuid": actor.id,
-                "full_name": actor.name,
-            }
-            for actor in film.actors
-        ],
-        writers=[
-            {
-                "uuid": writer.id,
-                "full_name": writer.name,
-            }
-            for writer in film.writers
-        ],
-        directors=[
-            {
-                "uuid": director.id,
-                "full_name": director.name,
-            }
-            for director in film.directors
-        ],
-    )
-
-    return response
+    return wire_response(film, fields)
@@ -1,49 +1,85 @@
 from http import HTTPStatus
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import UUID4
 
-from models.api_models import APIGenre, APIPaginator, get_paginator
-from services.genres import APIGenreServiceFactory, GenreService
+from models.api_models import (
+    APIGenre,
+    APIPaginator,
+    ID_CURSOR_SIZE,
+    get_batch_ids,
+    get_cursor_paginator,
+    get_es_fields,
+    get_fields,
+    set_next_cursor,
+)
+from models.api_wire import genre_wire, wire_response
+from services.cache import NOT_FOUND_CACHE_EXPIRE_IN_SECONDS, cache_policy
+from services.genres import (
+    APIGenreServiceFactory,
+    GenreService,
+    GENRE_CACHE_EXPIRE_IN_SECONDS,
+)
 from utilites.messages import API_GENRE_NOT_FOUND
 
 router = APIRouter()
 
 
 @router.get("/")
+@cache_policy(expire=GENRE_CACHE_EXPIRE_IN_SECONDS)
 async def genres_all(
-        paginator: APIPaginator = Depends(get_paginator),
+        response: Response,
+        paginator: APIPaginator = Depends(get_cursor_paginator(ID_CURSOR_SIZE)),
+        fields: Optional[List[str]] = Depends(get_fields(APIGenre)),
         genre_service: GenreService = Depends(APIGenreServiceFactory.get_service),
 ) -> List[APIGenre]:
-    genres = await genre_service.get_all(
+    page = await genre_service.get_all(
         page_size=paginator.page_size,
         page_number=paginator.page_number,
+        model=genre_wire,
+        search_after=paginator.search_after,
+        fields=get_es_fields(APIGenre, fields),
     )
-    return_data = [
-        APIGenre(
-            uuid=genre.id,
-            name=genre.name,
-        )
-        for genre in genres
-    ]
+    set_next_cursor(response, page.search_after)
+    return wire_response(page.items, fields, response)
+
 
-    return return_data
+# Регистрируется раньше genre_by_id, иначе путь совпадет с /{genre_id}
+@router.get("/batch", response_model=List[Optional[APIGenre]])
+@cache_policy(expire=GENRE_CACHE_EXPIRE_IN_SECONDS)
+async def genres_batch(
+        genre_ids: List[UUID4] = Depends(get_batch_ids),
+        fields: Optional[List[str]] = Depends(get_fields(APIGenre)),
+        genre_service: GenreService = Depends(APIGenreServiceFactory.get_service),
+) -> List[Optional[APIGenre]]:
+    genres = await genre_service.get_by_ids(
+        genre_ids,
+        model=genre_wire,
+        fields=get_es_fields(APIGenre, fields),
+    )
+    return wire_response(genres, fields)
 
 
 @router.get("/{genre_id}")
+@cache_policy(
+    expire=GENRE_CACHE_EXPIRE_IN_SECONDS,
+    not_found_expire=NOT_FOUND_CACHE_EXPIRE_IN_SECONDS,
+)
 async def genre_by_id(
         genre_id: UUID4,
+        fields: Optional[List[str]] = Depends(get_fields(APIGenre)),
         genre_service: GenreService = Depends(APIGenreServiceFactory.get_service),
 ) -> APIGenre:
-    genre = await genre_service.get_by_id(genre_id)
+    genre = await genre_service.get_by_id(
+        genre_id,
+        model=genre_wire,
+        fields=get_es_fields(APIGenre, fields),
+    )
     if not genre:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=API_GENRE_NOT_FOUND.format(uuid=genre_id),
         )
 
-    return APIGenre(
-        uuid=genre.id,
-        name=genre.name,
-    )
+    return wire_response(genre, fields)
@@ -1,20 +1,39 @@
 from http import HTTPStatus
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import UUID4
 
 from api.v1.films import SortField
 from models.api_models import (
     APIFilmShort,
-    APIPersonFilmworks,
     APIPersonFull,
     APIPersonShort,
     APIPaginator,
+    FILMS_CURSOR_SIZE,
+    ID_CURSOR_SIZE,
+    SUGGEST_MAX_SIZE,
+    get_batch_ids,
+    get_cursor_paginator,
+    get_es_fields,
+    get_fields,
     get_paginator,
+    set_next_cursor,
 )
+from models.api_wire import (
+    film_short_wire,
+    person_full_wire,
+    person_short_wire,
+    wire_response,
+)
+from services.cache import NOT_FOUND_CACHE_EXPIRE_IN_SECONDS, cache_policy
 from services.films import APIFilmServiceFactory, FilmService
-from services.persons import APIPersonServiceFactory, PersonService
+from services.persons import (
+    APIPersonServiceFactory,
+    PersonService,
+    PERSON_SEARCH_CACHE_EXPIRE_IN_SECONDS,
+    PERSON_SUGGEST_CACHE_EXPIRE_IN_SECONDS,
+)
 from utilites.messages import API_PERSON_NOT_FOUND
 
 router = APIRouter()
@@ -23,97 +42,115 @@ router = APIRouter()
 # Метод для обработки запроса на список всех фильмов
 @router.get("/")
 async def persons_all(
-        paginator: APIPaginator = Depends(get_paginator),
+        response: Response,
+        paginator: APIPaginator = Depends(get_cursor_paginator(ID_CURSOR_SIZE)),
+        fields: Optional[List[str]] = Depends(get_fields(APIPersonShort)),
         person_service: PersonService = Depends(APIPersonServiceFactory.get_service),
 ) -> List[APIPersonShort]:
-    persons = await person_service.get_all(
+    page = await person_service.get_all(
         page_size=paginator.page_size,
         page_number=paginator.page_number,
+        model=person_short_wire,
+        search_after=paginator.search_after,
+        fields=get_es_fields(APIPersonShort, fields),
     )
-    return_data = [
-        APIPersonShort(
-            uuid=person.id,
-            full_name=person.name,
-        )
-        for person in persons
-    ]
-    return return_data
+    set_next_cursor(response, page.search_after)
+    return wire_response(page.items, fields, response)
 
 
 # Метод для обработки запросов на поиск по персонам
 @router.get("/search")
+@cache_policy(expire=PERSON_SEARCH_CACHE_EXPIRE_IN_SECONDS)
 async def persons_search(
         query: str,
         paginator: APIPaginator = Depends(get_paginator),
+        fields: Optional[List[str]] = Depends(get_fields(APIPersonFull)),
         person_service: PersonService = Depends(APIPersonServiceFactory.get_service),
 ) -> List[APIPersonFull]:
     persons = await person_service.search(
         search_string=query,
         page_size=paginator.page_size,
         page_number=paginator.page_number,
+        model=person_full_wire,
+        fields=get_es_fields(APIPersonFull, fields),
     )
-    return [
-        APIPersonFull(
-            uuid=person.id,
-            full_name=person.name,
-            film_ids=[
-                APIPersonFilmworks(
-                    role=role_fw.role,
-                    filmworks=[fw.id for fw in role_fw.filmworks],
-                )
-                for role_fw in person.filmworks
-            ],
-        )
-        for person in persons
-    ]
+    return wire_response(persons, fields)
+
+
+# Метод для обработки запроса подсказок при вводе имени персоны
+@router.get("/suggest", response_model=List[APIPersonShort])
+@cache_policy(expire=PERSON_SUGGEST_CACHE_EXPIRE_IN_SECONDS)
+async def persons_suggest(
+        query: str = Query(..., min_length=1),
+        size: int = Query(default=10, ge=1, le=SUGGEST_MAX_SIZE),
+        person_service: PersonService = Depends(APIPersonServiceFactory.get_service),
+) -> List[APIPersonShort]:
+    persons = await person_service.suggest(
+        prefix=query,
+        size=size,
+        model=person_short_wire,
+    )
+    return wire_response(persons)
+
+
+# Метод для обработки запроса нескольких персон по списку идентификаторов.
+# Регистрируется раньше person_details, иначе путь совпадет с /{person_id}
+@router.get("/batch", response_model=List[Optional[APIPersonFull]])
+async def persons_batch(
+        person_ids: List[UUID4] = Depends(get_batch_ids),
+        fields: Optional[List[str]] = Depends(get_fields(APIPersonFull)),
+        person_service: PersonService = Depends(APIPersonServiceFactory.get_service),
+) -> List[Optional[APIPersonFull]]:
+    persons = await person_service.get_by_ids(
+        person_ids,
+        model=person_full_wire,
+        fields=get_es_fields(APIPersonFull, fields),
+    )
+    return wire_response(persons, fields)
 
 
 # Метод для обработки запроса данных персоны по идентификатору
 @router.get("/{person_id}", response_model=APIPersonFull)
+@cache_policy(not_found_expire=NOT_FOUND_CACHE_EXPIRE_IN_SECONDS)
 async def person_details(
         person_id: UUID4,
+        fields: Optional[List[str]] = Depends(get_fields(APIPersonFull)),
         person_service: PersonService = Depends(APIPersonServiceFactory.get_service),
 ) -> APIPersonFull:
-    person = await person_service.get_by_id(person_id)
+    person = await person_service.get_by_id(
+        person_id,
+        model=person_full_wire,
+        fields=get_es_fields(APIPersonFull, fields),
+    )
     if not person:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=API_PERSON_NOT_FOUND.format(uuid=person_id),
         )
-    return APIPersonFull(
-        uuid=person.id,
-        full_name=person.name,
-        film_ids=[
-            APIPersonFilmworks(
-                role=role_fw.role,
-                filmworks=[fw.id for fw in role_fw.filmworks],
-            )
-            for role_fw in person.filmworks
-        ],
-    )
+    return wire_response(person, fields)
 
 
 # Метод для обработки запроса всех фильмов по персоне
 @router.get("/{person_id}/films")
 async def films_by_person(
+        response: Response,
         person_id: UUID4,
         sort: SortField = SortField.rating_desc,
         person_service: PersonService = Depends(APIPersonServiceFactory.get_service),
         film_service: FilmService = Depends(APIFilmServiceFactory.get_service),
-        paginator: APIPaginator = Depends(get_paginator),
+        paginator: APIPaginator = Depends(get_cursor_paginator(FILMS_CURSOR_SIZE)),
+        fields: Optional[List[str]] = Depends(get_fields(APIFilmShort)),
 ) -> List[APIFilmShort]:
-    films = await person_service.get_list(
+    page = await person_service.get_list(
         sort_field=sort,
         object_id=person_id,
         film_service=film_service,
         page_size=paginator.page_size,
-        page_number=paginator.page_number
+        page_number=paginator.page_number,
+        film_model=film_short_wire,
+        search_after=paginator.search_after,
+        fields=get_es_fields(APIFilmShort, fields),
     )
-    return [
-        APIFilmShort(
-            uuid=film.id,
-            title=film.title,
-            imdb_rating=film.imdb_rating,
-        )
-        for film in films
-    ]
+    set_next_cursor(response, page.search_after)
+    return wire_response(page.items, fields, response)
+
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+
+from models.api_models import APIPaginator, APISearchResult, get_paginator
+from models.api_wire import (
+    film_short_wire,
+    genre_wire,
+    person_full_wire,
+    wire_response,
+)
+from services.cache import cache_policy
+from services.search import (
+    APISearchServiceFactory,
+    SearchService,
+    SEARCH_CACHE_EXPIRE_IN_SECONDS,
+)
+
+router = APIRouter()
+
+
+# Метод для обработки запроса на поиск сразу по фильмам, персонам и жанрам.
+# Страница с номером page[number] и размером page[size] отдается по каждой группе
+@router.get("/", response_model=APISearchResult)
+@cache_policy(expire=SEARCH_CACHE_EXPIRE_IN_SECONDS)
+async def search_all(
+        query: str,
+        paginator: APIPaginator = Depends(get_paginator),
+        search_service: SearchService = Depends(APISearchServiceFactory.get_service),
+) -> APISearchResult:
+    found = await search_service.search(
+        search_string=query,
+        page_size=paginator.page_size,
+        page_number=paginator.page_number,
+        film_model=film_short_wire,
+        person_model=person_full_wire,
+        genre_model=genre_wire,
+    )
+    return wire_response(found)
@@ -1,5 +1,6 @@
 from logging import config as logging_config
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseSettings, DirectoryPath, Field
 
@@ -27,6 +28,62 @@ class AppSettings(BaseSettings):
     ELASTIC_INDEX_PERSON: str = Field(
         default="persons", env="ELASTIC_INDEX_PERSON")
 
+    # Сколько секунд ответ API считается свежим. Ответы сбрасываются
+    # по сообщениям ETL об изменении сущностей, поэтому срок может быть большим
+    CACHE_EXPIRE_IN_SECONDS: int = Field(default=60, env="CACHE_EXPIRE_IN_SECONDS")
+    # Ответы большего размера (в байтах) в кэш не сохраняются
+    CACHE_MAX_BODY_SIZE: int = Field(
+        default=5 * 1024 * 1024, env="CACHE_MAX_BODY_SIZE")
+    # Канал Redis, в который ETL публикует идентификаторы измененных сущностей
+    CACHE_INVALIDATION_CHANNEL: str = Field(
+        default="cache_invalidation", env="REDIS_INVALIDATION_CHANNEL")
+    # Алгоритм сжатия ответов в кэше: gzip, zstd или пустая строка - без сжатия.
+    # Сжатый ответ отдается клиенту как есть, если тот принимает такое сжатие.
+    # Другие значения не проходят валидацию, и сервис не запускается
+    CACHE_COMPRESSION: Literal["", "gzip", "zstd"] = Field(
+        default="gzip", env="CACHE_COMPRESSION")
+    # Ответы меньшего размера (в байтах) хранятся без сжатия
+    CACHE_COMPRESSION_MIN_SIZE: int = Field(
+        default=1024, env="CACHE_COMPRESSION_MIN_SIZE")
+
+    # Параметры кэша ответов в памяти воркера (L1)
+    CACHE_L1_MAX_SIZE: int = Field(default=1024, env="CACHE_L1_MAX_SIZE")
+    CACHE_L1_EXPIRE_IN_SECONDS: float = Field(
+        default=1.0, env="CACHE_L1_EXPIRE_IN_SECONDS")
+    # Время жизни блокировки в Redis, объединяющей промахи кэша между воркерами.
+    # 0 - объединять запросы только внутри одного воркера
+    CACHE_LOCK_TIMEOUT_IN_SECONDS: float = Field(
+        default=0, env="CACHE_LOCK_TIMEOUT_IN_SECONDS")
+    # Сколько секунд после окончания срока свежести ответ еще отдается из кэша,
+    # пока в фоне формируется новый
+    CACHE_STALE_IN_SECONDS: float = Field(default=30, env="CACHE_STALE_IN_SECONDS")
+    # Коэффициент вероятностного досрочного обновления записей (XFetch).
+    # Чем больше, тем раньше обновляются записи. 0 - без досрочного обновления
+    CACHE_EARLY_REFRESH_BETA: float = Field(
+        default=1.0, env="CACHE_EARLY_REFRESH_BETA")
+
+    # Сколько секунд документ хранится в кэше сущностей. Документ сбрасывается
+    # по сообщению ETL об его изменении, срок ограничивает только объем кэша
+    ENTITY_CACHE_EXPIRE_IN_SECONDS: int = Field(
+        default=60 * 60, env="ENTITY_CACHE_EXPIRE_IN_SECONDS")
+
+    # Как часто (в секундах) перезагружать из Redis фильтры Блума
+    # с идентификаторами документов, которые строит ETL
+    EXISTENCE_FILTER_RELOAD_IN_SECONDS: float = Field(
+        default=60, env="EXISTENCE_FILTER_RELOAD_IN_SECONDS")
+
+    # Отдавать списки фильмов по рейтингу из сортированных множеств Redis,
+    # которые поддерживает ETL, без запросов к ES
+    FILM_LIST_VIEWS_ENABLED: bool = Field(
+        default=True, env="FILM_LIST_VIEWS_ENABLED")
+
+    # Объединение одновременных запросов документов по id в один mget.
+    # Запросы копятся ES_BATCH_WINDOW_IN_SECONDS или до ES_BATCH_MAX_SIZE штук
+    ES_BATCHING_ENABLED: bool = Field(default=False, env="ES_BATCHING_ENABLED")
+    ES_BATCH_WINDOW_IN_SECONDS: float = Field(
+        default=0.002, env="ES_BATCH_WINDOW_IN_SECONDS")
+    ES_BATCH_MAX_SIZE: int = Field(default=100, env="ES_BATCH_MAX_SIZE")
+
     # Корень проекта
     BASE_DIR: DirectoryPath = Path(__file__).parent.parent
 
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from typing import Dict, Hashable, Set, Tuple
+
+from elasticsearch import AsyncElasticsearch, NotFoundError
+
+
+class BatchingElasticsearch:
+    """
+    Обертка клиента Elasticsearch, объединяющая одновременные запросы get.
+    Запросы документов одного индекса с одинаковыми параметрами копятся
+    window секунд (или пока их не наберется max_size) и отправляются одним
+    mget, после чего каждый ожидающий получает свой документ. Для вызывающего
+    кода get ведет себя как у клиента: отсутствующий документ - NotFoundError.
+    Остальные методы передаются клиенту без изменений.
+    """
+
+    def __init__(self, client: AsyncElasticsearch, window: float, max_size: int):
+        """
+        :param client: Клиент, которому отправляются запросы
+        :param window: Сколько секунд копить запросы перед отправкой
+        :param max_size: Сколько документов отправлять в одном mget
+        """
+        self.client = client
+        self.window = window
+        self.max_size = max_size
+        self._batches: Dict[Hashable, Dict[str, asyncio.Future]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.gets = 0
+        self.mgets = 0
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    async def get(self, index: str, id: str, **kwargs) -> dict:
+        self.gets += 1
+        key = (index, self._freeze(kwargs))
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = {}
+            asyncio.get_running_loop().call_later(
+                self.window, self._dispatch, key, batch)
+
+        future = batch.get(str(id))
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            # Ошибку забирает колбэк, даже если ожидающий запрос отменен
+            future.add_done_callback(
+                lambda f: f.cancelled() or f.exception())
+            batch[str(id)] = future
+            if len(batch) >= self.max_size:
+                self._dispatch(key, batch)
+
+        # shield не дает отмене одного запроса отменить результат для остальных
+        return await asyncio.shield(future)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    def stats(self) -> dict:
+        return {"gets": self.gets, "mgets": self.mgets}
+
+    def _dispatch(self, key: Tuple[str, tuple], batch: Dict[str, asyncio.Future]):
+        # Пачка могла уйти раньше по размеру, тогда таймер ничего не делает
+        if self._batches.get(key) is not batch:
+            return
+        del self._batches[key]
+        task = asyncio.create_task(self._load(key, batch))
+        # Храним ссылку на задачу, чтобы ее не удалил сборщик мусора
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load(self, key: Tuple[str, tuple], batch: Dict[str, asyncio.Future]):
+        index, kwargs = key
+        self.mgets += 1
+        try:
+            response = await self.client.mget(
+                index=index,
+                body={"ids": list(batch)},
+                **dict(kwargs),
+            )
+            docs = {doc["_id"]: doc for doc in response["docs"]}
+        except Exception as exc:
+            logging.warning("Batched mget of %s documents failed", len(batch))
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        except BaseException:
+            # Задачу отменили (например, при остановке сервиса): без этого
+            # ожидающие запросы ждали бы свои документы бесконечно
+            for future in batch.values():
+                future.cancel()
+            raise
+
+        for id_, future in batch.items():
+            if future.done():
+                continue
+            doc = docs.get(id_)
+            if doc is not None and doc.get("found"):
+                future.set_result(doc)
+            else:
+                future.set_exception(NotFoundError(404, "not_found", doc or {}))
+
+    @staticmethod
+    def _freeze(kwargs: dict) -> tuple:
+        return tuple(sorted(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in kwargs.items()
+        ))
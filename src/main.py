@@ -1,4 +1,4 @@
-import json
+import asyncio
 import logging
 import time
 
@@ -9,12 +9,24 @@ from fastapi import FastAPI
 from fastapi.requests import Request
 from fastapi.responses import ORJSONResponse
 
-from api.v1 import genres, films, persons
+from api.v1 import genres, films, persons, search
 from core.config import config
 from core.logger import LOGGING
 from db import elastic, redis
-from services.films import FILM_CACHE_EXPIRE_IN_SECONDS
-from utilites.async_iterator_wrapper import AsyncIteratorWrapper
+from db.batching import BatchingElasticsearch
+from services import cache, entity_cache, existence, list_views
+from services.cache import (
+    CACHE_REFRESH_SCOPE_KEY,
+    ResponseCache,
+    cache_tags,
+    get_cache_policy,
+)
+from services.cache_key import get_cache_key, match_route
+from services.entity_cache import EntityCache
+from services.existence import ExistenceFilters
+from services.list_views import FilmRatingViews
+from utilites.memory_cache import MemoryCache
+from utilites.asgi import copy_request_scope, run_asgi_request
 
 app = FastAPI(
     # Конфигурируем название проекта. Оно будет отображаться в документации
@@ -38,10 +50,61 @@ async def startup():
     elastic.es = AsyncElasticsearch(
         hosts=f"{config.ELASTIC_SCHEME}://{config.ELASTIC_HOST}:{config.ELASTIC_PORT}"
     )
+    if config.ES_BATCHING_ENABLED:
+        elastic.es = BatchingElasticsearch(
+            client=elastic.es,
+            window=config.ES_BATCH_WINDOW_IN_SECONDS,
+            max_size=config.ES_BATCH_MAX_SIZE,
+        )
+
+    cache.response_cache = ResponseCache(
+        redis=redis.redis,
+        memory=MemoryCache(
+            max_size=config.CACHE_L1_MAX_SIZE,
+            ttl=config.CACHE_L1_EXPIRE_IN_SECONDS,
+        ),
+        default_expire=config.CACHE_EXPIRE_IN_SECONDS,
+        max_body_size=config.CACHE_MAX_BODY_SIZE,
+        lock_timeout=config.CACHE_LOCK_TIMEOUT_IN_SECONDS,
+        stale_ttl=config.CACHE_STALE_IN_SECONDS,
+        early_refresh_beta=config.CACHE_EARLY_REFRESH_BETA,
+        compression=config.CACHE_COMPRESSION,
+        compression_min_size=config.CACHE_COMPRESSION_MIN_SIZE,
+    )
+    entity_cache.entity_cache = EntityCache(
+        redis=redis.redis,
+        expire=config.ENTITY_CACHE_EXPIRE_IN_SECONDS,
+    )
+    existence.existence_filters = ExistenceFilters(redis.redis)
+    if config.FILM_LIST_VIEWS_ENABLED:
+        list_views.film_rating_views = FilmRatingViews(redis.redis)
+    existence.existence_filters_loader = asyncio.create_task(
+        existence.existence_filters.keep_loaded(
+            indexes=[
+                config.ELASTIC_INDEX_FILM,
+                config.ELASTIC_INDEX_GENRE,
+                config.ELASTIC_INDEX_PERSON,
+            ],
+            interval=config.EXISTENCE_FILTER_RELOAD_IN_SECONDS,
+        )
+    )
+    # Слушаем изменения сущностей от ETL, чтобы сбрасывать зависящие от них ответы.
+    # Новые документы сразу добавляем в фильтры, не дожидаясь их перезагрузки
+    cache.invalidation_listener = asyncio.create_task(
+        cache.response_cache.listen_invalidations(
+            config.CACHE_INVALIDATION_CHANNEL,
+            on_change=existence.existence_filters.add,
+        )
+    )
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    logging.info("Response cache stats: %s", cache.response_cache.stats())
+    if isinstance(elastic.es, BatchingElasticsearch):
+        logging.info("Elasticsearch batching stats: %s", elastic.es.stats())
+    cache.invalidation_listener.cancel()
+    existence.existence_filters_loader.cancel()
     # Отключаемся от баз при выключении сервера
     await redis.redis.close()
     await elastic.es.close()
@@ -50,37 +113,79 @@ async def shutdown():
 @app.middleware("http")
 async def cache_middleware(request: Request, call_next):
     """
-    Получение и сохранение результат запроса из кэша Redis
+    Получение и сохранение результат запроса из кэша (память воркера, затем Redis).
+    Устаревший ответ отдается сразу, а обновляется фоновым запросом
+    к тем же обработчикам роутера. Правила кэширования задаются
+    для обработчиков декоратором cache_policy.
     :param request: Объект запроса из которого берется ключ кэширования
     :param call_next: Метод роутера, формирующий ответ. Используем его для сохранения
     :return:
     """
     start_time = time.time()
-    cache_key = "?".join([request["path"], request["query_string"].decode("utf-8")])
-    cached_result = await redis.redis.get(cache_key)
+    route, path_params = match_route(request)
+    policy = get_cache_policy(route.endpoint if route else None)
+    if policy.no_store:
+        response = await call_next(request)
+        response.headers["X-Cache"] = "BYPASS"
+        return response
+
+    cache_key = get_cache_key(request, route, path_params)
+    # Фоновое обновление всегда формирует ответ заново
+    is_refresh = request.scope.get(CACHE_REFRESH_SCOPE_KEY, False)
+    cached_result, cache_tier = None, None
+    if not is_refresh:
+        cached_result, cache_tier = await cache.response_cache.get(cache_key)
 
     if cached_result:
+        if cache.response_cache.needs_refresh(cached_result):
+            refresh_scope = copy_request_scope(
+                request.scope, **{CACHE_REFRESH_SCOPE_KEY: True})
+            cache.response_cache.refresh(
+                cache_key, lambda: run_asgi_request(request.app, refresh_scope))
         process_time = time.time() - start_time
-        response = ORJSONResponse(json.loads(cached_result.decode()))
+        response = cached_result.to_response(
+            request.headers.get("accept-encoding", ""))
         response.headers["X-Process-Time"] = str(process_time)
+        response.headers["X-Cache"] = cache_tier.value
         return response
 
-    response = await call_next(request)
-    # Consuming FastAPI response and grabbing body here
-    resp_body = [section async for section in response.body_iterator]
-    # Repairing FastAPI response
-    response.__setattr__("body_iterator", AsyncIteratorWrapper(resp_body))
-
-    await redis.redis.set(
-        name=cache_key,
-        value=resp_body[0].decode(),
-        ex=FILM_CACHE_EXPIRE_IN_SECONDS,
-    )
+    is_leader, shared_result = await cache.response_cache.join(cache_key)
+    if shared_result is not None:
+        process_time = time.time() - start_time
+        response = shared_result.to_response(
+            request.headers.get("accept-encoding", ""))
+        response.headers["X-Process-Time"] = str(process_time)
+        response.headers["X-Cache"] = "COALESCED"
+        return response
 
-    logging.info("Request result cached.")
+    # Сервисы отмечают здесь сущности, от которых зависит ответ
+    tags = set()
+    cache_tags.set(tags)
+    try:
+        response = await call_next(request)
+    except BaseException:
+        # В том числе отмена запроса: иначе ожидающие запросы
+        # ждали бы ответ ведущего до истечения таймаута
+        if is_leader:
+            cache.response_cache.abandon(cache_key)
+        raise
+
+    # Ведущий запрос отдает тело клиенту по частям, сохраняя его копию в кэш
+    if is_leader:
+        response.body_iterator = cache.response_cache.stream_and_store(
+            key=cache_key,
+            body_iterator=response.body_iterator,
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type"),
+            headers=response.headers.items(),
+            tags=tags,
+            policy=policy,
+            started_at=start_time,
+        )
 
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
+    response.headers["X-Cache"] = "MISS"
     return response
 
 
@@ -88,6 +193,7 @@ async def cache_middleware(request: Request, call_next):
 app.include_router(films.router, prefix="/api/v1/films", tags=["films"])
 app.include_router(genres.router, prefix="/api/v1/genres", tags=["genres"])
 app.include_router(persons.router, prefix="/api/v1/persons", tags=["persons"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["search"])
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -1,17 +1,51 @@
-from typing import List, Optional
+import base64
+import binascii
+from enum import Enum
+from http import HTTPStatus
+from typing import ClassVar, Dict, List, Optional, Type
 
-from fastapi import Query
-from pydantic import BaseModel, UUID4
+import orjson
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, UUID4, ValidationError, parse_obj_as
+
+from utilites.messages import (
+    API_CURSOR_NOT_SUPPORTED,
+    API_INVALID_BATCH_IDS,
+    API_INVALID_CURSOR,
+    API_INVALID_FIELDS,
+)
+
+# Заголовок ответа с курсором следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Поле ответа, которое возвращается при любом значении параметра fields:
+# без идентификатора элементы списка нельзя отличить друг от друга
+ID_FIELD = "uuid"
+# Сколько идентификаторов можно запросить одним пакетным запросом
+BATCH_MAX_SIZE = 100
+# Сколько подсказок можно запросить для автодополнения
+SUGGEST_MAX_SIZE = 20
+# Сколько значений сортировки в курсоре: у фильмов поле сортировки и id,
+# у персон и жанров только id
+FILMS_CURSOR_SIZE = 2
+ID_CURSOR_SIZE = 1
 
 
 class APIPaginator(BaseModel):
     page_size: int
     page_number: int
+    # Значения сортировки из курсора page[cursor]. Если заданы,
+    # страница запрашивается после них, а page[number] не учитывается
+    search_after: Optional[list] = None
 
 
+# Поля моделей ответа, кроме uuid, необязательны: параметр fields
+# позволяет клиенту запросить только часть из них
 class APIBaseModel(BaseModel):
     uuid: UUID4
 
+    # Соответствие полей ответа полям документа в ES
+    es_fields: ClassVar[Dict[str, str]] = {"uuid": "id"}
+
 
 class APIPersonFilmworks(BaseModel):
     role: str
@@ -19,21 +53,33 @@ class APIPersonFilmworks(BaseModel):
 
 
 class APIGenre(APIBaseModel):
-    name: str
+    name: Optional[str]
+
+    es_fields = {**APIBaseModel.es_fields, "name": "name"}
 
 
 class APIPersonShort(APIBaseModel):
-    full_name: str
+    full_name: Optional[str]
+
+    es_fields = {**APIBaseModel.es_fields, "full_name": "name"}
 
 
 class APIPersonFull(APIPersonShort):
     film_ids: Optional[List[APIPersonFilmworks]]
 
+    es_fields = {**APIPersonShort.es_fields, "film_ids": "filmworks"}
+
 
 class APIFilmShort(APIBaseModel):
-    title: str
+    title: Optional[str]
     imdb_rating: Optional[float] = 0.0
 
+    es_fields = {
+        **APIBaseModel.es_fields,
+        "title": "title",
+        "imdb_rating": "imdb_rating",
+    }
+
 
 class APIFilmFull(APIFilmShort):
     description: Optional[str]
@@ -42,9 +88,214 @@ class APIFilmFull(APIFilmShort):
     writers: Optional[List[APIPersonShort]]
     directors: Optional[List[APIPersonShort]]
 
+    es_fields = {
+        **APIFilmShort.es_fields,
+        "description": "description",
+        "genre": "genre",
+        "actors": "actors",
+        "writers": "writers",
+        "directors": "directors",
+    }
+
+
+class APIGenreFacet(APIGenre):
+    # Число фильмов жанра
+    count: int
+
+
+class APIRatingFacet(BaseModel):
+    # Интервал рейтинга [gte, lt) и число фильмов в нем
+    gte: float
+    lt: float
+    count: int
+
+
+class APIFilmFacets(BaseModel):
+    total: int
+    genres: List[APIGenreFacet]
+    imdb_rating: List[APIRatingFacet]
+
+
+# Результаты общего поиска, сгруппированные по типам объектов
+class APISearchResult(BaseModel):
+    films: List[APIFilmShort]
+    persons: List[APIPersonFull]
+    genres: List[APIGenre]
+
+
+class GenreMatch(str, Enum):
+    # Фильм относится хотя бы к одному из жанров фильтра
+    any = "any"
+    # Фильм относится ко всем жанрам фильтра
+    all = "all"
+
+
+class APIFilmFilter(BaseModel):
+    genre_ids: List[UUID4] = []
+    genre_match: GenreMatch = GenreMatch.any
+    # Фильмы, в которых участвовала хотя бы одна из персон, в любой роли
+    person_ids: List[UUID4] = []
+    rating_gte: Optional[float] = None
+    rating_lte: Optional[float] = None
+
 
 def get_paginator(
         page_size: int = Query(default=10, alias="page[size]", ge=1, le=10000),
         page_number: int = Query(default=1, alias="page[number]", ge=1, le=10000),
+        cursor: str = Query(
+            default=None,
+            alias="page[cursor]",
+            description="Не поддерживается, страницы задаются page[number]",
+        ),
 ) -> APIPaginator:
+    """Пагинация по номеру страницы для поиска, у которого нет курсоров"""
+    if cursor is not None:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=API_CURSOR_NOT_SUPPORTED,
+        )
     return APIPaginator(page_size=page_size, page_number=page_number)
+
+
+def get_cursor_paginator(cursor_size: int):
+    """
+    Зависимость пагинации по номеру страницы или по курсору page[cursor]
+    :param cursor_size: Сколько значений сортировки в курсоре списка
+    """
+
+    def paginator_dependency(
+            page_size: int = Query(default=10, alias="page[size]", ge=1, le=10000),
+            page_number: int = Query(default=1, alias="page[number]", ge=1, le=10000),
+            cursor: str = Query(default=None, alias="page[cursor]"),
+    ) -> APIPaginator:
+        search_after = None
+        if cursor is not None:
+            search_after = decode_cursor(cursor, cursor_size)
+        return APIPaginator(
+            page_size=page_size,
+            page_number=page_number,
+            search_after=search_after,
+        )
+
+    return paginator_dependency
+
+
+def get_film_filter(
+        genre_ids: List[UUID4] = Query(default=[], alias="filter[genre]"),
+        genre_match: GenreMatch = Query(
+            default=GenreMatch.any,
+            alias="filter[genre_match]",
+        ),
+        person_ids: List[UUID4] = Query(default=[], alias="filter[person]"),
+        rating_gte: float = Query(
+            default=None,
+            alias="filter[imdb_rating][gte]",
+            ge=0,
+            le=10,
+        ),
+        rating_lte: float = Query(
+            default=None,
+            alias="filter[imdb_rating][lte]",
+            ge=0,
+            le=10,
+        ),
+) -> APIFilmFilter:
+    """Фильтры списка фильмов. Параметры жанров и персон можно повторять"""
+    return APIFilmFilter(
+        genre_ids=genre_ids,
+        genre_match=genre_match,
+        person_ids=person_ids,
+        rating_gte=rating_gte,
+        rating_lte=rating_lte,
+    )
+
+
+def encode_cursor(search_after: list) -> str:
+    """Непрозрачный для клиента курсор из значений сортировки документа"""
+    return base64.urlsafe_b64encode(orjson.dumps(search_after)).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, cursor_size: int) -> list:
+    """
+    Значения сортировки из курсора. Курсор другой длины или с нескалярными
+    значениями ES отклонил бы ошибкой запроса, поэтому он отклоняется здесь
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        search_after = orjson.loads(raw)
+    except (binascii.Error, ValueError):
+        search_after = None
+    if (
+            not isinstance(search_after, list)
+            or len(search_after) != cursor_size
+            or not all(_is_sort_value(value) for value in search_after)
+    ):
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=API_INVALID_CURSOR,
+        )
+    return search_after
+
+
+def _is_sort_value(value) -> bool:
+    # bool - подкласс int, но значением сортировки быть не может
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+def set_next_cursor(response: Response, search_after: Optional[list]) -> None:
+    """Передает клиенту курсор следующей страницы, если она может быть"""
+    if search_after is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(search_after)
+
+
+def get_batch_ids(
+        ids: str = Query(..., description="Идентификаторы через запятую"),
+) -> List[UUID4]:
+    """Идентификаторы пакетного запроса в порядке их перечисления"""
+    items = [item.strip() for item in ids.split(",") if item.strip()]
+    try:
+        object_ids = parse_obj_as(List[UUID4], items)
+    except ValidationError:
+        object_ids = None
+    if not object_ids or len(object_ids) > BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=API_INVALID_BATCH_IDS.format(max_size=BATCH_MAX_SIZE),
+        )
+    return object_ids
+
+
+def get_fields(model: Type[APIBaseModel]):
+    """
+    Зависимость, разбирающая параметр fields - поля модели ответа через запятую.
+    Возвращает отсортированный список полей, в который всегда входит uuid,
+    или None, если нужны все поля
+    """
+
+    def fields_dependency(
+            fields: str = Query(default=None, description="Поля ответа через запятую"),
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        if not names or not names <= model.es_fields.keys():
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                detail=API_INVALID_FIELDS.format(
+                    fields=", ".join(model.es_fields),
+                ),
+            )
+        return sorted(names | {ID_FIELD})
+
+    return fields_dependency
+
+
+def get_es_fields(
+        model: Type[APIBaseModel],
+        fields: Optional[List[str]],
+) -> Optional[List[str]]:
+    """Поля документа в ES, из которых собираются запрошенные поля ответа"""
+    if fields is None:
+        return None
+    return sorted({model.es_fields[name] for name in fields})
+
@@ -0,0 +1,98 @@
+"""
+Документы ES в форме ответов API.
+Функции собирают ответ словарями прямо из _source документа и передаются
+сервисам вместо модели (параметр model), а ответ кодируется orjson за один
+проход: без промежуточных моделей ES и API и повторной проверки ответа
+в FastAPI. Форма ответа повторяет модели из api_models, которые остаются
+схемой OpenAPI.
+"""
+from typing import List, Optional, Union
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+
+def genre_wire(**doc) -> dict:
+    return {
+        "uuid": doc["id"],
+        "name": doc.get("name"),
+    }
+
+
+def person_short_wire(**doc) -> dict:
+    return {
+        "uuid": doc["id"],
+        "full_name": doc.get("name"),
+    }
+
+
+def person_full_wire(**doc) -> dict:
+    return {
+        **person_short_wire(**doc),
+        "film_ids": [
+            {
+                "role": role_fw["role"],
+                "filmworks": [fw["id"] for fw in role_fw["filmworks"]],
+            }
+            for role_fw in doc.get("filmworks") or []
+        ],
+    }
+
+
+def film_short_wire(**doc) -> dict:
+    imdb_rating = doc.get("imdb_rating")
+    return {
+        "uuid": doc["id"],
+        "title": doc.get("title"),
+        # Рейтинг в индексе может быть целым, а в ответе он всегда float
+        "imdb_rating": float(imdb_rating) if imdb_rating is not None else None,
+    }
+
+
+def film_full_wire(**doc) -> dict:
+    return {
+        **film_short_wire(**doc),
+        "description": doc.get("description"),
+        "genre": [genre_wire(**genre) for genre in doc.get("genre") or []],
+        "actors": [
+            person_short_wire(**actor) for actor in doc.get("actors") or []
+        ],
+        "writers": [
+            person_short_wire(**writer) for writer in doc.get("writers") or []
+        ],
+        "directors": [
+            person_short_wire(**director)
+            for director in doc.get("directors") or []
+        ],
+    }
+
+
+def wire_response(
+        data: Union[dict, List[Optional[dict]]],
+        fields: Optional[List[str]] = None,
+        response: Optional[Response] = None,
+) -> ORJSONResponse:
+    """
+    Ответ из собранных словарей
+    :param fields: Поля ответа, запрошенные параметром fields.
+        None - все поля
+    :param response: Ответ, в который обработчик записал заголовки.
+        FastAPI не переносит их в возвращенный обработчиком Response
+    """
+    if fields is not None:
+        include = set(fields)
+        if isinstance(data, list):
+            data = [
+                _select(item, include) if item is not None else None
+                for item in data
+            ]
+        else:
+            data = _select(data, include)
+    wire = ORJSONResponse(content=data)
+    if response is not None:
+        wire.headers.update(response.headers)
+    return wire
+
+
+def _select(item: dict, include: set) -> dict:
+    return {name: value for name, value in item.items() if name in include}
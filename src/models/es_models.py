@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 
 import orjson
 # Используем pydantic для упрощения работы при перегонке данных из json в объекты
@@ -26,13 +26,15 @@ class ESPersonFilmworks(ESBaseOrjsonModel):
     filmworks: List[ESBaseModel]
 
 
+# Документ может содержать только часть полей, если ответ
+# собирается из выбранных клиентом полей (параметр fields)
 class ESGenre(ESBaseModel):
-    name: str
+    name: Optional[str]
     description: Optional[str]
 
 
 class ESPerson(ESBaseModel):
-    name: str
+    name: Optional[str]
     filmworks: Optional[List[ESPersonFilmworks]]
 
 
@@ -40,10 +42,33 @@ class ESFilm(ESBaseModel):
     id: str
     imdb_rating: Optional[float]
     genre: Optional[List[ESGenre]]
-    title: str
+    title: Optional[str]
     description: Optional[str]
     directors: Optional[List[ESPerson]]
     actors_names: Optional[str]
     writers_names: Optional[str]
     actors: Optional[List[ESPerson]]
     writers: Optional[List[ESPerson]]
+
+
+class ESGenreFacet(ESGenre):
+    count: int
+
+
+class ESRatingFacet(ESBaseOrjsonModel):
+    gte: float
+    lt: float
+    count: int
+
+
+class ESFilmFacets(ESBaseOrjsonModel):
+    total: int
+    genres: List[ESGenreFacet]
+    imdb_rating: List[ESRatingFacet]
+
+
+class ESPage(ESBaseOrjsonModel):
+    items: List[Any]
+    # Значения сортировки последнего документа полной страницы, по которым
+    # запрашивается следующая страница (search_after). None - страница последняя
+    search_after: Optional[list]
@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Type
+from typing import List, Optional, Type
 
 from pydantic import UUID4
 
-from models.es_models import ESBaseModel
+from models.es_models import ESBaseModel, ESPage
 
 
 class APIService(ABC):
@@ -12,17 +12,29 @@ class APIService(ABC):
         self,
         object_id: UUID4,
         model: Type[ESBaseModel] = ESBaseModel,
+        fields: List[str] = None,
     ) -> ESBaseModel:
         ...
 
+    @abstractmethod
+    def get_by_ids(
+        self,
+        object_ids: List[UUID4],
+        model: Type[ESBaseModel] = ESBaseModel,
+        fields: List[str] = None,
+    ) -> List[Optional[ESBaseModel]]:
+        ...
+
     @abstractmethod
     def get_all(
         self,
         page_size: int = None,
         page_number: int = None,
         model: Type[ESBaseModel] = ESBaseModel,
+        search_after: list = None,
+        fields: List[str] = None,
         **kwargs,
-    ) -> List[ESBaseModel]:
+    ) -> ESPage:
         ...
 
 
@@ -32,7 +44,7 @@ class APIServiceListable(APIService):
         self,
         model: Type[ESBaseModel] = ESBaseModel,
         **kwargs,
-    ) -> List[ESBaseModel]:
+    ) -> ESPage:
         ...
 
 
@@ -44,6 +56,16 @@ class APIServiceSearchable(APIService):
         page_size: int = None,
         page_number: int = None,
         model: Type[ESBaseModel] = ESBaseModel,
+        fields: List[str] = None,
+    ) -> List[ESBaseModel]:
+        ...
+
+    @abstractmethod
+    def suggest(
+        self,
+        prefix: str,
+        size: int,
+        model: Type[ESBaseModel] = ESBaseModel,
     ) -> List[ESBaseModel]:
         ...
 
@@ -61,6 +83,10 @@ class APIAsyncSearchEngine(ABC):
     async def mget(self, index: str, body: dict, **kwargs):
         ...
 
+    @abstractmethod
+    async def msearch(self, body: list, **kwargs):
+        ...
+
 
 class APIAbstractServiceFactory(ABC):
     @staticmethod
@@ -0,0 +1,671 @@
+import asyncio
+import logging
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from enum import Enum
+from http import HTTPStatus
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import orjson
+from aioredis import Redis
+from aioredis.client import Script
+from fastapi.responses import Response
+
+from utilites.compression import accepts_encoding, compress, decompress
+from utilites.memory_cache import MemoryCache
+from utilites.single_flight import SingleFlight
+
+# Снимает блокировку, только если она все еще принадлежит владельцу токена
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+# Продлевает время жизни ключа, но никогда его не сокращает
+# (EXPIRE ... GT появился только в Redis 7)
+EXTEND_TTL_SCRIPT = """
+if redis.call("ttl", KEYS[1]) < tonumber(ARGV[1]) then
+    return redis.call("expire", KEYS[1], ARGV[1])
+end
+return 0
+"""
+# Сколько секунд хранится версия тега. Версию сравнивают только запросы,
+# которые читали данные во время сброса тега, поэтому хватает запаса
+# на самый долгий запрос к ES
+TAG_VERSION_EXPIRE_IN_SECONDS = 60
+# Сколько секунд воркер помнит время сброса тега. Ответ, который формировался
+# дольше, в кэш не сохраняется: сброс мог случиться во время его формирования
+TAG_INVALIDATION_MEMORY_IN_SECONDS = TAG_VERSION_EXPIRE_IN_SECONDS
+# Сколько секунд хранится ответ о том, что документ не найден
+NOT_FOUND_CACHE_EXPIRE_IN_SECONDS = 10
+# Интервал опроса Redis в ожидании результата от другого воркера
+LOCK_POLL_INTERVAL_IN_SECONDS = 0.02
+# Сколько секунд запрос ждет ответа от одновременного запроса с тем же ключом
+COALESCE_TIMEOUT_IN_SECONDS = 10
+# Ключ ASGI scope, которым помечаются фоновые запросы на обновление кэша
+CACHE_REFRESH_SCOPE_KEY = "cache_refresh"
+# Пауза перед переподпиской на канал инвалидации после ошибки
+INVALIDATION_RETRY_IN_SECONDS = 1
+
+# Заголовки, которые формируются при отдаче записи заново и в ней не хранятся
+UNCACHED_HEADERS = frozenset({
+    "content-length",
+    "content-type",
+    "content-encoding",
+    "age",
+    "vary",
+    "x-cache",
+    "x-process-time",
+})
+
+# Атрибут обработчика, в котором хранятся правила кэширования его ответов
+CACHE_POLICY_ATTRIBUTE = "__cache_policy__"
+
+# Теги сущностей, от которых зависит формируемый ответ.
+# Заполняются сервисами во время обработки запроса
+cache_tags: ContextVar[Optional[Set[str]]] = ContextVar("cache_tags", default=None)
+
+
+def tag_response(*tags: str) -> None:
+    """
+    Отмечает, что формируемый ответ зависит от указанных сущностей.
+    Тег "<индекс>" - от состава индекса, "<индекс>:<id>" - от одного документа
+    """
+    current_tags = cache_tags.get()
+    if current_tags is not None:
+        current_tags.update(tags)
+
+
+def get_entity_tags(index: str, ids: Iterable[str]) -> Set[str]:
+    """Теги, которые затрагивает изменение документов индекса"""
+    return {index, *(f"{index}:{id_}" for id_ in ids)}
+
+
+def get_tag_key(tag: str) -> str:
+    """Ключ множества Redis с ключами записей, отмеченных тегом"""
+    return f"tag:{tag}"
+
+
+def get_tag_version_key(tag: str) -> str:
+    """Ключ счетчика сбросов тега (см. ResponseCache.invalidate)"""
+    return f"tagver:{tag}"
+
+
+async def tag_key_in_pipeline(
+        pipe,
+        extend_ttl: Script,
+        tag: str,
+        key: str,
+        expire: int,
+) -> None:
+    """
+    Добавляет ключ в множество тега. Множество живет не меньше,
+    чем самая долгоживущая запись в нем, иначе запись нельзя будет сбросить
+    :param extend_ttl: Зарегистрированный EXTEND_TTL_SCRIPT. Конвейер
+        вызывает его по EVALSHA, не передавая текст скрипта
+    """
+    pipe.sadd(get_tag_key(tag), key)
+    await extend_ttl(keys=[get_tag_key(tag)], args=[expire], client=pipe)
+
+
+class CacheTier(str, Enum):
+    memory = "L1"
+    redis = "L2"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Правила кэширования ответов обработчика"""
+
+    # Сколько секунд ответ считается свежим. None - значение из настроек
+    expire: Optional[int] = None
+    # Коды ответов, которые сохраняются в кэш. Ошибки по умолчанию не кэшируются
+    statuses: FrozenSet[int] = frozenset({HTTPStatus.OK})
+    # Максимальный размер сохраняемого тела ответа. None - значение из настроек
+    max_body_size: Optional[int] = None
+    # Ответы обработчика не берутся из кэша и не сохраняются в него
+    no_store: bool = False
+    # Сколько секунд хранить ответ 404. None - такие ответы не кэшируются.
+    # Запись сбрасывается, когда ETL сообщает о появлении документа
+    not_found_expire: Optional[int] = None
+
+    def is_cacheable_status(self, status_code: int) -> bool:
+        if status_code == HTTPStatus.NOT_FOUND and self.not_found_expire:
+            return True
+        return status_code in self.statuses
+
+
+DEFAULT_CACHE_POLICY = CachePolicy()
+
+
+def cache_policy(**kwargs):
+    """
+    Декоратор обработчика роутера, задающий правила кэширования его ответов.
+    Принимает поля CachePolicy
+    """
+    policy = CachePolicy(**kwargs)
+
+    def decorator(endpoint):
+        setattr(endpoint, CACHE_POLICY_ATTRIBUTE, policy)
+        return endpoint
+
+    return decorator
+
+
+def get_cache_policy(endpoint) -> CachePolicy:
+    return getattr(endpoint, CACHE_POLICY_ATTRIBUTE, DEFAULT_CACHE_POLICY)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """
+    Запись кэша: тело ответа в том виде, в котором оно ушло клиенту,
+    и метаданные, необходимые для его повторной отдачи без разбора JSON.
+    Запись свежая fresh_for секунд с момента created_at, после этого
+    она отдается как устаревшая, пока не истечет срок ее хранения в Redis.
+    Тело может храниться сжатым, тогда encoding содержит алгоритм сжатия.
+    """
+
+    body: bytes
+    status_code: int
+    media_type: Optional[str]
+    # Время формирования ответа (unix time)
+    created_at: float = 0.0
+    # Сколько секунд запись считается свежей (мягкий TTL)
+    fresh_for: float = 0.0
+    # Сколько секунд формировался ответ
+    delta: float = 0.0
+    # Теги сущностей, при изменении которых запись удаляется
+    tags: Tuple[str, ...] = ()
+    # Алгоритм сжатия тела в терминах Content-Encoding, None - без сжатия
+    encoding: Optional[str] = None
+    # Заголовки, выставленные обработчиком, например курсор следующей страницы
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+    # Метаданные и тело разделяются первым переводом строки
+    SEPARATOR = b"\n"
+
+    def dumps(self) -> bytes:
+        meta = orjson.dumps(
+            {
+                "status_code": self.status_code,
+                "media_type": self.media_type,
+                "created_at": self.created_at,
+                "fresh_for": self.fresh_for,
+                "delta": self.delta,
+                "tags": self.tags,
+                "encoding": self.encoding,
+                "headers": self.headers,
+            }
+        )
+        return meta + self.SEPARATOR + self.body
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CachedResponse":
+        meta, body = raw.split(cls.SEPARATOR, 1)
+        meta = orjson.loads(meta)
+        meta["tags"] = tuple(meta.get("tags", ()))
+        meta["headers"] = tuple(tuple(item) for item in meta.get("headers", ()))
+        return cls(body=body, **meta)
+
+    @property
+    def age(self) -> float:
+        return max(time.time() - self.created_at, 0.0)
+
+    def needs_refresh(self, beta: float) -> bool:
+        """
+        Проверяет, пора ли обновить запись. Устаревшая запись обновляется всегда,
+        свежая - с вероятностью, растущей по мере приближения к концу срока
+        и пропорциональной времени формирования ответа (XFetch).
+        Так ключи, созданные одновременно, обновляются в разное время.
+        """
+        expire_at = self.created_at + self.fresh_for
+        # 1 - random() лежит в (0, 1], поэтому логарифм всегда определен
+        early = -self.delta * beta * math.log(1 - random.random())
+        return time.time() + early >= expire_at
+
+    def compress(self, encoding: str) -> "CachedResponse":
+        return replace(self, body=compress(self.body, encoding), encoding=encoding)
+
+    def to_response(self, accept_encoding: str = "") -> Response:
+        """
+        Отдаем сохраненные байты как есть, без повторной сериализации.
+        Сжатое тело распаковывается, только если клиент не принимает сжатие
+        :param accept_encoding: Значение заголовка Accept-Encoding запроса
+        """
+        body = self.body
+        headers = dict(self.headers)
+        headers["Age"] = str(int(self.age))
+        if self.encoding:
+            headers["Vary"] = "Accept-Encoding"
+            if accepts_encoding(accept_encoding, self.encoding):
+                headers["Content-Encoding"] = self.encoding
+            else:
+                body = decompress(body, self.encoding)
+        return Response(
+            content=body,
+            status_code=self.status_code,
+            media_type=self.media_type,
+            headers=headers,
+        )
+
+
+class ResponseCache:
+    """
+    Двухуровневый кэш ответов API:
+        - L1: кэш в памяти воркера, отвечает на горячие ключи без сетевых запросов
+        - L2: общий для всех воркеров кэш в Redis
+
+    Одновременные промахи по одному ключу объединяются: ответ формирует
+    один (ведущий) запрос, остальные дожидаются его результата. Если задан lock_timeout,
+    объединение работает и между воркерами через короткую блокировку в Redis.
+
+    Записи хранятся stale_ttl секунд после окончания срока свежести:
+    в это время устаревший ответ отдается сразу, а обновляется в фоне.
+
+    Для каждого тега записи в Redis ведется множество ключей "tag:<тег>",
+    по которому записи удаляются при изменении сущностей. Ответ, теги которого
+    сбрасывались, пока он формировался, в кэш не сохраняется: он мог быть
+    собран из уже измененных документов.
+
+    Что и на сколько сохранять, определяет CachePolicy обработчика;
+    незаданные в ней значения берутся из default_expire и max_body_size.
+
+    Тела от compression_min_size байт хранятся сжатыми алгоритмом compression.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            memory: MemoryCache,
+            default_expire: int,
+            max_body_size: int,
+            lock_timeout: Optional[float] = None,
+            stale_ttl: float = 0,
+            early_refresh_beta: float = 1.0,
+            compression: Optional[str] = None,
+            compression_min_size: int = 0,
+    ):
+        self.redis = redis
+        self.memory = memory
+        self.default_expire = default_expire
+        self.max_body_size = max_body_size
+        self.lock_timeout = lock_timeout
+        self.stale_ttl = stale_ttl
+        self.early_refresh_beta = early_refresh_beta
+        self.compression = compression
+        self.compression_min_size = compression_min_size
+        self.flights = SingleFlight()
+        self.extend_ttl = redis.register_script(EXTEND_TTL_SCRIPT)
+        self.release_lock = redis.register_script(RELEASE_LOCK_SCRIPT)
+        self._lock_tokens = {}
+        # Время последнего сброса тега (unix time) в порядке сбросов
+        self._invalidated_at = {}
+        self._refresh_tasks = {}
+        self._background_tasks = set()
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    async def get(
+            self, key: str,
+    ) -> Tuple[Optional[CachedResponse], Optional[CacheTier]]:
+        """
+        Ищет значение последовательно в L1 и L2
+        :return: Значение и уровень кэша, на котором оно найдено
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits[CacheTier.memory] += 1
+            return value, CacheTier.memory
+        self.misses[CacheTier.memory] += 1
+
+        raw = await self.redis.get(key)
+        if raw is not None:
+            self.hits[CacheTier.redis] += 1
+            value = CachedResponse.loads(raw)
+            # Прогреваем L1, чтобы следующие запросы не ходили в Redis
+            self.memory.set(key, value)
+            return value, CacheTier.redis
+        self.misses[CacheTier.redis] += 1
+
+        return None, None
+
+    async def set(
+            self,
+            key: str,
+            value: CachedResponse,
+            expire: int,
+            started_at: Optional[float] = None,
+    ) -> bool:
+        """
+        Сохраняет ответ в кэше
+        :param expire: Сколько секунд ответ считается свежим
+        :param started_at: Время начала формирования ответа (unix time).
+            Если задано, ответ не сохраняется при сбросе его тегов после
+            этого момента. Проверка повторяется после записи в Redis:
+            сброс, начавшийся раньше нее, мог не найти ключ в множестве тега
+        :return: Сохранен ли ответ
+        """
+        value = replace(value, created_at=time.time(), fresh_for=expire)
+        if (
+                self.compression
+                and not value.encoding
+                and len(value.body) >= self.compression_min_size
+        ):
+            value = value.compress(self.compression)
+        hard_expire = math.ceil(expire + self.stale_ttl)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(name=key, value=value.dumps(), ex=hard_expire)
+            for tag in value.tags:
+                await tag_key_in_pipeline(
+                    pipe, self.extend_ttl, tag, key, hard_expire,
+                )
+            await pipe.execute()
+        if started_at is not None and self.is_invalidated(value.tags, started_at):
+            await self.redis.delete(key)
+            return False
+        self.memory.set(key, value, ttl=hard_expire)
+        return True
+
+    async def invalidate(self, tags: Set[str]) -> None:
+        """
+        Удаляет из L1 и L2 все записи, отмеченные хотя бы одним из тегов.
+        Версии тегов увеличиваются раньше чтения их множеств: запись,
+        сохраняемая с проверкой версии (кэш сущностей), либо уже попала
+        в множество и будет удалена, либо увидит новую версию и не сохранится
+        """
+        if not tags:
+            return
+        self._remember_invalidation(tags)
+        tag_keys = [get_tag_key(tag) for tag in tags]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(get_tag_version_key(tag))
+                pipe.expire(get_tag_version_key(tag), TAG_VERSION_EXPIRE_IN_SECONDS)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            results = await pipe.execute()
+        members = results[2 * len(tags):]
+        keys = set().union(*members)
+        await self.redis.delete(*keys, *tag_keys)
+
+        # Множества тегов в Redis мог уже удалить другой воркер,
+        # поэтому записи L1 проверяем по их собственным тегам
+        for key, value in self.memory.items():
+            if tags.intersection(value.tags):
+                self.memory.delete(key)
+        for key in keys:
+            self.memory.delete(key.decode())
+
+    def is_invalidated(self, tags: Iterable[str], since: float) -> bool:
+        """
+        Проверяет, сбрасывался ли хотя бы один из тегов начиная с момента since.
+        О более давних сбросах воркер не помнит и считает, что они были
+        :param since: Время начала формирования ответа (unix time)
+        """
+        if time.time() - since >= TAG_INVALIDATION_MEMORY_IN_SECONDS:
+            return True
+        return any(self._invalidated_at.get(tag, 0.0) >= since for tag in tags)
+
+    def _remember_invalidation(self, tags: Iterable[str]) -> None:
+        now = time.time()
+        for tag in tags:
+            # Переставляем тег в конец, чтобы словарь оставался упорядочен по времени
+            self._invalidated_at.pop(tag, None)
+            self._invalidated_at[tag] = now
+        forget_before = now - TAG_INVALIDATION_MEMORY_IN_SECONDS
+        while self._invalidated_at:
+            tag = next(iter(self._invalidated_at))
+            if self._invalidated_at[tag] >= forget_before:
+                break
+            del self._invalidated_at[tag]
+
+    async def listen_invalidations(
+            self,
+            channel: str,
+            on_change: Callable[[str, List[str]], None] = None,
+    ) -> None:
+        """
+        Слушает канал Redis, в который ETL публикует изменения сущностей
+        в виде {"index": <имя индекса>, "ids": [<id>, ...]}
+        :param on_change: Вызывается с индексом и идентификаторами
+            измененных документов после сброса кэша
+        """
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(channel)
+                async for message in pubsub.listen():
+                    data = orjson.loads(message["data"])
+                    tags = get_entity_tags(data["index"], data["ids"])
+                    await self.invalidate(tags)
+                    if on_change is not None:
+                        on_change(data["index"], data["ids"])
+                    logging.info(
+                        "Cache invalidated for %s changed documents in %s",
+                        len(data["ids"]), data["index"],
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Cache invalidation listener failed")
+                await asyncio.sleep(INVALIDATION_RETRY_IN_SECONDS)
+
+    def is_cacheable(self, value: CachedResponse, policy: CachePolicy) -> bool:
+        max_body_size = policy.max_body_size or self.max_body_size
+        return (
+            not policy.no_store
+            and policy.is_cacheable_status(value.status_code)
+            and len(value.body) <= max_body_size
+        )
+
+    def needs_refresh(self, value: CachedResponse) -> bool:
+        return value.needs_refresh(self.early_refresh_beta)
+
+    def refresh(self, key: str, refresher: Callable[[], Awaitable]) -> None:
+        """
+        Запускает фоновое обновление записи, если оно еще не запущено
+        :param refresher: Корутина, заново формирующая и сохраняющая ответ
+        """
+        if key in self._refresh_tasks or key in self.flights:
+            return
+        task = asyncio.create_task(refresher())
+        self._refresh_tasks[key] = task
+        task.add_done_callback(lambda t: self._on_refreshed(key, t))
+
+    def _on_refreshed(self, key: str, task: asyncio.Task) -> None:
+        self._refresh_tasks.pop(key, None)
+        if not task.cancelled() and task.exception():
+            logging.error(
+                "Cache refresh failed for %s", key, exc_info=task.exception(),
+            )
+
+    async def join(self, key: str) -> Tuple[bool, Optional[CachedResponse]]:
+        """
+        Дожидается ответа, который уже формирует другой запрос с тем же ключом.
+        Если такого запроса нет, текущий становится ведущим и должен передать
+        сформированный ответ в stream_and_store или отказаться от него в abandon.
+        :return: Стал ли запрос ведущим и ответ, полученный от ведущего запроса.
+            Ответ пуст, если ведущий запрос не смог его сохранить
+        """
+        is_leader, value = await self.flights.join(
+            key, timeout=COALESCE_TIMEOUT_IN_SECONDS,
+        )
+        if not is_leader or not self.lock_timeout:
+            return is_leader, value
+
+        try:
+            token = await self._acquire_lock(key)
+            if token is None:
+                value = await self._wait_for(key)
+                if value is not None:
+                    self.flights.finish(key, value)
+                    return False, value
+        except Exception:
+            # Без Redis ответ формируется без блокировки между воркерами
+            logging.warning("Cache lock failed for %s", key, exc_info=True)
+            token = None
+        except BaseException:
+            self.flights.finish(key, None)
+            raise
+        self._lock_tokens[key] = token
+        return True, None
+
+    async def stream_and_store(
+            self,
+            key: str,
+            body_iterator: AsyncIterator[bytes],
+            status_code: int,
+            media_type: Optional[str],
+            headers: Iterable[Tuple[str, str]],
+            tags: Set[str],
+            policy: CachePolicy,
+            started_at: float,
+    ) -> AsyncIterator[bytes]:
+        """
+        Передает тело ответа клиенту по мере получения, одновременно накапливая
+        его копию. Если тело больше допустимого размера, копия отбрасывается.
+        После передачи всего тела ответ отдается ожидающим запросам
+        и в фоне сохраняется в кэш.
+        :param body_iterator: Тело ответа ведущего запроса
+        :param headers: Заголовки ответа ведущего запроса
+        :param tags: Теги сущностей, заполняемые сервисами при формировании ответа
+        :param started_at: Время начала формирования ответа (unix time)
+        """
+        max_body_size = policy.max_body_size or self.max_body_size
+        chunks, size = [], 0
+        completed = False
+        try:
+            async for chunk in body_iterator:
+                if chunks is not None:
+                    size += len(chunk)
+                    if size <= max_body_size:
+                        chunks.append(chunk)
+                    else:
+                        chunks = None
+                yield chunk
+            completed = True
+        finally:
+            if completed and chunks is not None:
+                value = CachedResponse(
+                    body=b"".join(chunks),
+                    status_code=status_code,
+                    media_type=media_type,
+                    headers=tuple(
+                        (name, value) for name, value in headers
+                        if name.lower() not in UNCACHED_HEADERS
+                    ),
+                    delta=time.time() - started_at,
+                    tags=tuple(sorted(tags)),
+                )
+                self.flights.finish(key, value)
+                self._run_in_background(
+                    self._store(key, value, policy, started_at),
+                )
+            else:
+                self.abandon(key)
+
+    def abandon(self, key: str) -> None:
+        """Ведущий запрос не сформировал ответ: ожидающие запросы формируют его сами"""
+        self.flights.finish(key, None)
+        self._run_in_background(self._release_lock(key))
+
+    async def _store(
+            self,
+            key: str,
+            value: CachedResponse,
+            policy: CachePolicy,
+            started_at: float,
+    ) -> None:
+        try:
+            if not self.is_cacheable(value, policy):
+                return
+            if self.is_invalidated(value.tags, started_at):
+                logging.info("Request result not cached: its entities changed.")
+                return
+            if value.status_code == HTTPStatus.NOT_FOUND:
+                expire = policy.not_found_expire
+            else:
+                expire = policy.expire or self.default_expire
+            if await self.set(key, value, expire, started_at):
+                logging.info("Request result cached.")
+        finally:
+            await self._release_lock(key)
+
+    def _run_in_background(self, coroutine: Awaitable) -> None:
+        task = asyncio.ensure_future(coroutine)
+        # Храним ссылку на задачу, чтобы ее не удалил сборщик мусора
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+
+    def _on_background_task_done(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logging.error("Cache write failed", exc_info=task.exception())
+
+    async def _release_lock(self, key: str) -> None:
+        token = self._lock_tokens.pop(key, None)
+        if token:
+            await self.release_lock(keys=[self._lock_key(key)], args=[token])
+
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(
+            name=self._lock_key(key),
+            value=token,
+            px=int(self.lock_timeout * 1000),
+            nx=True,
+        )
+        return token if acquired else None
+
+    async def _wait_for(self, key: str) -> Optional[CachedResponse]:
+        """Ожидает, пока ответ сформирует воркер, захвативший блокировку"""
+        started_at = time.time()
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL_IN_SECONDS)
+            raw = await self.redis.get(key)
+            if raw is not None:
+                value = CachedResponse.loads(raw)
+                # Устаревшая запись, которую сейчас обновляют, не подходит
+                if value.created_at >= started_at:
+                    self.memory.set(key, value)
+                    return value
+            if not await self.redis.exists(self._lock_key(key)):
+                break
+        return None
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"lock:{key}"
+
+    def stats(self) -> dict:
+        return {
+            tier.value: {"hits": self.hits[tier], "misses": self.misses[tier]}
+            for tier in CacheTier
+        }
+
+
+response_cache: Optional[ResponseCache] = None
+invalidation_listener: Optional[asyncio.Task] = None
+
+
+# Функция понадобится при внедрении зависимостей
+async def get_response_cache() -> ResponseCache:
+    return response_cache
@@ -0,0 +1,136 @@
+from enum import Enum
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode
+from uuid import UUID
+
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import get_flat_dependant, is_scalar_sequence_field
+from fastapi.requests import Request
+from fastapi.routing import APIRoute
+from pydantic.fields import ModelField
+from starlette.routing import Match
+
+from models.api_models import ID_FIELD
+
+# Параметры полнотекстового поиска. Анализатор индексов приводит текст
+# к нижнему регистру, поэтому регистр и лишние пробелы на результат не влияют
+CASE_INSENSITIVE_PARAMS = {"query"}
+# Списки со смыслом множества: порядок и повторы значений на выдачу не влияют
+SET_PARAMS = {"filter[genre]", "filter[person]"}
+# Множества, которые передаются одним значением через запятую,
+# и значения, которые в них подразумеваются всегда
+COMMA_SET_PARAMS = {"fields": {ID_FIELD}}
+# Идентификаторы через запятую, порядок и повторы которых ответ сохраняет:
+# приводится к одному виду только запись каждого идентификатора
+COMMA_ID_LIST_PARAMS = {"ids"}
+
+_flat_dependants: Dict[int, Dependant] = {}
+
+
+def get_raw_cache_key(request: Request) -> str:
+    return "?".join([request["path"], request["query_string"].decode("utf-8")])
+
+
+def get_cache_key(
+        request: Request,
+        route: Optional[APIRoute],
+        path_params: dict,
+) -> str:
+    """
+    Ключ кэширования, одинаковый для равнозначных запросов.
+    Строится из провалидированных параметров обработчика с учетом значений
+    по умолчанию: порядок, кодирование и неизвестные параметры запроса
+    на ключ не влияют. Если запрос не проходит валидацию или не относится
+    к обработчикам API, используется путь и строка запроса как есть.
+    :param route: Обработчик запроса, найденный match_route
+    :param path_params: Параметры пути, найденные match_route
+    """
+    if route is None:
+        return get_raw_cache_key(request)
+
+    dependant = _get_flat_dependant(route)
+    canonical_path_params = {}
+    for field in dependant.path_params:
+        value = _validate(field, path_params.get(field.alias))
+        if value is None:
+            return get_raw_cache_key(request)
+        canonical_path_params[field.name] = value
+
+    query_params = []
+    for field in dependant.query_params:
+        if is_scalar_sequence_field(field):
+            raw_value = request.query_params.getlist(field.alias) or None
+        else:
+            raw_value = request.query_params.get(field.alias)
+
+        if raw_value is None:
+            if field.required:
+                return get_raw_cache_key(request)
+            value = _canonical(field.alias, field.default)
+        else:
+            value = _validate(field, raw_value)
+            if value is None:
+                return get_raw_cache_key(request)
+
+        if value is not None:
+            query_params.append((field.alias, value))
+
+    path = route.path_format.format(**canonical_path_params)
+    return "?".join([path, urlencode(sorted(query_params), doseq=True)])
+
+
+def match_route(request: Request) -> Tuple[Optional[APIRoute], dict]:
+    """Ищет обработчик API, которому роутер передаст запрос"""
+    for route in request.app.router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        match, child_scope = route.matches(request.scope)
+        if match == Match.FULL:
+            return route, child_scope["path_params"]
+    return None, {}
+
+
+def _get_flat_dependant(route: APIRoute) -> Dependant:
+    dependant = _flat_dependants.get(id(route))
+    if dependant is None:
+        dependant = get_flat_dependant(route.dependant)
+        _flat_dependants[id(route)] = dependant
+    return dependant
+
+
+def _validate(field: ModelField, raw_value):
+    value, errors = field.validate(raw_value, {}, loc=("query", field.alias))
+    if errors:
+        return None
+    return _canonical(field.alias, value)
+
+
+def _canonical(alias: str, value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        items = [_canonical(alias, item) for item in value]
+        if alias in SET_PARAMS:
+            items = sorted(set(items))
+        return items
+    if isinstance(value, Enum):
+        value = value.value
+    value = str(value)
+    if alias in CASE_INSENSITIVE_PARAMS:
+        value = " ".join(value.lower().split())
+    if alias in COMMA_SET_PARAMS:
+        items = {item.strip() for item in value.split(",") if item.strip()}
+        value = ",".join(sorted(items | COMMA_SET_PARAMS[alias]))
+    if alias in COMMA_ID_LIST_PARAMS:
+        value = ",".join(
+            _canonical_id(item.strip()) for item in value.split(",") if item.strip()
+        )
+    return value
+
+
+def _canonical_id(value: str) -> str:
+    try:
+        return str(UUID(value))
+    except ValueError:
+        # Запрос с таким идентификатором не пройдет валидацию обработчика
+        return value
@@ -0,0 +1,167 @@
+from typing import Dict, List, Optional, Sequence
+
+import orjson
+from aioredis import Redis
+from elasticsearch import NotFoundError
+
+from services.cache import get_tag_key, get_tag_version_key
+
+# Сохраняет документ, только если его тег не сбрасывали с момента, когда
+# документ начали читать из ES, и добавляет ключ документа в множество тега.
+# KEYS: документ, множество тега, версия тега
+# ARGV: документ, время жизни, версия тега до чтения ("" - версии не было)
+STORE_ENTITY_SCRIPT = """
+if (redis.call("get", KEYS[3]) or "") ~= ARGV[3] then
+    return 0
+end
+redis.call("set", KEYS[1], ARGV[1], "EX", ARGV[2])
+redis.call("sadd", KEYS[2], KEYS[1])
+if redis.call("ttl", KEYS[2]) < tonumber(ARGV[2]) then
+    redis.call("expire", KEYS[2], ARGV[2])
+end
+return 1
+"""
+
+
+class EntityCache:
+    """
+    Кэш документов Elasticsearch в Redis по ключу "entity:<индекс>:<id>".
+    Списки и поиск запрашивают у ES только идентификаторы и собирают
+    документы отсюда, поэтому каждый документ хранится один раз.
+    Ключ документа входит в множество тега "<индекс>:<id>" и удаляется
+    вместе с ответами API, когда ETL сообщает об изменении документа.
+    Документ, прочитанный из ES до такого сообщения, но сохраняемый после
+    него, не сохраняется: иначе устаревшая версия жила бы в кэше до истечения
+    срока. Для этого перед чтением из ES запоминаются версии тегов документов.
+    """
+
+    def __init__(self, redis: Redis, expire: int):
+        """
+        :param expire: Сколько секунд хранится документ
+        """
+        self.redis = redis
+        self.expire = expire
+        self.store_entity = redis.register_script(STORE_ENTITY_SCRIPT)
+
+    async def get_many(self, index: str, ids: Sequence[str]) -> Dict[str, dict]:
+        """Найденные в кэше документы по идентификаторам"""
+        if not ids:
+            return {}
+        values = await self.redis.mget([self._key(index, id_) for id_ in ids])
+        return {
+            id_: orjson.loads(value)
+            for id_, value in zip(ids, values)
+            if value is not None
+        }
+
+    async def get_versions(self, index: str, ids: Sequence[str]) -> Dict[str, bytes]:
+        """Версии тегов документов, которые передаются в set_many"""
+        if not ids:
+            return {}
+        values = await self.redis.mget(
+            [get_tag_version_key(f"{index}:{id_}") for id_ in ids]
+        )
+        return {id_: value for id_, value in zip(ids, values) if value is not None}
+
+    async def set_many(
+            self,
+            index: str,
+            docs: Dict[str, dict],
+            versions: Dict[str, bytes],
+    ) -> None:
+        """
+        :param versions: Версии тегов документов (get_versions),
+            полученные до чтения документов из ES
+        """
+        if not docs:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for id_, doc in docs.items():
+                tag = f"{index}:{id_}"
+                await self.store_entity(
+                    keys=[
+                        self._key(index, id_),
+                        get_tag_key(tag),
+                        get_tag_version_key(tag),
+                    ],
+                    args=[orjson.dumps(doc), self.expire, versions.get(id_, b"")],
+                    client=pipe,
+                )
+            await pipe.execute()
+
+    @staticmethod
+    def _key(index: str, id_: str) -> str:
+        return f"entity:{index}:{id_}"
+
+
+entity_cache: Optional[EntityCache] = None
+
+
+# Функция понадобится при внедрении зависимостей
+async def get_entity_cache() -> EntityCache:
+    return entity_cache
+
+
+async def hydrate(
+        data_source,
+        index: str,
+        ids: Sequence,
+        fields: Optional[Sequence[str]] = None,
+        **kwargs,
+) -> List[Optional[dict]]:
+    """
+    Документы (_source) в порядке идентификаторов, None на месте отсутствующих.
+    Документы берутся из кэша, недостающие - из ES и сохраняются в кэш.
+    :param data_source: Поисковый движок, из которого берутся промахи кэша
+    :param fields: Поля документа, которые нужно вернуть (id возвращается
+        всегда). В кэш и из ES документы загружаются целиком, чтобы кэш
+        годился для любого набора полей
+    :param kwargs: Параметры запроса документов, например _source_excludes.
+        Для одного индекса должны быть всегда одинаковыми
+    """
+    ids = [str(id_) for id_ in ids]
+    docs = {}
+    if entity_cache is not None:
+        docs = await entity_cache.get_many(index, ids)
+
+    missing = sorted(set(ids) - docs.keys())
+    versions = {}
+    if missing and entity_cache is not None:
+        versions = await entity_cache.get_versions(index, missing)
+    loaded = {}
+    if len(missing) == 1:
+        # Одиночный get могут объединить с соседними запросами (ES_BATCHING)
+        try:
+            doc = await data_source.get(index=index, id=missing[0], **kwargs)
+            loaded[doc["_id"]] = doc["_source"]
+        except NotFoundError:
+            pass
+    elif missing:
+        response = await data_source.mget(
+            index=index,
+            body={"ids": missing},
+            **kwargs,
+        )
+        loaded = {
+            doc["_id"]: doc["_source"]
+            for doc in response["docs"]
+            if doc.get("found")
+        }
+
+    if loaded and entity_cache is not None:
+        await entity_cache.set_many(index, loaded, versions)
+    docs.update(loaded)
+    if fields is not None:
+        return [project(docs.get(id_), fields) for id_ in ids]
+    return [docs.get(id_) for id_ in ids]
+
+
+def project(doc: Optional[dict], fields: Sequence[str]) -> Optional[dict]:
+    """Документ только с указанными полями и идентификатором"""
+    if doc is None:
+        return None
+    return {
+        name: doc[name]
+        for name in ("id", *fields)
+        if name in doc
+    }
@@ -1,50 +1,205 @@
-# services/films.py queries
-FILMS_QUERY = {
-    "query": {"match_all": {}},
-    "_source": ["id", "title", "imdb_rating"],
-}
-GENRE_FILTERED_FILMS_QUERY = {
-    "query": {
-        "nested": {
-            "path": "genre",
-            "query": {
-                "match": {},
-            },
+from typing import Iterable, List, Optional
+
+from pydantic import UUID4
+
+# Запросы списков возвращают только идентификаторы документов,
+# сами документы собираются из кэша сущностей (services/entity_cache.py).
+#
+# Постоянные части запросов собираются один раз при импорте модуля и общие
+# для всех запросов, поэтому их нельзя изменять. Функции ниже на каждый
+# запрос создают новый словарь верхнего уровня, куда подставляются параметры:
+# одновременные запросы не видят параметров друг друга, а from, sort и
+# search_after не переходят из одного запроса в другой.
+# sort и page - результаты ESQueryParameters.get_es_sorting
+# и ESQueryParameters.get_es_page_parameters
+
+MATCH_ALL = {"match_all": {}}
+FILMS_SEARCH_FIELDS = ("title", "description")
+# Подполя search_as_you_type: префиксы слов и сочетаний из двух и трех слов
+FILMS_SUGGEST_FIELDS = ("title.suggest", "title.suggest._2gram", "title.suggest._3gram")
+FILMS_SUGGEST_SOURCE = ("title", "imdb_rating")
+PERSONS_SUGGEST_FIELDS = ("name.suggest", "name.suggest._2gram", "name.suggest._3gram")
+PERSONS_SUGGEST_SOURCE = ("name",)
+# Из ответа на запрос подсказок ES оставляет только идентификаторы и документы
+SUGGEST_FILTER_PATH = "hits.hits._id,hits.hits._source"
+
+
+# Ширина интервала гистограммы рейтинга в фасетах фильмов
+RATING_FACET_INTERVAL = 1
+# Сколько жанров с наибольшим числом фильмов отдается в фасетах
+GENRE_FACETS_SIZE = 100
+FILM_FACETS_AGGREGATIONS = {
+    "genres": {"terms": {"field": "genre_ids", "size": GENRE_FACETS_SIZE}},
+    "imdb_rating": {
+        "histogram": {
+            "field": "imdb_rating",
+            "interval": RATING_FACET_INTERVAL,
+            "min_doc_count": 0,
+            "extended_bounds": {"min": 0, "max": 10},
         },
     },
-    "_source": ["id", "title", "imdb_rating"],
-}
-FILMS_SEARCH_QUERY = {
-    "query": {
-        "multi_match": {
-            "query": None,
-            "fields": [
-                "title",
-                "description",
-            ],
-        }
-    },
-    "_source": ["id", "title", "imdb_rating"],
 }
 
-# services/genres.py queries
-GENRES_QUERY = {
-    "query": {"match_all": {}},
-    "_source": ["id", "name"],
-}
+# Общее число найденных документов API не отдает. Без его подсчета ES
+# может закончить поиск, набрав страницу, а если сортировка запроса
+# совпадает с сортировкой индекса (фильмы по рейтингу, см.
+# etl/index/movies.json), то прочитав только начало индекса
+LISTING_PARAMETERS = {"_source": False, "track_total_hits": False}
 
-# services/persons.py queries
-PERSONS_SEARCH_QUERY = {
-    "query": {
-        "match": {
-            "name": {
-                "query": None,
+
+def match_all_query(sort: Iterable[dict], page: dict) -> dict:
+    """Все документы индекса"""
+    return {"query": MATCH_ALL, "sort": sort, **LISTING_PARAMETERS, **page}
+
+
+# services/films.py queries
+def filtered_films_query(
+        filters: List[dict],
+        sort: Iterable[dict],
+        page: dict,
+) -> dict:
+    """
+    Фильмы, подходящие под все фильтры. Фильтры выполняются в контексте
+    filter: ES не считает релевантность, которая все равно не нужна при
+    сортировке по полю, и кэширует результат каждого фильтра.
+    Жанры и персоны фильтруются по плоским полям genre_ids и person_ids
+    без nested-запросов
+    """
+    return {
+        "query": {"bool": {"filter": filters}},
+        "sort": sort,
+        **LISTING_PARAMETERS,
+        **page,
+    }
+
+
+def films_filters(
+        genre_ids: Optional[List[UUID4]],
+        genre_match_all: bool,
+        person_ids: Optional[List[UUID4]],
+        rating_gte: Optional[float],
+        rating_lte: Optional[float],
+) -> List[dict]:
+    """Фильтры списка фильмов, пустой список - без фильтрации"""
+    filters = []
+    if genre_ids:
+        filters.extend(genres_filter(genre_ids, genre_match_all))
+    if person_ids:
+        filters.append(persons_filter(person_ids))
+    if rating_gte is not None or rating_lte is not None:
+        filters.append(rating_filter(rating_gte, rating_lte))
+    return filters
+
+
+def film_facets_query(filters: List[dict]) -> dict:
+    """
+    Агрегации по фильмам, подходящим под фильтры. Документы не нужны,
+    а общее число фильмов нужно, поэтому оно считается точно
+    """
+    query = {"bool": {"filter": filters}} if filters else MATCH_ALL
+    return {
+        "query": query,
+        "aggs": FILM_FACETS_AGGREGATIONS,
+        "size": 0,
+        "track_total_hits": True,
+    }
+
+
+def genres_filter(genre_ids: Iterable[UUID4], match_all: bool) -> List[dict]:
+    """Фильм относится к одному из жанров или, если match_all, ко всем"""
+    genre_ids = [str(genre_id) for genre_id in genre_ids]
+    if match_all:
+        return [{"term": {"genre_ids": genre_id}} for genre_id in genre_ids]
+    return [{"terms": {"genre_ids": genre_ids}}]
+
+
+def persons_filter(person_ids: Iterable[UUID4]) -> dict:
+    """В фильме участвовала одна из персон в любой роли"""
+    return {"terms": {"person_ids": [str(person_id) for person_id in person_ids]}}
+
+
+def rating_filter(gte: Optional[float], lte: Optional[float]) -> dict:
+    bounds = {"gte": gte, "lte": lte}
+    return {
+        "range": {
+            "imdb_rating": {
+                name: value for name, value in bounds.items()
+                if value is not None
             },
-        }
+        },
     }
-}
 
-PERSONS_QUERY = {
-    "query": {"match_all": {}},
-    "_source": ["id", "name"],
-}
+
+def films_by_ids_query(
+        film_ids: Iterable[str],
+        sort: Iterable[dict],
+        page: dict,
+) -> dict:
+    return {
+        "query": {"bool": {"filter": [{"terms": {"id": list(film_ids)}}]}},
+        "sort": sort,
+        **LISTING_PARAMETERS,
+        **page,
+    }
+
+
+def films_search_query(search_string: str, page: dict) -> dict:
+    return {
+        "query": {
+            "multi_match": {
+                "query": search_string,
+                "fields": FILMS_SEARCH_FIELDS,
+            },
+        },
+        "_source": False,
+        **page,
+    }
+
+
+def films_suggest_query(prefix: str, size: int) -> dict:
+    return suggest_query(prefix, size, FILMS_SUGGEST_FIELDS, FILMS_SUGGEST_SOURCE)
+
+
+# services/persons.py queries
+def persons_search_query(search_string: str, page: dict) -> dict:
+    return {
+        "query": {"match": {"name": {"query": search_string}}},
+        "_source": False,
+        **page,
+    }
+
+
+def persons_suggest_query(prefix: str, size: int) -> dict:
+    return suggest_query(prefix, size, PERSONS_SUGGEST_FIELDS, PERSONS_SUGGEST_SOURCE)
+
+
+# services/search.py queries
+def genres_search_query(search_string: str, page: dict) -> dict:
+    return {
+        "query": {"match": {"name": {"query": search_string}}},
+        "_source": False,
+        **page,
+    }
+
+
+def suggest_query(
+        prefix: str,
+        size: int,
+        suggest_fields: Iterable[str],
+        source: Iterable[str],
+) -> dict:
+    """
+    Подсказки по началу фразы. В отличие от остальных запросов документы
+    возвращаются сразу, но только с полями source, нужными для подсказки
+    """
+    return {
+        "query": {
+            "multi_match": {
+                "query": prefix,
+                "type": "bool_prefix",
+                "fields": suggest_fields,
+            },
+        },
+        "_source": source,
+        "size": size,
+    }
@@ -1,17 +1,28 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Уникальное поле, которым дополняется сортировка, чтобы порядок документов
+# с одинаковыми значениями был стабильным между запросами страниц
+TIEBREAKER_SORT_FIELD = "id"
+
+
 class ESQueryParameters:
     @staticmethod
-    def get_es_sorting(sort_field_string: str) -> list:
-        """Метод для получения параметров сотрировки в запросе к ES"""
-        sorting = []
+    @lru_cache()
+    def get_es_sorting(sort_field_string: str) -> Tuple[dict, ...]:
+        """
+        Метод для получения параметров сотрировки в запросе к ES.
+        Результат кэшируется и общий для всех запросов, его нельзя изменять
+        """
         # Если значение параметра sort начинается с "-",
-        # сортируеми по убыванию
+        # сортируеми по убыванию, иначе - по возрастанию
         if sort_field_string[0] == "-":
-            sorting.append({sort_field_string[1:]: "desc"})
-            return sorting
-        # Если значение параметра sort начинается не с  "-",
-        # сортируем по возрастанию
-        sorting.append({sort_field_string: "asc"})
-        return sorting
+            field, order = sort_field_string[1:], "desc"
+        else:
+            field, order = sort_field_string, "asc"
+        if field == TIEBREAKER_SORT_FIELD:
+            return ({field: order},)
+        return {field: order}, {TIEBREAKER_SORT_FIELD: order}
 
     @staticmethod
     def get_es_pagination_parameters(p_size: int, p_number: int) -> dict:
@@ -20,3 +31,26 @@ class ESQueryParameters:
         p_number -= 1
         params_dict["from"] = p_size * p_number
         return params_dict
+
+    @staticmethod
+    def get_es_page_parameters(
+            p_size: int,
+            p_number: int,
+            search_after: Optional[list] = None,
+    ) -> dict:
+        """
+        Параметры страницы для запроса в ES: по номеру страницы
+        или, если передан search_after, следующей за документом с этими
+        значениями сортировки. Во втором случае стоимость запроса
+        не зависит от глубины страницы
+        """
+        if search_after is not None:
+            return {"size": p_size, "search_after": search_after}
+        return ESQueryParameters.get_es_pagination_parameters(p_size, p_number)
+
+    @staticmethod
+    def get_search_after(hits: List[dict], p_size: int) -> Optional[list]:
+        """Значения сортировки для запроса следующей страницы"""
+        if not hits or len(hits) < p_size:
+            return None
+        return hits[-1].get("sort")
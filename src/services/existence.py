@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import math
+from typing import Dict, Iterable, Optional
+
+from aioredis import Redis
+
+from utilites.bloom_filter import BloomFilter
+
+
+class ExistenceFilters:
+    """
+    Фильтры Блума с идентификаторами всех документов индексов.
+    Фильтры строит ETL и хранит в Redis: биты в ключе "bloom:<индекс>",
+    размер и количество хэш-функций в хэше "bloom:<индекс>:params".
+    Пока фильтр индекса не загружен, любой документ считается существующим.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._filters: Dict[str, BloomFilter] = {}
+
+    def might_contain(self, index: str, id_) -> bool:
+        """
+        Проверяет, может ли документ быть в индексе.
+        :return: False, только если документа в индексе точно нет
+        """
+        bloom_filter = self._filters.get(index)
+        return bloom_filter is None or str(id_) in bloom_filter
+
+    def add(self, index: str, ids: Iterable[str]) -> None:
+        """Добавляет в загруженный фильтр документы, о которых сообщил ETL"""
+        bloom_filter = self._filters.get(index)
+        if bloom_filter is not None:
+            bloom_filter.update(ids)
+
+    async def load(self, index: str) -> Optional[BloomFilter]:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.get(self._bits_key(index))
+            pipe.hgetall(self._params_key(index))
+            bits, params = await pipe.execute()
+
+        if bits is None or not params:
+            self._filters.pop(index, None)
+            return None
+
+        size, hashes = int(params[b"size"]), int(params[b"hashes"])
+        bloom_filter = BloomFilter(
+            size, hashes, bits.ljust(math.ceil(size / 8), b"\0"))
+        self._filters[index] = bloom_filter
+        return bloom_filter
+
+    async def keep_loaded(self, indexes: Iterable[str], interval: float) -> None:
+        """Периодически перезагружает фильтры, перестроенные ETL"""
+        while True:
+            for index in indexes:
+                try:
+                    await self.load(index)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logging.exception("Existence filter for %s not loaded", index)
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _bits_key(index: str) -> str:
+        return f"bloom:{index}"
+
+    @staticmethod
+    def _params_key(index: str) -> str:
+        return f"bloom:{index}:params"
+
+
+existence_filters: Optional[ExistenceFilters] = None
+existence_filters_loader: Optional[asyncio.Task] = None
+
+
+# Функция понадобится при внедрении зависимостей
+async def get_existence_filters() -> ExistenceFilters:
+    return existence_filters
+
+
+def might_exist(index: str, id_) -> bool:
+    """
+    Проверяет по фильтру индекса, стоит ли искать документ в Elasticsearch.
+    До запуска приложения фильтров нет, и проверка всегда проходит
+    """
+    return existence_filters is None or existence_filters.might_contain(index, id_)
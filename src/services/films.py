@@ -1,27 +1,55 @@
 from functools import lru_cache
 from typing import List, Optional, Type
 
-from elasticsearch import NotFoundError
 from fastapi import Depends
 from pydantic import UUID4
 
 from core.config import config
 from db.elastic import get_elastic
-from models.es_models import ESFilm
+from models.es_models import (
+    ESFilm,
+    ESFilmFacets,
+    ESGenreFacet,
+    ESPage,
+    ESRatingFacet,
+)
+from services import list_views
 from services.abstract_services import (
     APIAbstractServiceFactory,
     APIAsyncSearchEngine,
     APIServiceListable,
     APIServiceSearchable,
 )
+from services.cache import tag_response
+from services.entity_cache import hydrate
 from services.es_queries import (
-    FILMS_QUERY,
-    FILMS_SEARCH_QUERY,
-    GENRE_FILTERED_FILMS_QUERY,
+    RATING_FACET_INTERVAL,
+    SUGGEST_FILTER_PATH,
+    film_facets_query,
+    films_by_ids_query,
+    films_filters,
+    films_search_query,
+    films_suggest_query,
+    filtered_films_query,
+    match_all_query,
 )
 from services.es_query_parameters import ESQueryParameters
+from services.existence import might_exist
+from services.genres import GenreService
 
-FILM_CACHE_EXPIRE_IN_SECONDS = 5  # 5 секунд
+FILM_SEARCH_CACHE_EXPIRE_IN_SECONDS = 5  # 5 секунд
+FILM_SUGGEST_CACHE_EXPIRE_IN_SECONDS = 30  # 30 секунд
+# Фасеты сбрасываются при любой загрузке фильмов из ETL
+FILM_FACETS_CACHE_EXPIRE_IN_SECONDS = 60 * 60 * 24  # 1 сутки
+# Поля, нужные только для поиска и фильтрации, в API не отдаются
+FILM_SOURCE_EXCLUDES = [
+    "actors_names",
+    "writers_names",
+    "genre_ids",
+    "person_ids",
+]
+# Сортировка списков фильмов, которые ETL поддерживает в Redis
+LIST_VIEWS_SORT_FIELD = "-imdb_rating"
 
 
 class FilmService(APIServiceListable, APIServiceSearchable):
@@ -35,70 +63,231 @@ class FilmService(APIServiceListable, APIServiceSearchable):
             self,
             object_id: UUID4,
             model: Type[ESFilm] = ESFilm,
+            fields: List[str] = None,
     ) -> Optional[ESFilm]:
-        try:
-            doc = await self.data_source.get(
-                index=self.ES_INDEX_NAME,
-                id=object_id,
-                _source_excludes=[
-                    "actors_names",
-                    "writers_names",
-                ],
-            )
-        except NotFoundError:
+        tag_response(f"{self.ES_INDEX_NAME}:{object_id}")
+        # Неизвестные идентификаторы отсекаем без запроса к Elasticsearch
+        if not might_exist(self.ES_INDEX_NAME, object_id):
             return None
-        return model(**doc["_source"])
+        films = await self._hydrate([object_id], model, fields)
+        return films[0]
+
+    # get_by_ids возвращает объекты в порядке идентификаторов,
+    # None на месте отсутствующих. Промахи кэша запрашиваются одним mget
+    async def get_by_ids(
+            self,
+            object_ids: List[UUID4],
+            model: Type[ESFilm] = ESFilm,
+            fields: List[str] = None,
+    ) -> List[Optional[ESFilm]]:
+        tag_response(*(f"{self.ES_INDEX_NAME}:{id_}" for id_ in object_ids))
+        # Неизвестные идентификаторы отсекаем без запроса к Elasticsearch
+        ids = [
+            str(id_) for id_ in object_ids
+            if might_exist(self.ES_INDEX_NAME, id_)
+        ]
+        found = dict(zip(ids, await self._hydrate(ids, model, fields)))
+        return [found.get(str(id_)) for id_ in object_ids]
 
-    # Возвращает список фильмов, отсортированный по указанному полю
+    # Возвращает страницу фильмов, отсортированных по указанному полю.
+    # Фильмы можно отфильтровать по жанрам (одному из или, если
+    # genre_match_all, всем), персонам (одной из) и диапазону рейтинга
     async def get_all(
             self,
             sort_field: str,
-            filter_field: UUID4 = None,
+            genre_ids: List[UUID4] = None,
+            genre_match_all: bool = False,
+            person_ids: List[UUID4] = None,
+            rating_gte: float = None,
+            rating_lte: float = None,
             page_size: int = None,
             page_number: int = None,
             model: Type[ESFilm] = ESFilm,
-    ) -> List[ESFilm]:
-        if not filter_field:
-            query = FILMS_QUERY
-        else:
-            query = GENRE_FILTERED_FILMS_QUERY
-            match_dict = {"genre.id": filter_field}
-            query["query"]["nested"]["query"]["match"] = match_dict
-
-        # Дополняем запрос параметрами пагинации,
-        # если указаны page_size и page_number
-        query.update(
-            ESQueryParameters.get_es_pagination_parameters(
+            search_after: list = None,
+            fields: List[str] = None,
+    ) -> ESPage:
+        tag_response(self.ES_INDEX_NAME)
+        # Все фильмы и фильмы одного жанра по убыванию рейтинга
+        # берутся из списков в Redis, если ETL их уже построил
+        if (
+                sort_field == LIST_VIEWS_SORT_FIELD
+                and len(genre_ids or []) <= 1
+                and not person_ids
+                and rating_gte is None
+                and rating_lte is None
+        ):
+            view_page = await self._get_page_from_views(
+                str(genre_ids[0]) if genre_ids else None,
                 page_size,
                 page_number,
+                model,
+                search_after,
+                fields,
             )
+            if view_page is not None:
+                return view_page
+
+        sort = ESQueryParameters.get_es_sorting(sort_field)
+        # Параметры пагинации: по номеру страницы или по значениям
+        # сортировки последнего фильма предыдущей страницы
+        page = ESQueryParameters.get_es_page_parameters(
+            page_size,
+            page_number,
+            search_after,
+        )
+        filters = films_filters(
+            genre_ids,
+            genre_match_all,
+            person_ids,
+            rating_gte,
+            rating_lte,
         )
-        query["sort"] = ESQueryParameters.get_es_sorting(sort_field)
+        if not filters:
+            query = match_all_query(sort, page)
+        else:
+            query = filtered_films_query(filters, sort, page)
 
         raw_data = await self.data_source.search(
             index=self.ES_INDEX_NAME,
             body=query,
         )
 
-        return_data = [
-            model(**hit["_source"]) for hit in raw_data["hits"]["hits"]
-        ]
-        return return_data
+        hits = raw_data["hits"]["hits"]
+        films = await self._hydrate(
+            [hit["_id"] for hit in hits],
+            model,
+            fields,
+        )
+        return ESPage(
+            items=[film for film in films if film],
+            search_after=ESQueryParameters.get_search_after(hits, page_size),
+        )
 
+    # Страница списка фильмов из Redis. None - список недоступен
+    # или курсор не продолжается по нему, страницу отдает ES
+    async def _get_page_from_views(
+            self,
+            genre_id: Optional[str],
+            page_size: int,
+            page_number: int,
+            model: Type[ESFilm],
+            search_after: list = None,
+            fields: List[str] = None,
+    ) -> Optional[ESPage]:
+        views = list_views.film_rating_views
+        if views is None:
+            return None
+        if search_after is not None:
+            start = await views.get_position_after(genre_id, search_after)
+            if start is None:
+                return None
+        else:
+            start = page_size * (page_number - 1)
+
+        items = await views.get_page(genre_id, start, page_size)
+        if items is None:
+            return None
+        films = await self._hydrate(
+            [film_id for film_id, _ in items],
+            model,
+            fields,
+        )
+        return ESPage(
+            items=[film for film in films if film],
+            search_after=views.get_search_after(items, page_size),
+        )
+
+    # Возвращает число фильмов по жанрам и интервалам рейтинга
+    # с теми же фильтрами, что и у get_all
+    async def get_facets(
+            self,
+            genre_service: GenreService,
+            genre_ids: List[UUID4] = None,
+            genre_match_all: bool = False,
+            person_ids: List[UUID4] = None,
+            rating_gte: float = None,
+            rating_lte: float = None,
+    ) -> ESFilmFacets:
+        tag_response(self.ES_INDEX_NAME)
+        query = film_facets_query(
+            films_filters(
+                genre_ids,
+                genre_match_all,
+                person_ids,
+                rating_gte,
+                rating_lte,
+            )
+        )
+        raw_data = await self.data_source.search(
+            index=self.ES_INDEX_NAME,
+            body=query,
+        )
+
+        aggregations = raw_data["aggregations"]
+        genre_buckets = aggregations["genres"]["buckets"]
+        genres = await genre_service.get_by_ids(
+            [bucket["key"] for bucket in genre_buckets],
+        )
+        return ESFilmFacets(
+            total=raw_data["hits"]["total"]["value"],
+            genres=[
+                ESGenreFacet(**genre.dict(), count=bucket["doc_count"])
+                for genre, bucket in zip(genres, genre_buckets)
+                if genre
+            ],
+            imdb_rating=[
+                ESRatingFacet(
+                    gte=bucket["key"],
+                    lt=bucket["key"] + RATING_FACET_INTERVAL,
+                    count=bucket["doc_count"],
+                )
+                for bucket in aggregations["imdb_rating"]["buckets"]
+            ],
+        )
+
+    # Возвращает страницу фильмов из указанного набора,
+    # отсортированных по указанному полю
     async def get_list(
             self,
             objects_list: List[UUID4],
             model: Type[ESFilm] = ESFilm,
+            sort_field: str = "-imdb_rating",
             page_size: int = None,
             page_number: int = None,
-    ) -> List[ESFilm]:
-        films = await self.data_source.mget(
-            index="movies",
-            _source=["id", "title", "imdb_rating"],
-            body={"ids": objects_list},
+            search_after: list = None,
+            fields: List[str] = None,
+    ) -> ESPage:
+        tag_response(*(f"{self.ES_INDEX_NAME}:{id_}" for id_ in objects_list))
+        if not objects_list:
+            return ESPage(items=[], search_after=None)
+
+        # Набор фильмов задается фильтром, поэтому сортировка и пагинация
+        # выполняются в ES, и в ответ попадает только запрошенная страница
+        query = films_by_ids_query(
+            (str(id_) for id_ in objects_list),
+            ESQueryParameters.get_es_sorting(sort_field),
+            ESQueryParameters.get_es_page_parameters(
+                page_size,
+                page_number,
+                search_after,
+            ),
+        )
+
+        raw_data = await self.data_source.search(
+            index=self.ES_INDEX_NAME,
+            body=query,
+        )
+
+        hits = raw_data["hits"]["hits"]
+        films = await self._hydrate(
+            [hit["_id"] for hit in hits],
+            model,
+            fields,
+        )
+        return ESPage(
+            items=[film for film in films if film],
+            search_after=ESQueryParameters.get_search_after(hits, page_size),
         )
-        return_data = [model(**doc["_source"]) for doc in films["docs"]]
-        return return_data
 
     async def search(
             self,
@@ -106,15 +295,15 @@ class FilmService(APIServiceListable, APIServiceSearchable):
             page_size: int = None,
             page_number: int = None,
             model: Type[ESFilm] = ESFilm,
+            fields: List[str] = None,
     ) -> List[ESFilm]:
-
-        query = FILMS_SEARCH_QUERY
-        query["query"]["multi_match"]["query"] = search_string
-        query.update(
+        tag_response(self.ES_INDEX_NAME)
+        query = films_search_query(
+            search_string,
             ESQueryParameters.get_es_pagination_parameters(
                 page_size,
                 page_number,
-            )
+            ),
         )
 
         raw_data = await self.data_source.search(
@@ -122,10 +311,48 @@ class FilmService(APIServiceListable, APIServiceSearchable):
             body=query,
         )
 
-        return_data = [
-            model(**hit["_source"]) for hit in raw_data["hits"]["hits"]
-        ]
-        return return_data
+        hits = raw_data["hits"]["hits"]
+        films = await self._hydrate(
+            [hit["_id"] for hit in hits],
+            model,
+            fields,
+        )
+        return [film for film in films if film]
+
+    # Подсказки по началу названия. Документы с несколькими полями
+    # берутся прямо из ответа ES, без кэша сущностей
+    async def suggest(
+            self,
+            prefix: str,
+            size: int,
+            model: Type[ESFilm] = ESFilm,
+    ) -> List[ESFilm]:
+        tag_response(self.ES_INDEX_NAME)
+        raw_data = await self.data_source.search(
+            index=self.ES_INDEX_NAME,
+            body=films_suggest_query(prefix, size),
+            filter_path=SUGGEST_FILTER_PATH,
+        )
+        # При пустом результате filter_path убирает и сам список hits
+        hits = raw_data.get("hits", {}).get("hits", [])
+        return [model(**{**hit["_source"], "id": hit["_id"]}) for hit in hits]
+
+    # Документы фильмов по идентификаторам из кэша сущностей,
+    # недостающие запрашиваются у ES
+    async def _hydrate(
+            self,
+            ids: List,
+            model: Type[ESFilm],
+            fields: List[str] = None,
+    ) -> List[Optional[ESFilm]]:
+        docs = await hydrate(
+            self.data_source,
+            self.ES_INDEX_NAME,
+            ids,
+            fields,
+            _source_excludes=FILM_SOURCE_EXCLUDES,
+        )
+        return [model(**doc) if doc else None for doc in docs]
 
 
 class APIFilmServiceFactory(APIAbstractServiceFactory):
@@ -1,20 +1,24 @@
 from functools import lru_cache
 from typing import List, Optional, Type
 
-from elasticsearch import NotFoundError
 from fastapi import Depends
 from pydantic import UUID4
 
 from core.config import config
 from db.elastic import get_elastic
-from models.es_models import ESGenre
+from models.es_models import ESGenre, ESPage
 from services.abstract_services import (
     APIAbstractServiceFactory, 
     APIAsyncSearchEngine, 
     APIService,
 )
-from services.es_queries import GENRES_QUERY
+from services.cache import tag_response
+from services.entity_cache import hydrate
+from services.es_queries import match_all_query
 from services.es_query_parameters import ESQueryParameters
+from services.existence import might_exist
+
+GENRE_CACHE_EXPIRE_IN_SECONDS = 60 * 60  # 1 час
 
 
 class GenreService(APIService):
@@ -26,37 +30,80 @@ class GenreService(APIService):
             self,
             object_id: UUID4,
             model: Type[ESGenre] = ESGenre,
+            fields: List[str] = None,
     ) -> Optional[ESGenre]:
-        try:
-            doc = await self.data_source.get(
-                index=self.ES_INDEX_NAME,
-                id=object_id,
-            )
-        except NotFoundError:
+        tag_response(f"{self.ES_INDEX_NAME}:{object_id}")
+        # Неизвестные идентификаторы отсекаем без запроса к Elasticsearch
+        if not might_exist(self.ES_INDEX_NAME, object_id):
             return None
-        return model(**doc["_source"])
+        genres = await self._hydrate([object_id], model, fields)
+        return genres[0]
+
+    # get_by_ids возвращает объекты в порядке идентификаторов,
+    # None на месте отсутствующих. Промахи кэша запрашиваются одним mget
+    async def get_by_ids(
+            self,
+            object_ids: List[UUID4],
+            model: Type[ESGenre] = ESGenre,
+            fields: List[str] = None,
+    ) -> List[Optional[ESGenre]]:
+        tag_response(*(f"{self.ES_INDEX_NAME}:{id_}" for id_ in object_ids))
+        # Неизвестные идентификаторы отсекаем без запроса к Elasticsearch
+        ids = [
+            str(id_) for id_ in object_ids
+            if might_exist(self.ES_INDEX_NAME, id_)
+        ]
+        found = dict(zip(ids, await self._hydrate(ids, model, fields)))
+        return [found.get(str(id_)) for id_ in object_ids]
 
     async def get_all(
             self,
             page_size: int,
             page_number: int,
             model: Type[ESGenre] = ESGenre,
-    ) -> List[ESGenre]:
-        query = GENRES_QUERY
-        query.update(
-            ESQueryParameters.get_es_pagination_parameters(
+            search_after: list = None,
+            fields: List[str] = None,
+    ) -> ESPage:
+        tag_response(self.ES_INDEX_NAME)
+        query = match_all_query(
+            # Постраничный обход требует стабильного порядка документов
+            ESQueryParameters.get_es_sorting("id"),
+            ESQueryParameters.get_es_page_parameters(
                 page_size,
                 page_number,
-            )
+                search_after,
+            ),
         )
         raw_data = await self.data_source.search(
             index=self.ES_INDEX_NAME,
             body=query,
         )
-        return_data = [
-            model(**hit["_source"]) for hit in raw_data["hits"]["hits"]
-        ]
-        return return_data
+        hits = raw_data["hits"]["hits"]
+        genres = await self._hydrate(
+            [hit["_id"] for hit in hits],
+            model,
+            fields,
+        )
+        return ESPage(
+            items=[genre for genre in genres if genre],
+            search_after=ESQueryParameters.get_search_after(hits, page_size),
+        )
+
+    # Документы по идентификаторам из кэша сущностей,
+    # недостающие запрашиваются у ES
+    async def _hydrate(
+            self,
+            ids: List,
+            model: Type[ESGenre],
+            fields: List[str] = None,
+    ) -> List[Optional[ESGenre]]:
+        docs = await hydrate(
+            self.data_source,
+            self.ES_INDEX_NAME,
+            ids,
+            fields,
+        )
+        return [model(**doc) if doc else None for doc in docs]
 
 
 class APIGenreServiceFactory(APIAbstractServiceFactory):
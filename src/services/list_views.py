@@ -0,0 +1,89 @@
+import math
+from typing import List, Optional, Tuple
+
+from aioredis import Redis
+
+# Ключи строит и обновляет ETL (etl/lib/providers/list_views.py)
+RATING_VIEW_KEY = "films:rating"
+GENRE_VIEW_KEY_PREFIX = "films:rating:genre:"
+VIEW_READY_KEY = "films:rating:ready"
+# Значение сортировки ES для фильмов без рейтинга
+MISSING_RATING_SORT_VALUE = "-Infinity"
+
+
+class FilmRatingViews:
+    """
+    Списки фильмов по убыванию рейтинга, которые ETL поддерживает в Redis:
+    все фильмы в сортированном множестве "films:rating" и фильмы каждого
+    жанра в "films:rating:genre:<id>". Оценка - рейтинг фильма, фильмы
+    с одинаковым рейтингом упорядочены по убыванию идентификатора, как
+    и в сортировке ES. Страница любой глубины читается без запроса к ES.
+    Пока ETL не построил списки, методы возвращают None.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    async def get_page(
+            self,
+            genre_id: Optional[str],
+            start: int,
+            size: int,
+    ) -> Optional[List[Tuple[str, float]]]:
+        """
+        Идентификаторы и рейтинги фильмов страницы
+        :param genre_id: Жанр фильмов, None - все фильмы
+        :param start: Позиция первого фильма страницы
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.exists(VIEW_READY_KEY)
+            pipe.zrevrange(self._key(genre_id), start, start + size - 1, withscores=True)
+            ready, items = await pipe.execute()
+        if not ready:
+            return None
+        return [(member.decode(), score) for member, score in items]
+
+    async def get_position_after(
+            self,
+            genre_id: Optional[str],
+            search_after: list,
+    ) -> Optional[int]:
+        """
+        Позиция фильма, следующего за курсором страницы [рейтинг, id].
+        None, если курсор нельзя продолжить по списку: фильма нет в списке
+        или его рейтинг изменился после выдачи курсора
+        """
+        try:
+            rating, film_id = float(search_after[0]), str(search_after[1])
+        except (IndexError, TypeError, ValueError):
+            return None
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.exists(VIEW_READY_KEY)
+            pipe.zrevrank(self._key(genre_id), film_id)
+            pipe.zscore(self._key(genre_id), film_id)
+            ready, rank, score = await pipe.execute()
+        if not ready or rank is None or score != rating:
+            return None
+        return rank + 1
+
+    @staticmethod
+    def get_search_after(items: List[Tuple[str, float]], size: int) -> Optional[list]:
+        """Курсор следующей страницы в том же виде, что и у ES"""
+        if not items or len(items) < size:
+            return None
+        film_id, score = items[-1]
+        return [score if math.isfinite(score) else MISSING_RATING_SORT_VALUE, film_id]
+
+    @staticmethod
+    def _key(genre_id: Optional[str]) -> str:
+        if genre_id is None:
+            return RATING_VIEW_KEY
+        return f"{GENRE_VIEW_KEY_PREFIX}{genre_id}"
+
+
+film_rating_views: Optional[FilmRatingViews] = None
+
+
+# Функция понадобится при внедрении зависимостей
+async def get_film_rating_views() -> FilmRatingViews:
+    return film_rating_views
@@ -1,23 +1,34 @@
 from functools import lru_cache
 from typing import List, Optional, Type
 
-from elasticsearch import AsyncElasticsearch, NotFoundError
+from elasticsearch import AsyncElasticsearch
 from fastapi import Depends
 from pydantic import UUID4
 
 from core.config import config
 from db.elastic import get_elastic
-from models.es_models import ESFilm, ESPerson
+from models.es_models import ESFilm, ESPage, ESPerson
 from services.abstract_services import (
     APIAbstractServiceFactory,
     APIAsyncSearchEngine,
     APIServiceListable,
     APIServiceSearchable,
 )
-from services.es_queries import PERSONS_SEARCH_QUERY, PERSONS_QUERY
+from services.cache import tag_response
+from services.entity_cache import hydrate
+from services.es_queries import (
+    SUGGEST_FILTER_PATH,
+    match_all_query,
+    persons_search_query,
+    persons_suggest_query,
+)
 from services.es_query_parameters import ESQueryParameters
+from services.existence import might_exist
 from services.films import FilmService
 
+PERSON_SEARCH_CACHE_EXPIRE_IN_SECONDS = 5  # 5 секунд
+PERSON_SUGGEST_CACHE_EXPIRE_IN_SECONDS = 30  # 30 секунд
+
 
 class PersonService(APIServiceListable, APIServiceSearchable):
     def __init__(self, data_source: APIAsyncSearchEngine) -> None:
@@ -29,39 +40,64 @@ class PersonService(APIServiceListable, APIServiceSearchable):
             self,
             object_id: UUID4,
             model: Type[ESPerson] = ESPerson,
+            fields: List[str] = None,
     ) -> Optional[ESPerson]:
-        try:
-            doc = await self.data_source.get(
-                index=self.ES_INDEX_NAME,
-                id=str(object_id),
-            )
-            return_data = model(**doc["_source"])
-        except NotFoundError:
+        tag_response(f"{self.ES_INDEX_NAME}:{object_id}")
+        # Неизвестные идентификаторы отсекаем без запроса к Elasticsearch
+        if not might_exist(self.ES_INDEX_NAME, object_id):
             return None
+        persons = await self._hydrate([object_id], model, fields)
+        return persons[0]
 
-        return return_data
+    # get_by_ids возвращает объекты в порядке идентификаторов,
+    # None на месте отсутствующих. Промахи кэша запрашиваются одним mget
+    async def get_by_ids(
+            self,
+            object_ids: List[UUID4],
+            model: Type[ESPerson] = ESPerson,
+            fields: List[str] = None,
+    ) -> List[Optional[ESPerson]]:
+        tag_response(*(f"{self.ES_INDEX_NAME}:{id_}" for id_ in object_ids))
+        # Неизвестные идентификаторы отсекаем без запроса к Elasticsearch
+        ids = [
+            str(id_) for id_ in object_ids
+            if might_exist(self.ES_INDEX_NAME, id_)
+        ]
+        found = dict(zip(ids, await self._hydrate(ids, model, fields)))
+        return [found.get(str(id_)) for id_ in object_ids]
 
     async def get_all(
             self,
             page_size: int,
             page_number: int,
             model: Type[ESPerson] = ESPerson,
-    ) -> List[ESPerson]:
-        query = PERSONS_QUERY
-        query.update(
-            ESQueryParameters.get_es_pagination_parameters(
+            search_after: list = None,
+            fields: List[str] = None,
+    ) -> ESPage:
+        tag_response(self.ES_INDEX_NAME)
+        query = match_all_query(
+            # Постраничный обход требует стабильного порядка документов
+            ESQueryParameters.get_es_sorting("id"),
+            ESQueryParameters.get_es_page_parameters(
                 page_size,
                 page_number,
-            )
+                search_after,
+            ),
         )
         raw_data = await self.data_source.search(
             index=self.ES_INDEX_NAME,
             body=query,
         )
-        return_data = [
-            model(**hit["_source"]) for hit in raw_data["hits"]["hits"]
-        ]
-        return return_data
+        hits = raw_data["hits"]["hits"]
+        persons = await self._hydrate(
+            [hit["_id"] for hit in hits],
+            model,
+            fields,
+        )
+        return ESPage(
+            items=[person for person in persons if person],
+            search_after=ESQueryParameters.get_search_after(hits, page_size),
+        )
 
     async def get_list(
             self,
@@ -70,42 +106,89 @@ class PersonService(APIServiceListable, APIServiceSearchable):
             film_service: FilmService,
             page_size: int = None,
             page_number: int = None,
-    ) -> List[ESFilm]:
-        person = await self.get_by_id(object_id)
+            search_after: list = None,
+            fields: List[str] = None,
+            film_model: Type[ESFilm] = ESFilm,
+    ) -> ESPage:
+        # Из документа персоны нужны только ее фильмы
+        person = await self.get_by_id(object_id, fields=["filmworks"])
         if not person:
-            return []
+            return ESPage(items=[], search_after=None)
         film_ids = set()
-        for rfw in person.filmworks:
+        for rfw in person.filmworks or []:
             film_ids.update([fw.id for fw in rfw.filmworks])
 
-        return await film_service.get_list(objects_list=list(film_ids),
+        return await film_service.get_list(objects_list=sorted(film_ids),
+                                           sort_field=sort_field,
                                            page_size=page_size,
-                                           page_number=page_number)
+                                           page_number=page_number,
+                                           search_after=search_after,
+                                           fields=fields,
+                                           model=film_model)
 
     async def search(
             self,
             search_string: str,
             page_size: int = None,
             page_number: int = None,
+            model: Type[ESPerson] = ESPerson,
+            fields: List[str] = None,
     ) -> List[ESPerson]:
-        query = PERSONS_SEARCH_QUERY
-        query["query"]["match"]["name"]["query"] = search_string
+        tag_response(self.ES_INDEX_NAME)
+        page = {}
         if page_size and page_number:
-            query.update(
-                ESQueryParameters.get_es_pagination_parameters(
-                    page_size,
-                    page_number,
-                )
+            page = ESQueryParameters.get_es_pagination_parameters(
+                page_size,
+                page_number,
             )
+        query = persons_search_query(search_string, page)
         raw_data = await self.data_source.search(
             index=self.ES_INDEX_NAME,
             body=query,
         )
-        return_data = [
-            ESPerson(**hit["_source"]) for hit in raw_data["hits"]["hits"]
-        ]
+        hits = raw_data["hits"]["hits"]
+        persons = await self._hydrate(
+            [hit["_id"] for hit in hits],
+            model,
+            fields,
+        )
+        return_data = [person for person in persons if person]
         return return_data
 
+    # Подсказки по началу имени. Документы с несколькими полями
+    # берутся прямо из ответа ES, без кэша сущностей
+    async def suggest(
+            self,
+            prefix: str,
+            size: int,
+            model: Type[ESPerson] = ESPerson,
+    ) -> List[ESPerson]:
+        tag_response(self.ES_INDEX_NAME)
+        raw_data = await self.data_source.search(
+            index=self.ES_INDEX_NAME,
+            body=persons_suggest_query(prefix, size),
+            filter_path=SUGGEST_FILTER_PATH,
+        )
+        # При пустом результате filter_path убирает и сам список hits
+        hits = raw_data.get("hits", {}).get("hits", [])
+        return [model(**{**hit["_source"], "id": hit["_id"]}) for hit in hits]
+
+    # Документы по идентификаторам из кэша сущностей,
+    # недостающие запрашиваются у ES
+    async def _hydrate(
+            self,
+            ids: List,
+            model: Type[ESPerson],
+            fields: List[str] = None,
+    ) -> List[Optional[ESPerson]]:
+        docs = await hydrate(
+            self.data_source,
+            self.ES_INDEX_NAME,
+            ids,
+            fields,
+        )
+        return [model(**doc) if doc else None for doc in docs]
+
 
 class APIPersonServiceFactory(APIAbstractServiceFactory):
     @staticmethod
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+from fastapi import Depends
+
+from db.elastic import get_elastic
+from models.es_models import ESFilm, ESGenre, ESPerson
+from services.abstract_services import (
+    APIAbstractServiceFactory,
+    APIAsyncSearchEngine,
+)
+from services.cache import tag_response
+from services.es_queries import (
+    films_search_query,
+    genres_search_query,
+    persons_search_query,
+)
+from services.es_query_parameters import ESQueryParameters
+from services.films import FilmService
+from services.genres import GenreService
+from services.persons import PersonService
+
+SEARCH_CACHE_EXPIRE_IN_SECONDS = 5  # 5 секунд
+
+
+class SearchService:
+    """
+    Поиск сразу по фильмам, персонам и жанрам. Запросы к трем индексам
+    отправляются в ES одним _msearch, а найденные документы собираются
+    из кэша сущностей сервисами соответствующих индексов
+    """
+
+    def __init__(self, data_source: APIAsyncSearchEngine) -> None:
+        self.data_source = data_source
+        self.film_service = FilmService(data_source)
+        self.person_service = PersonService(data_source)
+        self.genre_service = GenreService(data_source)
+
+    async def search(
+            self,
+            search_string: str,
+            page_size: int,
+            page_number: int,
+            film_model: Callable = ESFilm,
+            person_model: Callable = ESPerson,
+            genre_model: Callable = ESGenre,
+    ) -> Dict[str, list]:
+        """
+        Страница результатов каждой группы: films, persons и genres.
+        Размер и номер страницы применяются к каждой группе отдельно
+        """
+        page = ESQueryParameters.get_es_pagination_parameters(
+            page_size,
+            page_number,
+        )
+        groups: List[Tuple[str, object, Callable, dict]] = [
+            ("films", self.film_service, film_model,
+             films_search_query(search_string, page)),
+            ("persons", self.person_service, person_model,
+             persons_search_query(search_string, page)),
+            ("genres", self.genre_service, genre_model,
+             genres_search_query(search_string, page)),
+        ]
+        tag_response(*(service.ES_INDEX_NAME for _, service, _, _ in groups))
+
+        body = []
+        for _, service, _, query in groups:
+            body.extend(({"index": service.ES_INDEX_NAME}, query))
+        raw_data = await self.data_source.msearch(body=body)
+
+        found = await asyncio.gather(*(
+            self._get_found(service, model, response)
+            for (_, service, model, _), response
+            in zip(groups, raw_data["responses"])
+        ))
+        return {name: items for (name, _, _, _), items in zip(groups, found)}
+
+    @staticmethod
+    async def _get_found(service, model: Callable, response: dict) -> list:
+        # Ошибка одного запроса _msearch не отменяет остальные,
+        # группа с ошибкой возвращается пустой
+        if "error" in response:
+            logging.warning(
+                "Search in %s failed: %s",
+                service.ES_INDEX_NAME,
+                response["error"],
+            )
+            return []
+        ids = [hit["_id"] for hit in response["hits"]["hits"]]
+        objects = await service.get_by_ids(ids, model=model)
+        return [obj for obj in objects if obj]
+
+
+class APISearchServiceFactory(APIAbstractServiceFactory):
+    @staticmethod
+    @lru_cache()
+    def get_service(
+            data_source: APIAsyncSearchEngine = Depends(get_elastic),
+    ) -> SearchService:
+        return SearchService(data_source)
@@ -0,0 +1,50 @@
+import asyncio
+
+# Ключи ASGI scope, описывающие сам запрос. Остальные ключи
+# добавляются приложением по ходу обработки и в копию не переносятся
+REQUEST_SCOPE_KEYS = (
+    "type",
+    "asgi",
+    "http_version",
+    "method",
+    "scheme",
+    "server",
+    "client",
+    "root_path",
+    "path",
+    "raw_path",
+    "query_string",
+    "headers",
+)
+
+
+def copy_request_scope(scope: dict, **extra) -> dict:
+    """Копия scope запроса для повторного выполнения в обход сети"""
+    new_scope = {key: scope[key] for key in REQUEST_SCOPE_KEYS if key in scope}
+    new_scope.update(extra)
+    return new_scope
+
+
+async def run_asgi_request(app, scope: dict) -> None:
+    """
+    Выполняет запрос без тела к ASGI-приложению, отбрасывая ответ.
+    :param app: ASGI-приложение
+    :param scope: scope запроса, например из copy_request_scope
+    """
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive() -> dict:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Повторные вызовы ждут отключения клиента - наступает после ответа
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            response_complete.set()
+
+    await app(scope, receive, send)
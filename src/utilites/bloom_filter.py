@@ -0,0 +1,57 @@
+import hashlib
+import math
+from typing import Iterable, Iterator
+
+
+class BloomFilter:
+    """
+    Вероятностное множество строк. Может ошибочно сообщить, что строка
+    в нем есть, но никогда не ошибается в обратную сторону.
+    Формат совпадает с фильтром, который строит ETL.
+    """
+
+    def __init__(self, size: int, hashes: int, bits: bytes = None):
+        """
+        :param size: Количество бит в фильтре
+        :param hashes: Количество хэш-функций
+        :param bits: Готовый массив бит, например загруженный из Redis
+        """
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray(bits) if bits else bytearray(math.ceil(size / 8))
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """Фильтр оптимального размера для capacity строк"""
+        capacity = max(capacity, 1)
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hashes)
+
+    def positions(self, item: str) -> Iterator[int]:
+        """Номера бит, которые устанавливает строка"""
+        # Двойное хэширование: k позиций из двух половин одного дайджеста
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self.positions(item):
+            self.bits[position >> 3] |= self._mask(position)
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & self._mask(position)
+            for position in self.positions(item)
+        )
+
+    @staticmethod
+    def _mask(position: int) -> int:
+        # Порядок бит в байте как у SETBIT/GETBIT в Redis: от старшего к младшему
+        return 0x80 >> (position & 7)
@@ -0,0 +1,47 @@
+import gzip
+from typing import Callable, Dict
+
+import zstandard
+
+GZIP_COMPRESS_LEVEL = 6
+ZSTD_COMPRESS_LEVEL = 3
+
+# Алгоритмы сжатия по значениям заголовка Content-Encoding
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda data: gzip.compress(data, compresslevel=GZIP_COMPRESS_LEVEL),
+    "zstd": lambda data: zstandard.ZstdCompressor(
+        level=ZSTD_COMPRESS_LEVEL).compress(data),
+}
+DECOMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": gzip.decompress,
+    "zstd": lambda data: zstandard.ZstdDecompressor().decompress(data),
+}
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    return COMPRESSORS[encoding](data)
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    return DECOMPRESSORS[encoding](data)
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """
+    Проверяет, принимает ли клиент ответ в указанной кодировке
+    :param accept_encoding: Значение заголовка Accept-Encoding запроса
+    :param encoding: Кодировка, например "gzip"
+    """
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip() not in (encoding, "*"):
+            continue
+        params = params.replace(" ", "")
+        # q=0 означает, что кодировка явно запрещена
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
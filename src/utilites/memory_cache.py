@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+
+class FrequencySketch:
+    """
+    Приближенный счетчик частоты обращений к ключам (Count-Min Sketch).
+    Хранит 4-битные счетчики и периодически делит их пополам,
+    чтобы старая популярность ключей со временем "остывала".
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, capacity: int):
+        width = 1
+        while width < max(capacity, 16):
+            width <<= 1
+        self._mask = width - 1
+        self._table = [bytearray(width) for _ in range(self.DEPTH)]
+        self._sample_size = 10 * max(capacity, 16)
+        self._additions = 0
+
+    def _indexes(self, key: Hashable):
+        for seed, row in enumerate(self._table):
+            yield row, hash((seed, key)) & self._mask
+
+    def increment(self, key: Hashable) -> None:
+        added = False
+        for row, index in self._indexes(key):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self._sample_size:
+                self._reset()
+
+    def frequency(self, key: Hashable) -> int:
+        return min(row[index] for row, index in self._indexes(key))
+
+    def _reset(self) -> None:
+        for row in self._table:
+            for index, value in enumerate(row):
+                row[index] = value >> 1
+        self._additions //= 2
+
+
+class MemoryCache:
+    """
+    Ограниченный по размеру и времени жизни записей кэш в памяти процесса.
+    Вытеснение по LRU, допуск новых ключей по политике TinyLFU:
+    при заполненном кэше новый ключ вытесняет самую старую запись,
+    только если обращались к нему чаще, чем к ней.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._sketch = FrequencySketch(max_size)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        self._sketch.increment(key)
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expire_at = item
+        if expire_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float = None) -> bool:
+        """
+        Сохраняет значение в кэше
+        :return: False, если политика допуска отклонила ключ
+        """
+        if self.max_size <= 0:
+            return False
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        expire_at = time.monotonic() + ttl
+
+        if key in self._data:
+            self._data[key] = (value, expire_at)
+            self._data.move_to_end(key)
+            return True
+
+        if len(self._data) >= self.max_size and not self._evict(key):
+            return False
+
+        self._data[key] = (value, expire_at)
+        return True
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Снимок всех непросроченных записей"""
+        now = time.monotonic()
+        return [
+            (key, value)
+            for key, (value, expire_at) in self._data.items()
+            if expire_at > now
+        ]
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def _evict(self, candidate: Hashable) -> bool:
+        victim, (_, expire_at) = next(iter(self._data.items()))
+        if expire_at > time.monotonic() and (
+                self._sketch.frequency(candidate) <= self._sketch.frequency(victim)
+        ):
+            return False
+        del self._data[victim]
+        return True
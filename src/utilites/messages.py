@@ -1,3 +1,7 @@
 API_FILM_NOT_FOUND = "Filmwork with uuid={uuid} not found"
 API_GENRE_NOT_FOUND = "Genre with uuid={uuid} not found"
 API_PERSON_NOT_FOUND = "Person with uuid={uuid} not found"
+API_INVALID_CURSOR = "Invalid page cursor"
+API_CURSOR_NOT_SUPPORTED = "Page cursor is not supported here, use page[number]"
+API_INVALID_BATCH_IDS = "Expected from 1 to {max_size} comma-separated uuids"
+API_INVALID_FIELDS = "Expected comma-separated fields from: {fields}"
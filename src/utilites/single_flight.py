@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Объединение одновременных операций с одинаковым ключом: операцию
+    выполняет первый (ведущий) участник, остальные дожидаются его результата.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def join(
+            self,
+            key: Hashable,
+            timeout: Optional[float] = None,
+    ) -> Tuple[bool, Any]:
+        """
+        Присоединяется к операции с ключом. Если операции нет, участник
+        становится ведущим и должен сообщить результат через finish().
+        :param timeout: Сколько секунд ждать результат ведущего участника
+        :return: Стал ли участник ведущим и результат ведущего участника
+            (None, если результата не дождались)
+        """
+        future = self._calls.get(key)
+        if future is None:
+            self._calls[key] = asyncio.get_running_loop().create_future()
+            return True, None
+        try:
+            # shield не дает отмене одного ожидающего отменить общий результат
+            return False, await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            # Ведущий участник не сообщил результат (например, был отменен).
+            # Операция снимается, чтобы следующие участники не ждали ее зря
+            self.finish(key, None, future)
+            return False, None
+
+    def finish(
+            self,
+            key: Hashable,
+            result: Any = None,
+            future: Optional[asyncio.Future] = None,
+    ) -> None:
+        """
+        Завершает операцию ведущего участника и передает результат остальным
+        :param future: Завершить операцию, только если это она
+            (а не начатая позже операция с тем же ключом)
+        """
+        if future is not None and self._calls.get(key) is not future:
+            return
+        future = self._calls.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(result)
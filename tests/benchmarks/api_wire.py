@@ -0,0 +1,101 @@
+"""
+Сравнение сборки ответов API по эндпоинтам: прежний путь (модель ES ->
+модель API -> проверка и кодирование FastAPI по модели ответа) и функции
+models/api_wire.py. Сервисы, ES и Redis не участвуют, документы берутся
+из тестовых данных.
+
+Запуск из каталога tests:
+    python benchmarks/api_wire.py [--repeat N]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from settings import SRC_DIR  # noqa: E402
+
+sys.path.insert(0, str(SRC_DIR))
+
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from functional.utils.auxiliary import get_json_from_file  # noqa: E402
+from models.api_models import (APIFilmFull, APIFilmShort, APIGenre,  # noqa: E402
+                               APIPersonFull, APIPersonShort)
+from models.api_wire import (film_full_wire, film_short_wire,  # noqa: E402
+                             genre_wire, person_full_wire, person_short_wire,
+                             wire_response)
+from settings import ConfTest  # noqa: E402
+from unit.test_api_wire import (api_film_full, api_film_short,  # noqa: E402
+                                api_genre, api_person_full, api_person_short)
+
+
+def scale(docs: list, size: int) -> list:
+    return (docs * (size // len(docs) + 1))[:size]
+
+
+async def old_response(convert, response_type, docs, single: bool) -> bytes:
+    field = create_response_field(name='response', type_=response_type)
+    data = convert(docs[0]) if single else [convert(doc) for doc in docs]
+    content = await serialize_response(field=field, response_content=data)
+    return wire_response(content).body
+
+
+def wire(convert, docs, single: bool) -> bytes:
+    data = convert(**docs[0]) if single else [convert(**doc) for doc in docs]
+    return wire_response(data).body
+
+
+def measure(func, repeat: int) -> float:
+    """Среднее время одного вызова в миллисекундах"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    settings = ConfTest()
+    movies = get_json_from_file(settings.movie_path)
+    persons = get_json_from_file(settings.person_path)
+    genres = get_json_from_file(settings.genre_path)
+
+    endpoints = [
+        # Эндпоинт, прежнее преобразование, модель ответа, новое, документы, один объект
+        ('GET /films/ (50)', api_film_short, List[APIFilmShort],
+         film_short_wire, scale(movies, 50), False),
+        ('GET /films/ (10000)', api_film_short, List[APIFilmShort],
+         film_short_wire, scale(movies, 10000), False),
+        ('GET /films/{id}', api_film_full, APIFilmFull,
+         film_full_wire, movies, True),
+        ('GET /films/batch (100)', api_film_full, List[Optional[APIFilmFull]],
+         film_full_wire, scale(movies, 100), False),
+        ('GET /persons/ (50)', api_person_short, List[APIPersonShort],
+         person_short_wire, scale(persons, 50), False),
+        ('GET /persons/{id}', api_person_full, APIPersonFull,
+         person_full_wire, persons, True),
+        ('GET /persons/search (1000)', api_person_full, List[APIPersonFull],
+         person_full_wire, scale(persons, 1000), False),
+        ('GET /genres/ (50)', api_genre, List[APIGenre],
+         genre_wire, scale(genres, 50), False),
+    ]
+    loop = asyncio.new_event_loop()
+    print(f"{'endpoint':<30}{'old, ms':>12}{'wire, ms':>12}{'speedup':>10}")
+    for name, old_convert, response_type, new_convert, docs, single in endpoints:
+        old_ms = measure(lambda: loop.run_until_complete(
+            old_response(old_convert, response_type, docs, single)), args.repeat)
+        new_ms = measure(lambda: wire(new_convert, docs, single), args.repeat)
+        print(f'{name:<30}{old_ms:>12.3f}{new_ms:>12.3f}{old_ms / new_ms:>9.1f}x')
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
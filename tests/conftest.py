@@ -1,5 +1,7 @@
 import asyncio
 import json
+import os
+import sys
 from typing import Union
 from uuid import UUID
 
@@ -10,7 +12,15 @@ from elasticsearch import AsyncElasticsearch
 
 from functional.models.response_model import HTTPResponse
 from functional.utils.auxiliary import OUT_MODEL
-from settings import ES_PAGE_MAX_SIZE, ConfTest
+from settings import ES_PAGE_MAX_SIZE, ETL_DIR, ConfTest
+
+# Модули ETL (lib.*) нужны тестам, которые строят данные так же, как ETL.
+# Настройки ETL читаются из окружения при импорте, недостающие берем из тестовых
+sys.path.append(str(ETL_DIR))
+_settings = ConfTest()
+os.environ.setdefault('ELASTIC_PORT', str(_settings.elastic_port))
+os.environ.setdefault('REDIS_HOST', _settings.redis_host)
+os.environ.setdefault('REDIS_PORT', str(_settings.redis_port))
 
 pytest_plugins = [
     'functional.fixtures.film_fixtures',
@@ -151,10 +161,12 @@ def clear_data_es_redis(redis_client,
 
 
 @pytest.fixture(scope='session')
-def load_es_data(es_client: AsyncElasticsearch):
+def load_es_data(es_client: AsyncElasticsearch, redis_client, settings):
     async def inner(data: json, index: str):
         """
         Загрузка тестовых данных в Elasticsearch из файла.
+        Как и ETL, сообщает API о загруженных документах,
+        чтобы закэшированные ранее ответы были сброшены.
         :param index:
         :param data: Файл с данными.
         """
@@ -165,6 +177,9 @@ def load_es_data(es_client: AsyncElasticsearch):
             body.append(model.dict())
         await es_client.bulk(index=index, body=body)
         await es_client.indices.refresh()
+        message = {'index': index, 'ids': [str(model.id) for model in data]}
+        await redis_client.publish(settings.redis_invalidation_channel,
+                                   json.dumps(message))
 
     return inner
 
@@ -1,8 +1,13 @@
-from typing import Callable
+from http import HTTPStatus
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
 
 import pytest
 
 from functional.models.response_model import HTTPResponse
+from functional.testdata.parameters.base_parameters import make_batch_ids
+from functional.utils.auxiliary import get_model_by_id, is_prefix_match
+from settings import DEFAULT_PAGE_SIZE, ES_PAGE_MAX_SIZE, NEXT_CURSOR_HEADER
 
 
 @pytest.fixture(scope='session')
@@ -63,3 +68,146 @@ def assert_single_response(make_get_request):
         assert response_model == exist_model
 
     return inner
+
+
+@pytest.fixture(scope='session')
+def assert_batch_response(make_get_request):
+    async def inner(query: str, ids: list, model, base_models: list):
+        """
+        Проверяет пакетный запрос: ответ идет в порядке ids, повторы
+        отдаются на каждой позиции, вместо отсутствующих - null.
+        """
+        response: HTTPResponse = await make_get_request(
+            query, make_batch_ids(ids))
+        assert response.status == 200
+        assert len(response.body) == len(ids)
+        for item_id, item in zip(ids, response.body):
+            exist_model = get_model_by_id(base_models, item_id)
+            if exist_model is None:
+                assert item is None
+            else:
+                assert model(**item) == exist_model
+
+    return inner
+
+
+@pytest.fixture(scope='session')
+def walk_pages_by_number(make_get_request):
+    async def inner(query: str, parameters: dict, page_size: int) -> list[UUID]:
+        """
+        Листает список по номеру страницы до первой неполной страницы.
+        :return: uuid всех полученных документов по порядку.
+        """
+        ids, page_number = [], 1
+        while True:
+            response: HTTPResponse = await make_get_request(
+                query,
+                parameters | {'page[size]': page_size, 'page[number]': page_number})
+            assert response.status == HTTPStatus.OK
+            ids += [UUID(item['uuid']) for item in response.body]
+            if len(response.body) < page_size:
+                return ids
+            page_number += 1
+
+    return inner
+
+
+@pytest.fixture(scope='session')
+def walk_pages_by_cursor(make_get_request):
+    async def inner(query: str, parameters: dict,
+                    before_next: Callable[[HTTPResponse], Awaitable] = None
+                    ) -> list[UUID]:
+        """
+        Листает список, передавая курсор из заголовка X-Next-Cursor
+        в page[cursor], пока сервис его отдает.
+        :param before_next: Вызывается с ответом перед запросом следующей страницы.
+        :return: uuid всех полученных документов по порядку.
+        """
+        ids, page_parameters = [], parameters
+        while True:
+            response: HTTPResponse = await make_get_request(query, page_parameters)
+            assert response.status == HTTPStatus.OK
+            ids += [UUID(item['uuid']) for item in response.body]
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if cursor is None:
+                return ids
+            # Курсор, который не сдвигается, листал бы список бесконечно
+            assert len(ids) <= ES_PAGE_MAX_SIZE
+            if before_next is not None:
+                await before_next(response)
+            page_parameters = parameters | {'page[cursor]': cursor}
+
+    return inner
+
+
+@pytest.fixture(scope='session')
+def assert_cursor_walk(walk_pages_by_number, walk_pages_by_cursor):
+    async def inner(query: str, parameters: dict, page_size: int,
+                    expected_ids: list[UUID]):
+        """
+        Список, пролистанный по курсору, совпадает с пролистанным
+        по номеру страницы и с ожидаемым порядком: без повторов и пропусков
+        на границах страниц.
+        """
+        ids_by_number = await walk_pages_by_number(query, parameters, page_size)
+        ids_by_cursor = await walk_pages_by_cursor(
+            query, parameters | {'page[size]': page_size})
+        assert len(set(ids_by_cursor)) == len(ids_by_cursor)
+        assert ids_by_cursor == ids_by_number
+        assert ids_by_cursor == expected_ids
+
+    return inner
+
+
+@pytest.fixture(scope='session')
+def assert_suggest(make_get_request):
+    async def inner(query: str, prefix: str, size: Optional[int],
+                    names: dict[UUID, str], name_field: str) -> list[UUID]:
+        """
+        Подсказки по префиксу: только документы, в названии которых есть
+        слово с этим префиксом, не больше запрошенного числа.
+        :param size: Число подсказок, None - по умолчанию.
+        :param names: Названия всех документов индекса по uuid.
+        :param name_field: Поле названия в ответе.
+        :return: uuid подсказок.
+        """
+        parameters = {'query': prefix}
+        if size is not None:
+            parameters['size'] = size
+        response: HTTPResponse = await make_get_request(query, parameters)
+        assert response.status == HTTPStatus.OK
+
+        matches = [uuid for uuid, name in names.items()
+                   if is_prefix_match(name, prefix)]
+        expected_len = min(size or DEFAULT_PAGE_SIZE, len(matches))
+        assert len(response.body) == expected_len
+        ids = [UUID(item['uuid']) for item in response.body]
+        assert len(set(ids)) == len(ids)
+        for uuid, item in zip(ids, response.body):
+            assert item[name_field] == names[uuid]
+            assert is_prefix_match(item[name_field], prefix)
+        return ids
+
+    return inner
+
+
+@pytest.fixture(scope='session')
+def assert_response_fields():
+    def inner(response: HTTPResponse, fields: set[str], model_list: list):
+        """
+        Документы ответа на запрос с параметром fields содержат только
+        запрошенные поля и uuid, значения полей совпадают с моделями.
+        :param response: Ответ с одним документом или списком.
+        """
+        assert response.status == HTTPStatus.OK
+        items = response.body
+        if not isinstance(items, list):
+            items = [items]
+        assert len(items) > 0
+        for item in items:
+            assert item.keys() == fields | {'uuid'}
+            model = get_model_by_id(model_list, item['uuid'])
+            for name in fields:
+                assert item[name] == getattr(model, name)
+
+    return inner
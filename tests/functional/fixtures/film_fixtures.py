@@ -1,8 +1,12 @@
 import json
 import uuid
+from collections import Counter
+from http import HTTPStatus
+from typing import Callable
 from uuid import UUID
 
 import pytest
+from lib.providers.list_views import RedisFilmRatingViews
 
 from functional.models.api_models import APIFilmFull, APIFilmShort
 from functional.models.es_models import ESFilm
@@ -87,6 +91,21 @@ async def provide_es_index_data_movie(settings: ConfTest,
     await clear_data_es_redis(settings.elastic_index_film)
 
 
+@pytest.fixture(scope='class')
+async def provide_film_rating_views(redis_client,
+                                    model_list_movie_input: list[ESFilm]):
+    """
+    Списки фильмов по рейтингу в Redis, построенные так же, как их строит ETL.
+    Без них API отдает списки фильмов из Elasticsearch.
+    После тестирования удаляются вместе с остальными данными Redis
+    при очистке индекса фильмов.
+    """
+    views = RedisFilmRatingViews()
+    views.redis = redis_client
+    await views.rebuild([film.dict() for film in model_list_movie_input])
+    yield views
+
+
 @pytest.fixture(scope='session')
 def create_es_film_data(settings: ConfTest,
                         model_list_movie_input: list[APIFilmShort],
@@ -172,6 +191,48 @@ def film_list_params_404(model_list_movie) -> list[dict]:
     return params
 
 
+@pytest.fixture(scope='session')
+def get_film_facets(model_list_movie_input: list[ESFilm]):
+    """
+    Считает ожидаемые фасеты по тестовым фильмам, прошедшим условие отбора.
+    Жанры - словарь uuid: количество, рейтинг - словарь нижняя граница
+    корзины: количество (фильмы без рейтинга в корзины не попадают).
+    """
+
+    def inner(condition: Callable[[ESFilm], bool] = None) -> dict:
+        films = [film for film in model_list_movie_input
+                 if condition is None or condition(film)]
+        genres = Counter(str(genre_id)
+                         for film in films for genre_id in film.genre_ids)
+        ratings = Counter(int(film.imdb_rating) for film in films
+                          if film.imdb_rating is not None)
+        return {
+            'total': len(films),
+            'genres': dict(genres),
+            'imdb_rating': {float(gte): ratings[gte] for gte in range(11)},
+        }
+
+    return inner
+
+
+@pytest.fixture(scope='class')
+def assert_film_facets(make_get_request, get_film_facets):
+    async def inner(query, parameters, condition=None):
+        response: HTTPResponse = await make_get_request(query, parameters)
+        assert response.status == HTTPStatus.OK
+        expected = get_film_facets(condition)
+        assert response.body['total'] == expected['total']
+        assert {genre['uuid']: genre['count']
+                for genre in response.body['genres']} == expected['genres']
+        assert {bucket['gte']: bucket['count']
+                for bucket in response.body['imdb_rating']
+                } == expected['imdb_rating']
+        for bucket in response.body['imdb_rating']:
+            assert bucket['lt'] == bucket['gte'] + 1
+
+    return inner
+
+
 @pytest.fixture(scope='class')
 def assert_film_list(make_get_request,
                      get_model_list_movie_short,
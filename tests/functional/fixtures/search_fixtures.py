@@ -1,11 +1,15 @@
 import pytest
 from elasticsearch import AsyncElasticsearch
 
-from functional.models.api_models import APIFilmShort, APIPersonShort
-from functional.utils.auxiliary import (HTTPResponse, get_models_and_ids,
+from functional.models.api_models import (APIFilmShort, APIGenre,
+                                          APIPersonFull, APIPersonShort)
+from functional.utils.auxiliary import (HTTPResponse, get_model_by_id,
+                                        get_models_and_ids,
                                         get_page_parameters,
                                         get_page_parameters_404)
-from settings import ES_PAGE_MAX_SIZE
+from settings import DEFAULT_PAGE_SIZE, ES_PAGE_MAX_SIZE
+
+SEARCH_GROUPS = {'films', 'persons', 'genres'}
 
 
 @pytest.fixture(scope='session')
@@ -118,3 +122,64 @@ def film_search_params_404(len_film_search_list) -> dict:
 @pytest.fixture(scope='class')
 def person_search_params_404(len_person_search_list) -> dict:
     return get_page_parameters_404(len_person_search_list)
+
+
+@pytest.fixture(scope='class')
+def search_all_query(exist_film_model,
+                     exist_person_model,
+                     exist_genre_model) -> str:
+    """
+    Строка поиска, по которой находятся документы всех трех групп.
+    """
+    return ' '.join((exist_film_model.title,
+                     exist_person_model.full_name,
+                     exist_genre_model.name))
+
+
+@pytest.fixture(scope='class')
+def assert_search_all(make_get_request,
+                      settings,
+                      get_model_list_movie_short,
+                      model_list_person,
+                      model_list_genre):
+    async def inner(parameters: dict) -> dict:
+        """
+        Проверяет общий поиск: каждая группа должна совпадать со страницей
+        поиска по своему индексу с теми же параметрами.
+        :return: Найденные uuid по группам.
+        """
+        response: HTTPResponse = await make_get_request(
+            settings.search_url, parameters)
+        assert response.status == 200
+        assert set(response.body) == SEARCH_GROUPS
+        page_size = parameters.get('page[size]', DEFAULT_PAGE_SIZE)
+        for group in response.body.values():
+            assert len(group) <= page_size
+
+        films = [APIFilmShort(**item) for item in response.body['films']]
+        base_films = get_model_list_movie_short(films)
+        for film in films:
+            assert film in base_films
+        persons = [APIPersonFull(**item) for item in response.body['persons']]
+        for person in persons:
+            assert person == get_model_by_id(model_list_person, person.uuid)
+        genres = [APIGenre(**item) for item in response.body['genres']]
+        for genre in genres:
+            assert genre == get_model_by_id(model_list_genre, genre.uuid)
+
+        film_response = await make_get_request(
+            settings.film_search_url, parameters)
+        _, film_ids = get_models_and_ids(film_response, APIFilmShort)
+        assert [film.uuid for film in films] == film_ids
+        person_response = await make_get_request(
+            settings.person_search_url, parameters)
+        _, person_ids = get_models_and_ids(person_response, APIPersonShort)
+        assert [person.uuid for person in persons] == person_ids
+
+        return {
+            'films': [film.uuid for film in films],
+            'persons': [person.uuid for person in persons],
+            'genres': [genre.uuid for genre in genres],
+        }
+
+    return inner
@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 # Используем pydantic для упрощения работы при перегонке данных из json в объекты
-from pydantic import UUID4
+from pydantic import UUID4, root_validator
 
 from functional.models.base_model import OrjsonBase
 
@@ -43,3 +43,18 @@ class ESFilm(ESBaseModel):
     writers_names: Optional[str]
     actors: Optional[List[ESFilworkPerson]]
     writers: Optional[List[ESFilworkPerson]]
+    genre_ids: Optional[List[UUID4]]
+    person_ids: Optional[List[UUID4]]
+
+    @root_validator(skip_on_failure=True)
+    def set_filter_ids(cls, values):
+        """Плоские поля для фильтров заполняются так же, как в ETL"""
+        values['genre_ids'] = [genre.id for genre in values['genre'] or []]
+        persons = [
+            *(values['directors'] or []),
+            *(values['actors'] or []),
+            *(values['writers'] or []),
+        ]
+        values['person_ids'] = list(
+            dict.fromkeys(person.id for person in persons))
+        return values
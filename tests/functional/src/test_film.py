@@ -3,17 +3,27 @@ from uuid import UUID, uuid4
 
 import pytest
 
+from functional.models.api_models import APIFilmFull
+from functional.models.es_models import ESFilm
 from functional.models.response_model import HTTPResponse
 from functional.testdata.parameters.base_parameters import (BASE_PARAMETERS,
+                                                            BATCH_BAD_PARAMETERS,
+                                                            CURSOR_BAD_PARAMETERS,
                                                             SORT_PARAMETERS,
                                                             PAGE_PARAMETERS,
                                                             PAGE_BAD_PARAMETERS,
                                                             SORT_BAD_PARAMETERS,
-                                                            PAGE_SORT_BAD_PARAMETERS)
+                                                            PAGE_SORT_BAD_PARAMETERS,
+                                                            SUGGEST_BAD_PARAMETERS,
+                                                            make_batch_ids)
 from functional.testdata.parameters.film_parameters import (FILTER_GENRE_PARAMS,
                                                             FILM_ALL_PARAMETERS,
-                                                            FILM_ALL_BAD_PARAMETERS)
-from settings import ConfTest
+                                                            FILM_ALL_BAD_PARAMETERS,
+                                                            FILM_CURSOR_BAD_PARAMETERS,
+                                                            FILM_FACETS_BAD_PARAMETERS)
+from functional.utils.auxiliary import get_film_rating_order
+from lib.providers.list_views import RATING_VIEW_KEY
+from settings import BATCH_MAX_SIZE, SUGGEST_MAX_SIZE, ConfTest
 
 
 class TestFilmWithoutData:
@@ -45,7 +55,9 @@ class TestFilmWithoutData:
         'query_parameters', [
             *PAGE_BAD_PARAMETERS,
             *SORT_BAD_PARAMETERS,
-            *FILM_ALL_BAD_PARAMETERS
+            *FILM_ALL_BAD_PARAMETERS,
+            *CURSOR_BAD_PARAMETERS,
+            *FILM_CURSOR_BAD_PARAMETERS,
         ])
     @pytest.mark.asyncio
     async def test_film_list_422(self, make_get_request,
@@ -55,6 +67,165 @@ class TestFilmWithoutData:
         response = await make_get_request(url, query_parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
 
+    @pytest.mark.parametrize('query_parameters', [{}, *FILTER_GENRE_PARAMS])
+    @pytest.mark.asyncio
+    async def test_film_facets(self, make_get_request,
+                               settings: ConfTest,
+                               query_parameters: dict):
+        url = settings.film_facets_url
+        response: HTTPResponse = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.OK
+        assert response.body['total'] == 0
+        assert response.body['genres'] == []
+        assert len(response.body['imdb_rating']) == 11
+        assert all(bucket['count'] == 0
+                   for bucket in response.body['imdb_rating'])
+
+    @pytest.mark.parametrize('query_parameters', FILM_FACETS_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_film_facets_422(self, make_get_request,
+                                   settings: ConfTest,
+                                   query_parameters: dict):
+        url = settings.film_facets_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @pytest.mark.asyncio
+    async def test_film_batch_404(self, make_get_request,
+                                  settings: ConfTest):
+        ids = [uuid4() for _ in range(BATCH_MAX_SIZE)]
+        url = settings.film_batch_url
+        response = await make_get_request(url, make_batch_ids(ids))
+        assert response.status == HTTPStatus.OK
+        assert response.body == [None] * BATCH_MAX_SIZE
+
+    @pytest.mark.parametrize('query_parameters', BATCH_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_film_batch_422(self, make_get_request,
+                                  settings: ConfTest,
+                                  query_parameters: dict):
+        url = settings.film_batch_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.usefixtures('provide_es_index_data_movie',
+                         'provide_es_index_data_genre')
+class TestFilmFacets:
+
+    @pytest.mark.asyncio
+    async def test_film_facets(self, settings: ConfTest,
+                               assert_film_facets):
+        await assert_film_facets(settings.film_facets_url, {})
+
+    @pytest.mark.asyncio
+    async def test_film_facets_genre(self, settings: ConfTest,
+                                     assert_film_facets,
+                                     exist_film_model: APIFilmFull):
+        genre_id = exist_film_model.genre[0].uuid
+        await assert_film_facets(
+            settings.film_facets_url, {'filter[genre]': str(genre_id)},
+            lambda film: genre_id in film.genre_ids)
+
+    @pytest.mark.asyncio
+    async def test_film_facets_genre_all(self, settings: ConfTest,
+                                         assert_film_facets,
+                                         exist_film_model: APIFilmFull):
+        genre_ids = [genre.uuid for genre in exist_film_model.genre[:2]]
+        # Повторяющийся параметр передается списком пар
+        parameters = [('filter[genre]', str(genre_id))
+                      for genre_id in genre_ids]
+        parameters.append(('filter[genre_match]', 'all'))
+        await assert_film_facets(
+            settings.film_facets_url, parameters,
+            lambda film: set(genre_ids) <= set(film.genre_ids))
+
+    @pytest.mark.asyncio
+    async def test_film_facets_person(self, settings: ConfTest,
+                                      assert_film_facets,
+                                      exist_person_id: UUID):
+        await assert_film_facets(
+            settings.film_facets_url, {'filter[person]': str(exist_person_id)},
+            lambda film: exist_person_id in film.person_ids)
+
+    @pytest.mark.asyncio
+    async def test_film_facets_rating(self, settings: ConfTest,
+                                      assert_film_facets):
+        await assert_film_facets(
+            settings.film_facets_url,
+            {'filter[imdb_rating][gte]': 5, 'filter[imdb_rating][lte]': 7.5},
+            lambda film: (film.imdb_rating is not None
+                          and 5 <= film.imdb_rating <= 7.5))
+
+    @pytest.mark.asyncio
+    async def test_film_facets_empty(self, settings: ConfTest,
+                                     assert_film_facets):
+        await assert_film_facets(
+            settings.film_facets_url, {'filter[genre]': str(uuid4())},
+            lambda film: False)
+
+    @pytest.mark.parametrize('query_parameters', FILM_FACETS_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_film_facets_422(self, make_get_request,
+                                   settings: ConfTest,
+                                   query_parameters: dict):
+        url = settings.film_facets_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.usefixtures('provide_es_index_data_movie',
+                         'provide_film_rating_views')
+class TestFilmRatingViews:
+    # Размеры страниц разные у каждого теста: ответы API кэшируются
+
+    @pytest.mark.asyncio
+    async def test_film_views_walk(self, settings: ConfTest,
+                                   walk_pages_by_number, walk_pages_by_cursor,
+                                   model_list_movie_input: list[ESFilm]):
+        url = settings.film_list_url
+        expected = get_film_rating_order(model_list_movie_input)
+        assert await walk_pages_by_number(url, {}, 40) == expected
+        assert await walk_pages_by_cursor(url, {'page[size]': 40}) == expected
+
+    @pytest.mark.asyncio
+    async def test_film_views_walk_genre(self, settings: ConfTest,
+                                         walk_pages_by_number,
+                                         walk_pages_by_cursor,
+                                         exist_film_model: APIFilmFull,
+                                         model_list_movie_input: list[ESFilm]):
+        url = settings.film_list_url
+        genre_id = exist_film_model.genre[0].uuid
+        parameters = {'filter[genre]': str(genre_id)}
+        expected = get_film_rating_order(model_list_movie_input, genre_id)
+        assert await walk_pages_by_number(url, parameters, 30) == expected
+        assert await walk_pages_by_cursor(
+            url, parameters | {'page[size]': 30}) == expected
+
+    @pytest.mark.asyncio
+    async def test_film_views_es_continuation(self, settings: ConfTest,
+                                              redis_client,
+                                              walk_pages_by_cursor,
+                                              model_list_movie_input: list[ESFilm]):
+        # Последний фильм каждой второй страницы пропадает из списка в Redis:
+        # его курсор продолжает ES, а курсор страницы ES - снова список
+        pages = 0
+
+        async def drop_last_film(response: HTTPResponse):
+            nonlocal pages
+            pages += 1
+            if pages % 2:
+                await redis_client.zrem(RATING_VIEW_KEY,
+                                        response.body[-1]['uuid'])
+
+        expected = get_film_rating_order(model_list_movie_input)
+        assert await walk_pages_by_cursor(
+            settings.film_list_url, {'page[size]': 50},
+            drop_last_film) == expected
+        assert pages > 2
+        assert await redis_client.zcard(RATING_VIEW_KEY) == (
+            len(expected) - (pages + 1) // 2)
+
 
 @pytest.mark.usefixtures('provide_es_index_data_movie')
 class TestFilm:
@@ -75,6 +246,18 @@ class TestFilm:
             await assert_film_list(url, parameters, page_size)
             await create_es_film_data(film_ids)
 
+    @pytest.mark.parametrize('sort', ['-imdb_rating', 'imdb_rating'])
+    @pytest.mark.asyncio
+    async def test_film_list_cursor_walk(self, settings: ConfTest,
+                                         assert_cursor_walk, sort: str,
+                                         model_list_movie_input: list[ESFilm]):
+        # Страницы по 3 фильма режут группы с одинаковым рейтингом,
+        # а фильм без рейтинга оказывается в конце последней полной страницы
+        expected = get_film_rating_order(model_list_movie_input,
+                                         descending=sort.startswith('-'))
+        await assert_cursor_walk(settings.film_list_url, {'sort': sort}, 3,
+                                 expected)
+
     @pytest.mark.asyncio
     async def test_film_detail_cashed(self, settings: ConfTest,
                                       assert_film_detail,
@@ -109,7 +292,9 @@ class TestFilm:
         'query_parameters', [*SORT_BAD_PARAMETERS,
                              *PAGE_BAD_PARAMETERS,
                              *PAGE_SORT_BAD_PARAMETERS,
-                             *FILM_ALL_BAD_PARAMETERS])
+                             *FILM_ALL_BAD_PARAMETERS,
+                             *CURSOR_BAD_PARAMETERS,
+                             *FILM_CURSOR_BAD_PARAMETERS])
     @pytest.mark.asyncio
     async def test_film_list_422(self, query_parameters: dict,
                                  settings: ConfTest,
@@ -117,3 +302,88 @@ class TestFilm:
         url = settings.film_list_url
         response: HTTPResponse = await make_get_request(url, query_parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @pytest.mark.asyncio
+    async def test_film_batch(self, settings: ConfTest,
+                              assert_batch_response,
+                              model_list_movie: list[APIFilmFull]):
+        # Порядок запроса, отсутствующий id и повтор
+        first, second = model_list_movie[0].uuid, model_list_movie[1].uuid
+        ids = [second, self.uuid_404, first, second]
+        await assert_batch_response(
+            settings.film_batch_url, ids, APIFilmFull, model_list_movie)
+
+    @pytest.mark.parametrize('query_parameters', BATCH_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_film_batch_422(self, make_get_request,
+                                  settings: ConfTest,
+                                  query_parameters: dict):
+        url = settings.film_batch_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @pytest.mark.parametrize('prefix, size', [('wars', None),
+                                              ('WAR', 5),
+                                              ('tre', SUGGEST_MAX_SIZE),
+                                              ('luc', SUGGEST_MAX_SIZE)])
+    @pytest.mark.asyncio
+    async def test_film_suggest(self, settings: ConfTest, assert_suggest,
+                                prefix: str, size: int,
+                                model_list_movie_input: list[ESFilm]):
+        titles = {film.id: film.title for film in model_list_movie_input}
+        await assert_suggest(settings.film_suggest_url, prefix, size,
+                             titles, 'title')
+
+    @pytest.mark.asyncio
+    async def test_film_suggest_title(self, settings: ConfTest,
+                                      make_get_request,
+                                      exist_film_model: APIFilmFull):
+        response = await make_get_request(
+            settings.film_suggest_url,
+            {'query': exist_film_model.title, 'size': SUGGEST_MAX_SIZE})
+        assert response.status == HTTPStatus.OK
+        suggestions = {UUID(item['uuid']): item for item in response.body}
+        assert exist_film_model.uuid in suggestions
+        assert suggestions[exist_film_model.uuid]['title'] == exist_film_model.title
+
+    @pytest.mark.asyncio
+    async def test_film_suggest_empty(self, settings: ConfTest,
+                                      make_get_request):
+        # В ответе ES на пустой результат нет даже списка hits
+        response = await make_get_request(settings.film_suggest_url,
+                                          {'query': 'qzxqzx'})
+        assert response.status == HTTPStatus.OK
+        assert response.body == []
+
+    @pytest.mark.parametrize('query_parameters', SUGGEST_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_film_suggest_422(self, make_get_request,
+                                    settings: ConfTest,
+                                    query_parameters: dict):
+        url = settings.film_suggest_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @pytest.mark.parametrize('fields, expected_fields', [
+        ('title,imdb_rating', {'title', 'imdb_rating'}),
+        ('title', {'title'}),
+        ('uuid', set()),
+    ])
+    @pytest.mark.asyncio
+    async def test_film_fields(self, settings: ConfTest, make_get_request,
+                               assert_response_fields,
+                               exist_film_model: APIFilmFull,
+                               model_list_movie: list[APIFilmFull],
+                               fields: str, expected_fields: set[str]):
+        film_id = exist_film_model.uuid
+        parameters = {'fields': fields}
+        queries = [
+            (settings.film_list_url, parameters),
+            (settings.film_detail_url.format(film_id), parameters),
+            (settings.film_batch_url, make_batch_ids([film_id]) | parameters),
+            (settings.film_search_url,
+             {'query': exist_film_model.title} | parameters),
+        ]
+        for url, query_parameters in queries:
+            response = await make_get_request(url, query_parameters)
+            assert_response_fields(response, expected_fields, model_list_movie)
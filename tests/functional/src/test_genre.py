@@ -3,9 +3,14 @@ from uuid import UUID, uuid4
 
 import pytest
 
-from functional.testdata.parameters.base_parameters import (PAGE_BAD_PARAMETERS,
-                                                            PAGE_PARAMETERS)
-from settings import ConfTest
+from functional.models.api_models import APIGenre
+from functional.testdata.parameters.base_parameters import (BATCH_BAD_PARAMETERS,
+                                                            CURSOR_BAD_PARAMETERS,
+                                                            ID_CURSOR_BAD_PARAMETERS,
+                                                            PAGE_BAD_PARAMETERS,
+                                                            PAGE_PARAMETERS,
+                                                            make_batch_ids)
+from settings import BATCH_MAX_SIZE, ConfTest
 
 
 class TestGenreWithoutData:
@@ -29,7 +34,9 @@ class TestGenreWithoutData:
         assert len(response.body) == 0
 
     @pytest.mark.parametrize(
-        'query_parameters', [*PAGE_BAD_PARAMETERS])
+        'query_parameters', [*PAGE_BAD_PARAMETERS,
+                             *CURSOR_BAD_PARAMETERS,
+                             *ID_CURSOR_BAD_PARAMETERS])
     async def test_genre_list_422(self, settings: ConfTest,
                                   make_get_request,
                                   query_parameters: dict):
@@ -37,6 +44,24 @@ class TestGenreWithoutData:
         response = await make_get_request(url, query_parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
 
+    @pytest.mark.asyncio
+    async def test_genre_batch_404(self, make_get_request,
+                                   settings: ConfTest):
+        ids = [uuid4() for _ in range(BATCH_MAX_SIZE)]
+        url = settings.genre_batch_url
+        response = await make_get_request(url, make_batch_ids(ids))
+        assert response.status == HTTPStatus.OK
+        assert response.body == [None] * BATCH_MAX_SIZE
+
+    @pytest.mark.parametrize('query_parameters', BATCH_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_genre_batch_422(self, make_get_request,
+                                   settings: ConfTest,
+                                   query_parameters: dict):
+        url = settings.genre_batch_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
 
 @pytest.mark.usefixtures('provide_es_index_data_genre')
 class TestGenre:
@@ -84,10 +109,31 @@ class TestGenre:
         assert len(response.body) == 0
 
     @pytest.mark.parametrize(
-        'query_parameters', [*PAGE_BAD_PARAMETERS])
+        'query_parameters', [*PAGE_BAD_PARAMETERS,
+                             *CURSOR_BAD_PARAMETERS,
+                             *ID_CURSOR_BAD_PARAMETERS])
     async def test_genre_list_422(self, make_get_request,
                                   settings: ConfTest,
                                   query_parameters: dict):
         url = settings.genre_list_url
         response = await make_get_request(url, query_parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @pytest.mark.asyncio
+    async def test_genre_batch(self, settings: ConfTest,
+                               assert_batch_response,
+                               model_list_genre: list[APIGenre]):
+        # Порядок запроса, отсутствующий id и повтор
+        first, second = model_list_genre[0].uuid, model_list_genre[1].uuid
+        ids = [second, self.uuid_404, first, second]
+        await assert_batch_response(
+            settings.genre_batch_url, ids, APIGenre, model_list_genre)
+
+    @pytest.mark.parametrize('query_parameters', BATCH_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_genre_batch_422(self, make_get_request,
+                                   settings: ConfTest,
+                                   query_parameters: dict):
+        url = settings.genre_batch_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -1,12 +1,20 @@
+from collections import Counter
 from http import HTTPStatus
 from uuid import uuid4
 
 import pytest
 
+from functional.models.api_models import APIPersonFull
+from functional.models.es_models import ESFilm, ESPerson
 from functional.testdata.parameters.base_parameters import (
-    BASE_PARAMETERS, PAGE_BAD_PARAMETERS, PAGE_PARAMETERS,
-    PAGE_SORT_BAD_PARAMETERS, SORT_BAD_PARAMETERS, SORT_PARAMETERS)
-from settings import ConfTest
+    BASE_PARAMETERS, BATCH_BAD_PARAMETERS, CURSOR_BAD_PARAMETERS,
+    ID_CURSOR_BAD_PARAMETERS, PAGE_BAD_PARAMETERS, PAGE_PARAMETERS,
+    PAGE_SORT_BAD_PARAMETERS, SORT_BAD_PARAMETERS, SORT_PARAMETERS,
+    SUGGEST_BAD_PARAMETERS, make_batch_ids)
+from functional.testdata.parameters.film_parameters import \
+    FILM_CURSOR_BAD_PARAMETERS
+from functional.utils.auxiliary import get_film_rating_order
+from settings import BATCH_MAX_SIZE, SUGGEST_MAX_SIZE, ConfTest
 
 
 class TestPersonWithoutData:
@@ -41,7 +49,9 @@ class TestPersonWithoutData:
         response = await make_get_request(url, query_parameters)
         assert len(response.body) == 0
 
-    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS])
+    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS,
+                                                  *CURSOR_BAD_PARAMETERS,
+                                                  *ID_CURSOR_BAD_PARAMETERS])
     @pytest.mark.asyncio
     async def test_person_list_422(self, make_get_request,
                                    settings,
@@ -53,7 +63,9 @@ class TestPersonWithoutData:
     @pytest.mark.parametrize(
         'query_parameters', [*PAGE_BAD_PARAMETERS,
                              *SORT_BAD_PARAMETERS,
-                             *PAGE_SORT_BAD_PARAMETERS])
+                             *PAGE_SORT_BAD_PARAMETERS,
+                             *CURSOR_BAD_PARAMETERS,
+                             *FILM_CURSOR_BAD_PARAMETERS])
     @pytest.mark.asyncio
     async def test_person_films_422(self, make_get_request,
                                     settings,
@@ -63,6 +75,24 @@ class TestPersonWithoutData:
         response = await make_get_request(url, query_parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
 
+    @pytest.mark.asyncio
+    async def test_person_batch_404(self, make_get_request,
+                                    settings: ConfTest):
+        ids = [uuid4() for _ in range(BATCH_MAX_SIZE)]
+        url = settings.person_batch_url
+        response = await make_get_request(url, make_batch_ids(ids))
+        assert response.status == HTTPStatus.OK
+        assert response.body == [None] * BATCH_MAX_SIZE
+
+    @pytest.mark.parametrize('query_parameters', BATCH_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_person_batch_422(self, make_get_request,
+                                    settings: ConfTest,
+                                    query_parameters: dict):
+        url = settings.person_batch_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
 
 @pytest.mark.usefixtures(
     'provide_es_index_data_person', 'provide_es_index_data_movie')
@@ -110,6 +140,31 @@ class TestPerson:
             await assert_film_list(url, parameters, page_size)
             await create_es_film_data(ids)
 
+    @pytest.mark.asyncio
+    async def test_person_list_cursor_walk(
+            self, settings: ConfTest, assert_cursor_walk,
+            model_list_person_input: list[ESPerson]):
+        expected = sorted((person.id for person in model_list_person_input),
+                          key=str)
+        await assert_cursor_walk(settings.person_list_url, {}, 50, expected)
+
+    @pytest.mark.parametrize('sort', ['-imdb_rating', 'imdb_rating'])
+    @pytest.mark.asyncio
+    async def test_person_films_cursor_walk(
+            self, settings: ConfTest, assert_cursor_walk, sort: str,
+            model_list_movie_input: list[ESFilm]):
+        # Персона с наибольшим числом фильмов: среди них есть
+        # фильмы с одинаковым рейтингом на границах страниц
+        person_count = Counter(person_id for film in model_list_movie_input
+                               for person_id in film.person_ids)
+        person_id, _ = person_count.most_common(1)[0]
+        films = [film for film in model_list_movie_input
+                 if person_id in film.person_ids]
+        expected = get_film_rating_order(films,
+                                         descending=sort.startswith('-'))
+        await assert_cursor_walk(settings.person_films_url.format(person_id),
+                                 {'sort': sort}, 4, expected)
+
     @pytest.mark.asyncio
     async def test_person_404(self, make_get_request,
                               settings):
@@ -139,7 +194,9 @@ class TestPerson:
         response = await make_get_request(url, person_list_params_404)
         assert len(response.body) == 0
 
-    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS])
+    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS,
+                                                  *CURSOR_BAD_PARAMETERS,
+                                                  *ID_CURSOR_BAD_PARAMETERS])
     @pytest.mark.asyncio
     async def test_person_list_422(self, make_get_request,
                                    settings,
@@ -151,7 +208,9 @@ class TestPerson:
     @pytest.mark.parametrize('query_parameters',
                              [*PAGE_BAD_PARAMETERS,
                               *SORT_BAD_PARAMETERS,
-                              *PAGE_SORT_BAD_PARAMETERS])
+                              *PAGE_SORT_BAD_PARAMETERS,
+                              *CURSOR_BAD_PARAMETERS,
+                              *FILM_CURSOR_BAD_PARAMETERS])
     @pytest.mark.asyncio
     async def test_person_films_422(self, make_get_request,
                                     settings,
@@ -160,3 +219,75 @@ class TestPerson:
         url = settings.person_films_url.format(exist_person_id)
         response = await make_get_request(url, query_parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @pytest.mark.asyncio
+    async def test_person_batch(self, settings: ConfTest,
+                                assert_batch_response,
+                                model_list_person: list[APIPersonFull]):
+        # Порядок запроса, отсутствующий id и повтор
+        first, second = model_list_person[0].uuid, model_list_person[1].uuid
+        ids = [second, self.uuid_404, first, second]
+        await assert_batch_response(
+            settings.person_batch_url, ids, APIPersonFull, model_list_person)
+
+    @pytest.mark.parametrize('query_parameters', BATCH_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_person_batch_422(self, make_get_request,
+                                    settings: ConfTest,
+                                    query_parameters: dict):
+        url = settings.person_batch_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @pytest.mark.parametrize('prefix, size', [('jam', None),
+                                              ('GEO', 5),
+                                              ('luc', SUGGEST_MAX_SIZE)])
+    @pytest.mark.asyncio
+    async def test_person_suggest(self, settings: ConfTest, assert_suggest,
+                                  prefix: str, size: int,
+                                  model_list_person_input: list[ESPerson]):
+        names = {person.id: person.name for person in model_list_person_input}
+        await assert_suggest(settings.person_suggest_url, prefix, size,
+                             names, 'full_name')
+
+    @pytest.mark.asyncio
+    async def test_person_suggest_empty(self, settings: ConfTest,
+                                        make_get_request):
+        # В ответе ES на пустой результат нет даже списка hits
+        response = await make_get_request(settings.person_suggest_url,
+                                          {'query': 'qzxqzx'})
+        assert response.status == HTTPStatus.OK
+        assert response.body == []
+
+    @pytest.mark.parametrize('query_parameters', SUGGEST_BAD_PARAMETERS)
+    @pytest.mark.asyncio
+    async def test_person_suggest_422(self, make_get_request,
+                                      settings: ConfTest,
+                                      query_parameters: dict):
+        url = settings.person_suggest_url
+        response = await make_get_request(url, query_parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @pytest.mark.parametrize('fields, expected_fields', [
+        ('full_name', {'full_name'}),
+        ('uuid', set()),
+    ])
+    @pytest.mark.asyncio
+    async def test_person_fields(self, settings: ConfTest, make_get_request,
+                                 assert_response_fields,
+                                 exist_person_model: APIPersonFull,
+                                 model_list_person: list[APIPersonFull],
+                                 fields: str, expected_fields: set[str]):
+        person_id = exist_person_model.uuid
+        parameters = {'fields': fields}
+        queries = [
+            (settings.person_list_url, parameters),
+            (settings.person_detail_url.format(person_id), parameters),
+            (settings.person_batch_url,
+             make_batch_ids([person_id]) | parameters),
+            (settings.person_search_url,
+             {'query': exist_person_model.full_name} | parameters),
+        ]
+        for url, query_parameters in queries:
+            response = await make_get_request(url, query_parameters)
+            assert_response_fields(response, expected_fields, model_list_person)
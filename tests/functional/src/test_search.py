@@ -2,10 +2,12 @@ import uuid
 from http import HTTPStatus
 
 import pytest
+from elasticsearch import AsyncElasticsearch
 
 from functional.models.api_models import APIFilmFull
 from functional.models.api_models import APIPersonFull
-from functional.testdata.parameters.base_parameters import PAGE_BAD_PARAMETERS
+from functional.testdata.parameters.base_parameters import (
+    PAGE_BAD_PARAMETERS, SEARCH_CURSOR_BAD_PARAMETERS)
 from settings import ConfTest
 
 
@@ -26,7 +28,8 @@ class TestSearchWithoutData:
         response = await make_get_request(url, parameters)
         assert len(response.body) == 0
 
-    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS])
+    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS,
+                                                  *SEARCH_CURSOR_BAD_PARAMETERS])
     @pytest.mark.asyncio
     async def test_search_film_422(self, make_get_request,
                                    settings: ConfTest,
@@ -37,7 +40,8 @@ class TestSearchWithoutData:
         response = await make_get_request(url, parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
 
-    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS])
+    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS,
+                                                  *SEARCH_CURSOR_BAD_PARAMETERS])
     @pytest.mark.asyncio
     async def test_search_person_422(self, make_get_request,
                                      settings: ConfTest,
@@ -48,6 +52,25 @@ class TestSearchWithoutData:
         response = await make_get_request(url, parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
 
+    @pytest.mark.asyncio
+    async def test_search_all_404(self, make_get_request,
+                                  settings: ConfTest):
+        parameters = {'query': str(uuid.uuid4())}
+        response = await make_get_request(settings.search_url, parameters)
+        assert response.status == HTTPStatus.OK
+        assert response.body == {'films': [], 'persons': [], 'genres': []}
+
+    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS,
+                                                  *SEARCH_CURSOR_BAD_PARAMETERS])
+    @pytest.mark.asyncio
+    async def test_search_all_422(self, make_get_request,
+                                  settings: ConfTest,
+                                  exist_film_model: APIFilmFull,
+                                  query_parameters: dict):
+        parameters = {'query': exist_film_model.title} | query_parameters
+        response = await make_get_request(settings.search_url, parameters)
+        assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
 
 @pytest.mark.usefixtures(
     'provide_es_index_data_person', 'provide_es_index_data_movie',
@@ -114,7 +137,8 @@ class TestSearch:
         response = await make_get_request(url, parameters)
         assert len(response.body) == 0
 
-    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS])
+    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS,
+                                                  *SEARCH_CURSOR_BAD_PARAMETERS])
     @pytest.mark.asyncio
     async def test_search_film_422(self, make_get_request,
                                    settings: ConfTest,
@@ -125,7 +149,8 @@ class TestSearch:
         response = await make_get_request(url, parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
 
-    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS])
+    @pytest.mark.parametrize('query_parameters', [*PAGE_BAD_PARAMETERS,
+                                                  *SEARCH_CURSOR_BAD_PARAMETERS])
     @pytest.mark.asyncio
     async def test_search_person_422(self, make_get_request,
                                      settings: ConfTest,
@@ -135,3 +160,47 @@ class TestSearch:
         url = settings.person_search_url
         response = await make_get_request(url, parameters)
         assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.usefixtures(
+    'provide_es_index_data_person', 'provide_es_index_data_movie',
+    'provide_es_index_data_genre')
+class TestSearchAll:
+
+    @pytest.mark.asyncio
+    async def test_search_all(self, assert_search_all,
+                              search_all_query: str):
+        found = await assert_search_all({'query': search_all_query})
+        assert all(found.values())
+
+    @pytest.mark.asyncio
+    async def test_search_all_pages(self, assert_search_all,
+                                    search_all_query: str):
+        # Страница применяется к каждой группе отдельно
+        first = await assert_search_all(
+            {'query': search_all_query, 'page[size]': 1, 'page[number]': 1})
+        second = await assert_search_all(
+            {'query': search_all_query, 'page[size]': 1, 'page[number]': 2})
+        both = await assert_search_all(
+            {'query': search_all_query, 'page[size]': 2, 'page[number]': 1})
+        for group, ids in both.items():
+            assert ids == first[group] + second[group]
+
+    @pytest.mark.asyncio
+    async def test_search_all_group_error(self, assert_search_all,
+                                          es_client: AsyncElasticsearch,
+                                          settings: ConfTest,
+                                          search_all_query: str):
+        # Поиск по закрытому индексу жанров завершается ошибкой только
+        # в своей группе, остальные группы отдаются как обычно
+        index = settings.elastic_index_genre
+        await es_client.indices.close(index=index)
+        try:
+            found = await assert_search_all(
+                {'query': search_all_query, 'page[size]': 3})
+        finally:
+            await es_client.indices.open(index=index)
+            await es_client.cluster.health(index=index,
+                                           wait_for_status='yellow')
+        assert found['genres'] == []
+        assert found['films'] and found['persons']
@@ -1,3 +1,20 @@
+import base64
+import json
+import uuid
+
+from settings import BATCH_MAX_SIZE, SUGGEST_MAX_SIZE
+
+
+def make_cursor(values) -> str:
+    """Курсор page[cursor] в том же виде, что выдает API"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def make_batch_ids(ids) -> dict:
+    """Параметр ids пакетного запроса - идентификаторы через запятую"""
+    return {'ids': ','.join(str(item) for item in ids)}
+
+
 BASE_PARAMETERS = [{}, ]
 
 PAGE_PARAMETERS = [
@@ -34,3 +51,43 @@ PAGE_SORT_BAD_PARAMETERS = [
     param | SORT_BAD_PARAMETERS[0] if i % 2 == 0
     else param | SORT_BAD_PARAMETERS[1]
     for i, param in enumerate(PAGE_BAD_PARAMETERS)]
+
+# Курсоры, которые не подходят ни одному списку
+CURSOR_BAD_PARAMETERS = [
+    {'page[cursor]': '!!!'},
+    {'page[cursor]': make_cursor([])},
+    {'page[cursor]': make_cursor({'id': 1})},
+    {'page[cursor]': make_cursor([True])},
+    {'page[cursor]': make_cursor([None])},
+    {'page[cursor]': make_cursor([[1], 'id'])},
+]
+
+# Курсоры списков персон и жанров состоят из одного id
+ID_CURSOR_BAD_PARAMETERS = [
+    {'page[cursor]': make_cursor([8.5, 'id'])},
+]
+
+# Поиск листается только по номеру страницы
+SEARCH_CURSOR_BAD_PARAMETERS = [
+    {'page[cursor]': make_cursor(['id'])},
+]
+
+# Пакетный запрос: без id, с пустым списком, с невалидным id и сверх лимита
+BATCH_BAD_PARAMETERS = [
+    {},
+    {'ids': ''},
+    {'ids': ','},
+    {'ids': 'not-uuid'},
+    make_batch_ids([uuid.uuid4(), 'not-uuid']),
+    make_batch_ids(uuid.uuid4() for _ in range(BATCH_MAX_SIZE + 1)),
+]
+
+# Подсказки: без строки, с пустой строкой и с размером вне допустимого
+SUGGEST_BAD_PARAMETERS = [
+    {},
+    {'query': ''},
+    {'query': 'star', 'size': 0},
+    {'query': 'star', 'size': -1},
+    {'query': 'star', 'size': SUGGEST_MAX_SIZE + 1},
+    {'query': 'star', 'size': 'text'},
+]
@@ -1,8 +1,15 @@
 import uuid
 
+from functional.testdata.parameters.base_parameters import make_cursor
+
 random_uuid = str(uuid.uuid4())
 
-FILTER_GENRE_PARAMS = [{'filter[genre]': random_uuid}, ]
+FILTER_GENRE_PARAMS = [
+    {'filter[genre]': random_uuid},
+    {'filter[genre]': random_uuid, 'filter[genre_match]': 'all'},
+    {'filter[person]': random_uuid},
+    {'filter[imdb_rating][gte]': 5, 'filter[imdb_rating][lte]': 7.5},
+]
 
 FILM_ALL_PARAMETERS = [
     {'sort': '-imdb_rating', 'filter[genre]': random_uuid,
@@ -18,4 +25,22 @@ FILM_ALL_BAD_PARAMETERS = [
      'page[size]': -5, 'page[number]': 20},
     {'sort': 'imdb_rating', 'filter[genre]': random_uuid,
      'page[size]': 5, 'page[number]': -20},
+    {'sort': 'imdb_rating', 'fields': 'description'},
+    {'sort': 'imdb_rating', 'fields': ','},
+    {'filter[genre]': random_uuid, 'filter[genre_match]': 'some'},
+    {'filter[imdb_rating][gte]': 11},
+]
+
+# Курсоры списков фильмов состоят из значения сортировки и id
+FILM_CURSOR_BAD_PARAMETERS = [
+    {'page[cursor]': make_cursor([1])},
+    {'page[cursor]': make_cursor([8.5, 'id', 'id'])},
+]
+
+FILM_FACETS_BAD_PARAMETERS = [
+    {'filter[genre]': 'not-uuid'},
+    {'filter[person]': 'not-uuid'},
+    {'filter[genre]': random_uuid, 'filter[genre_match]': 'some'},
+    {'filter[imdb_rating][gte]': 11},
+    {'filter[imdb_rating][lte]': -1},
 ]
@@ -1,5 +1,7 @@
 import json
 import random
+import re
+import struct
 from pathlib import Path
 from typing import TypeVar, Union
 from uuid import UUID
@@ -111,3 +113,31 @@ def get_models_and_ids(response: HTTPResponse, required_model: OUT_MODEL):
         response_models.append(model)
         response_ids.append(model.uuid)
     return response_models, response_ids
+
+
+def get_es_float(value: float) -> float:
+    """Значение в том виде, в котором ES хранит и сортирует поле float"""
+    return struct.unpack('f', struct.pack('f', value))[0]
+
+
+def get_film_rating_order(model_list: list, genre_id: UUID = None,
+                          descending: bool = True) -> list[UUID]:
+    """
+    Идентификаторы входных моделей фильмов в порядке списка фильмов:
+    по рейтингу и id, фильмы без рейтинга в конце при любом направлении.
+    :param genre_id: Только фильмы жанра.
+    :param descending: По убыванию, как в списке по умолчанию.
+    """
+    films = [film for film in model_list
+             if genre_id is None or genre_id in film.genre_ids]
+    films.sort(key=lambda film: (get_es_float(film.imdb_rating or 0),
+                                 str(film.id)),
+               reverse=descending)
+    films.sort(key=lambda film: film.imdb_rating is None)
+    return [film.id for film in films]
+
+
+def is_prefix_match(text: str, prefix: str) -> bool:
+    """Есть ли в тексте слово, которое начинается с префикса подсказки"""
+    return any(word.startswith(prefix.lower())
+               for word in re.findall(r'\w+', text.lower()))
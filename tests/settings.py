@@ -3,15 +3,23 @@ from pathlib import Path
 from pydantic import BaseSettings
 
 BASE_DIR = Path(__file__).resolve(strict=True).parent
+# Исходники API для тестов, которым не нужен запущенный сервис
+SRC_DIR = BASE_DIR.parent / 'src'
+# Исходники ETL для тестов, которые строят данные так же, как ETL
+ETL_DIR = BASE_DIR.parent / 'etl'
 
 ES_PAGE_MAX_SIZE = 10000  # Максимальный размер страницы результатов
 DEFAULT_PAGE_SIZE = 10  # Размер списка выдачи по умолчанию
 MAX_PAGE_SIZE = 500  # Максимальный размер страницы для тестирования
+BATCH_MAX_SIZE = 100  # Максимальное число id в пакетном запросе
+SUGGEST_MAX_SIZE = 20  # Максимальное число подсказок в ответе
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'  # Заголовок с курсором следующей страницы
 
 
 class ConfTest(BaseSettings):
     redis_host: str = 'localhost'
     redis_port: int = 6379
+    redis_invalidation_channel: str = 'cache_invalidation'
     elastic_host: str = 'localhost'
     elastic_port: int = 9200
     elastic_user: str = 'elastic'
@@ -39,14 +47,30 @@ class ConfTest(BaseSettings):
     def person_search_url(self):
         return self.service_url + '/persons/search'
 
+    @property
+    def person_suggest_url(self):
+        return self.service_url + '/persons/suggest'
+
+    @property
+    def film_suggest_url(self):
+        return self.service_url + '/films/suggest'
+
     @property
     def film_search_url(self):
         return self.service_url + '/films/search'
 
+    @property
+    def search_url(self):
+        return self.service_url + '/search'
+
     @property
     def genre_detail_url(self):
         return self.service_url + '/genres/{0}'
 
+    @property
+    def genre_batch_url(self):
+        return self.service_url + '/genres/batch'
+
     @property
     def genre_list_url(self):
         return self.service_url + '/genres'
@@ -55,6 +79,10 @@ class ConfTest(BaseSettings):
     def person_detail_url(self):
         return self.service_url + '/persons/{0}'
 
+    @property
+    def person_batch_url(self):
+        return self.service_url + '/persons/batch'
+
     @property
     def person_list_url(self):
         return self.service_url + '/persons'
@@ -67,6 +95,14 @@ class ConfTest(BaseSettings):
     def film_detail_url(self):
         return self.service_url + '/films/{0}'
 
+    @property
+    def film_batch_url(self):
+        return self.service_url + '/films/batch'
+
     @property
     def film_list_url(self):
         return self.service_url + '/films'
+
+    @property
+    def film_facets_url(self):
+        return self.service_url + '/films/facets'
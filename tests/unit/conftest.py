@@ -0,0 +1,6 @@
+import sys
+
+from settings import SRC_DIR
+
+# Модули API импортируются напрямую, без запущенного сервиса
+sys.path.insert(0, str(SRC_DIR))
@@ -0,0 +1,157 @@
+"""
+Ответы, собранные функциями models/api_wire.py, сравниваются с ответами,
+которые API собирал раньше: документ ES -> модель ES -> модель API ->
+jsonable_encoder FastAPI
+"""
+import copy
+
+import orjson
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from functional.utils.auxiliary import get_json_from_file
+from models.api_models import (APIFilmFull, APIFilmShort, APIGenre,
+                               APIPersonFilmworks, APIPersonFull,
+                               APIPersonShort)
+from models.api_wire import (film_full_wire, film_short_wire, genre_wire,
+                             person_full_wire, person_short_wire,
+                             wire_response)
+from models.es_models import ESFilm, ESGenre, ESPerson
+from settings import ConfTest
+
+settings = ConfTest()
+MOVIES = get_json_from_file(settings.movie_path)
+PERSONS = get_json_from_file(settings.person_path)
+GENRES = get_json_from_file(settings.genre_path)
+
+
+def api_film_short(doc: dict) -> APIFilmShort:
+    film = ESFilm(**doc)
+    return APIFilmShort(
+        uuid=film.id,
+        title=film.title,
+        imdb_rating=film.imdb_rating,
+    )
+
+
+def api_film_full(doc: dict) -> APIFilmFull:
+    film = ESFilm(**doc)
+    return APIFilmFull(
+        uuid=film.id,
+        title=film.title,
+        imdb_rating=film.imdb_rating,
+        description=film.description,
+        genre=[
+            {'uuid': genre.id, 'name': genre.name}
+            for genre in film.genre or []
+        ],
+        actors=[
+            {'uuid': actor.id, 'full_name': actor.name}
+            for actor in film.actors or []
+        ],
+        writers=[
+            {'uuid': writer.id, 'full_name': writer.name}
+            for writer in film.writers or []
+        ],
+        directors=[
+            {'uuid': director.id, 'full_name': director.name}
+            for director in film.directors or []
+        ],
+    )
+
+
+def api_person_short(doc: dict) -> APIPersonShort:
+    person = ESPerson(**doc)
+    return APIPersonShort(uuid=person.id, full_name=person.name)
+
+
+def api_person_full(doc: dict) -> APIPersonFull:
+    person = ESPerson(**doc)
+    return APIPersonFull(
+        uuid=person.id,
+        full_name=person.name,
+        film_ids=[
+            APIPersonFilmworks(
+                role=role_fw.role,
+                filmworks=[fw.id for fw in role_fw.filmworks],
+            )
+            for role_fw in person.filmworks or []
+        ],
+    )
+
+
+def api_genre(doc: dict) -> APIGenre:
+    genre = ESGenre(**doc)
+    return APIGenre(uuid=genre.id, name=genre.name)
+
+
+def film_variants() -> list:
+    """Фильмы тестовых данных и фильмы без рейтинга и без персон"""
+    docs = copy.deepcopy(MOVIES)
+    no_rating = copy.deepcopy(MOVIES[0])
+    no_rating.pop('imdb_rating', None)
+    null_rating = {**copy.deepcopy(MOVIES[1]), 'imdb_rating': None}
+    int_rating = {**copy.deepcopy(MOVIES[2]), 'imdb_rating': 7}
+    empty_persons = {
+        **copy.deepcopy(MOVIES[3]),
+        'actors': [], 'writers': [], 'directors': [], 'genre': [],
+    }
+    null_persons = {
+        **copy.deepcopy(MOVIES[4]),
+        'actors': None, 'writers': None, 'directors': None, 'genre': None,
+    }
+    return docs + [no_rating, null_rating, int_rating, empty_persons, null_persons]
+
+
+def wire_json(data, fields=None):
+    return orjson.loads(wire_response(data, fields).body)
+
+
+def model_json(data, fields=None):
+    if fields is None:
+        return orjson.loads(orjson.dumps(jsonable_encoder(data)))
+    include = set(fields)
+    return orjson.loads(orjson.dumps(jsonable_encoder(
+        [item.dict(include=include) for item in data]
+    )))
+
+
+@pytest.mark.parametrize(
+    'wire, model, docs', [
+        (film_short_wire, api_film_short, film_variants()),
+        (film_full_wire, api_film_full, film_variants()),
+        (person_short_wire, api_person_short, PERSONS),
+        (person_full_wire, api_person_full, PERSONS),
+        (genre_wire, api_genre, GENRES),
+    ],
+    ids=['film_short', 'film_full', 'person_short', 'person_full', 'genre'],
+)
+def test_wire_equals_api_model(wire, model, docs):
+    assert wire_json([wire(**doc) for doc in docs]) == \
+           model_json([model(doc) for doc in docs])
+
+
+def test_wire_single_document():
+    doc = MOVIES[0]
+    assert wire_json(film_full_wire(**doc)) == model_json(api_film_full(doc))
+
+
+def test_wire_person_without_filmworks():
+    doc = {**PERSONS[0], 'filmworks': []}
+    assert wire_json(person_full_wire(**doc)) == model_json(api_person_full(doc))
+    doc.pop('filmworks')
+    assert wire_json(person_full_wire(**doc)) == model_json(api_person_full(doc))
+
+
+@pytest.mark.parametrize(
+    'fields', [['uuid'], ['title'], ['uuid', 'imdb_rating'], ['genre', 'actors']],
+)
+def test_wire_fields(fields):
+    docs = film_variants()
+    assert wire_json([film_full_wire(**doc) for doc in docs], fields) == \
+           model_json([api_film_full(doc) for doc in docs], fields)
+
+
+def test_wire_missing_documents():
+    assert wire_json([film_short_wire(**MOVIES[0]), None]) == \
+           [model_json(api_film_short(MOVIES[0])), None]
@@ -0,0 +1,149 @@
+"""
+Объединение запросов get в mget db/batching.py: каждый ожидающий
+получает свой документ или ту же ошибку, что вернул бы клиент
+"""
+import asyncio
+
+import pytest
+from elasticsearch import ConnectionError, NotFoundError
+
+from db.batching import BatchingElasticsearch
+
+INDEX = 'movies'
+
+
+class FakeClient:
+    def __init__(self, docs: dict = None, error: Exception = None):
+        self.docs = docs or {}
+        self.error = error
+        self.calls = []
+
+    async def mget(self, index: str, body: dict, **kwargs) -> dict:
+        self.calls.append((index, body['ids'], kwargs))
+        if self.error is not None:
+            raise self.error
+        return {'docs': [
+            {'_id': id_, 'found': True, '_source': self.docs[id_]}
+            if id_ in self.docs else {'_id': id_, 'found': False}
+            for id_ in body['ids']
+        ]}
+
+
+def make_batching(client: FakeClient, window: float = 0.01,
+                  max_size: int = 100) -> BatchingElasticsearch:
+    return BatchingElasticsearch(client, window=window, max_size=max_size)
+
+
+@pytest.mark.asyncio
+async def test_gets_merged_into_mget():
+    client = FakeClient({'a': {'title': 'A'}, 'b': {'title': 'B'}})
+    es = make_batching(client)
+
+    docs = await asyncio.gather(
+        es.get(index=INDEX, id='a'),
+        es.get(index=INDEX, id='b'),
+        es.get(index=INDEX, id='a'),
+    )
+    assert [doc['_source'] for doc in docs] == [{'title': 'A'},
+                                                {'title': 'B'},
+                                                {'title': 'A'}]
+    # Повторный id запрашивается один раз
+    assert client.calls == [(INDEX, ['a', 'b'], {})]
+    assert es.stats() == {'gets': 3, 'mgets': 1}
+
+
+@pytest.mark.asyncio
+async def test_different_parameters_not_merged():
+    client = FakeClient({'a': {'title': 'A'}})
+    es = make_batching(client)
+
+    await asyncio.gather(
+        es.get(index=INDEX, id='a'),
+        es.get(index=INDEX, id='a', _source_excludes=['description']),
+        es.get(index=INDEX, id='a', _source_excludes=['description']),
+    )
+    assert sorted(client.calls, key=lambda call: len(call[2])) == [
+        (INDEX, ['a'], {}),
+        (INDEX, ['a'], {'_source_excludes': ('description', )}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_sent_without_waiting():
+    client = FakeClient({'a': {}, 'b': {}, 'c': {}})
+    es = make_batching(client, window=10, max_size=2)
+
+    await asyncio.wait_for(asyncio.gather(
+        es.get(index=INDEX, id='a'),
+        es.get(index=INDEX, id='b'),
+    ), 1)
+    third = asyncio.create_task(es.get(index=INDEX, id='c'))
+    await asyncio.sleep(0.01)
+    # Неполная пачка ждет окончания окна
+    assert not third.done()
+    third.cancel()
+
+
+@pytest.mark.asyncio
+async def test_missing_document_not_found():
+    client = FakeClient({'a': {}})
+    es = make_batching(client)
+
+    found, missing = await asyncio.gather(
+        es.get(index=INDEX, id='a'),
+        es.get(index=INDEX, id='b'),
+        return_exceptions=True,
+    )
+    assert found['_id'] == 'a'
+    assert isinstance(missing, NotFoundError)
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_mget_failure_shared():
+    error = ConnectionError('N/A', 'connection refused', None)
+    es = make_batching(FakeClient(error=error))
+
+    results = await asyncio.gather(
+        es.get(index=INDEX, id='a'),
+        es.get(index=INDEX, id='b'),
+        return_exceptions=True,
+    )
+    assert results == [error, error]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_get_does_not_cancel_others():
+    client = FakeClient({'a': {}})
+    es = make_batching(client)
+
+    cancelled = asyncio.create_task(es.get(index=INDEX, id='a'))
+    waiting = asyncio.create_task(es.get(index=INDEX, id='a'))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert (await waiting)['_id'] == 'a'
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+
+@pytest.mark.asyncio
+async def test_cancelled_mget_releases_waiters():
+    class HangingClient(FakeClient):
+        async def mget(self, index: str, body: dict, **kwargs) -> dict:
+            self.calls.append((index, body['ids'], kwargs))
+            await asyncio.Event().wait()
+
+    client = HangingClient()
+    es = make_batching(client)
+    gets = [asyncio.create_task(es.get(index=INDEX, id=id_))
+            for id_ in ('a', 'b')]
+    while not client.calls:
+        await asyncio.sleep(0.01)
+
+    for task in es._tasks:
+        task.cancel()
+    results = await asyncio.wait_for(
+        asyncio.gather(*gets, return_exceptions=True), 1)
+    assert all(isinstance(result, asyncio.CancelledError)
+               for result in results)
@@ -0,0 +1,90 @@
+"""
+Ключ кэширования services/cache_key.py должен совпадать у равнозначных
+запросов и различаться у запросов с разной выдачей
+"""
+from uuid import uuid4
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.requests import Request
+
+from models.api_models import (APIFilmShort, get_batch_ids, get_fields,
+                               get_film_filter)
+from services.cache_key import get_cache_key, match_route
+
+app = FastAPI()
+
+
+@app.get("/films")
+async def films(film_filter=Depends(get_film_filter),
+                fields=Depends(get_fields(APIFilmShort))):
+    return []
+
+
+@app.get("/films/batch")
+async def films_batch(film_ids=Depends(get_batch_ids)):
+    return []
+
+
+def make_cache_key(query_string: str, path: str = '/films') -> str:
+    request = Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'root_path': '',
+        'query_string': query_string.encode(),
+        'headers': [],
+        'app': app,
+    })
+    route, path_params = match_route(request)
+    return get_cache_key(request, route, path_params)
+
+
+first_id, second_id = sorted(str(uuid4()) for _ in range(2))
+
+
+@pytest.mark.parametrize('query_string, same_query_string', [
+    (f'filter[genre]={first_id}&filter[genre]={second_id}',
+     f'filter[genre]={second_id}&filter[genre]={first_id}'),
+    (f'filter[genre]={first_id}',
+     f'filter[genre]={first_id}&filter[genre]={first_id}'),
+    (f'filter[person]={first_id}&filter[person]={second_id}',
+     f'filter[person]={second_id}&filter[person]={first_id}'),
+    ('fields=title,uuid', 'fields=uuid,title'),
+    ('fields=title,uuid', 'fields= uuid , title,title'),
+    ('fields=title', 'fields=title,'),
+    # Идентификатор возвращается всегда
+    ('fields=title', 'fields=title,uuid'),
+])
+def test_cache_key_equal(query_string: str, same_query_string: str):
+    assert make_cache_key(query_string) == make_cache_key(same_query_string)
+
+
+@pytest.mark.parametrize('query_string, other_query_string', [
+    (f'filter[genre]={first_id}',
+     f'filter[genre]={first_id}&filter[genre]={second_id}'),
+    (f'filter[genre]={first_id}', f'filter[person]={first_id}'),
+    ('fields=title', 'fields=title,imdb_rating'),
+])
+def test_cache_key_differs(query_string: str, other_query_string: str):
+    assert make_cache_key(query_string) != make_cache_key(other_query_string)
+
+
+@pytest.mark.parametrize('query_string, same_query_string', [
+    (f'ids={first_id},{second_id}', f'ids= {first_id.upper()} ,{second_id},'),
+    (f'ids={first_id}', f'ids={first_id.replace("-", "")}'),
+    (f'ids={first_id},{first_id}', f'ids={first_id},{first_id.upper()}'),
+])
+def test_batch_cache_key_equal(query_string: str, same_query_string: str):
+    assert make_cache_key(query_string, '/films/batch') == make_cache_key(
+        same_query_string, '/films/batch')
+
+
+@pytest.mark.parametrize('query_string, other_query_string', [
+    # Ответ повторяет порядок и повторы идентификаторов запроса
+    (f'ids={first_id},{second_id}', f'ids={second_id},{first_id}'),
+    (f'ids={first_id}', f'ids={first_id},{first_id}'),
+])
+def test_batch_cache_key_differs(query_string: str, other_query_string: str):
+    assert make_cache_key(query_string, '/films/batch') != make_cache_key(
+        other_query_string, '/films/batch')
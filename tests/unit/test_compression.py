@@ -0,0 +1,114 @@
+"""
+Записи кэша ответов: сериализация CachedResponse, сжатие тела
+и выбор между сжатым и распакованным ответом по Accept-Encoding
+"""
+import pytest
+from fakeredis.aioredis import FakeRedis
+from pydantic import ValidationError
+
+from core.config import AppSettings
+from services.cache import CachedResponse, ResponseCache
+from utilites.compression import accepts_encoding, compress, decompress
+from utilites.memory_cache import MemoryCache
+
+BODY = b'[{"uuid": "3d825f60", "title": "Star\\nWars"}]\n' * 20
+
+
+def make_value(**kwargs) -> CachedResponse:
+    return CachedResponse(
+        body=BODY,
+        status_code=200,
+        media_type='application/json',
+        created_at=1000.5,
+        fresh_for=60,
+        delta=0.25,
+        tags=('movies', 'movies:3d825f60'),
+        headers=(('x-next-cursor', 'WzguNSwiaWQiXQ'), ),
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize('encoding', [None, 'gzip', 'zstd'])
+def test_cached_response_round_trip(encoding):
+    value = make_value()
+    if encoding is not None:
+        value = value.compress(encoding)
+    # Перевод строки в теле не мешает отделить его от метаданных
+    assert CachedResponse.loads(value.dumps()) == value
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'zstd'])
+def test_compress_round_trip(encoding):
+    compressed = compress(BODY, encoding)
+    assert len(compressed) < len(BODY)
+    assert decompress(compressed, encoding) == BODY
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'zstd'])
+def test_compressed_response(encoding):
+    value = make_value().compress(encoding)
+
+    response = value.to_response(f'br, {encoding}')
+    assert response.headers['content-encoding'] == encoding
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert decompress(response.body, encoding) == BODY
+
+    # Клиент без поддержки сжатия получает распакованное тело
+    response = value.to_response('')
+    assert 'content-encoding' not in response.headers
+    assert response.body == BODY
+    assert response.headers['x-next-cursor'] == 'WzguNSwiaWQiXQ'
+
+
+@pytest.mark.parametrize('accept_encoding, accepted', [
+    ('gzip', True),
+    ('GZIP', True),
+    ('deflate, gzip;q=0.5', True),
+    ('gzip; q=1.0', True),
+    ('gzip;q=0', False),
+    ('gzip;q=0.000', False),
+    ('gzip;q=text', False),
+    ('*', True),
+    ('*;q=0', False),
+    ('deflate, br', False),
+    ('gzipx', False),
+    ('', False),
+])
+def test_accepts_encoding(accept_encoding: str, accepted: bool):
+    assert accepts_encoding(accept_encoding, 'gzip') is accepted
+
+
+@pytest.mark.asyncio
+async def test_cache_compresses_large_bodies():
+    response_cache = ResponseCache(
+        redis=FakeRedis(),
+        memory=MemoryCache(max_size=100, ttl=60),
+        default_expire=60,
+        max_body_size=10 * len(BODY),
+        compression='zstd',
+        compression_min_size=len(BODY),
+    )
+    await response_cache.set('large', make_value(), 60)
+    small = CachedResponse(body=b'[]', status_code=200,
+                           media_type='application/json')
+    await response_cache.set('small', small, 60)
+
+    large_value, _ = await response_cache.get('large')
+    assert large_value.encoding == 'zstd'
+    assert large_value.to_response('').body == BODY
+    small_value, _ = await response_cache.get('small')
+    assert small_value.encoding is None
+    assert small_value.body == b'[]'
+
+
+@pytest.mark.parametrize('compression', ['brotli', 'GZIP', 'none'])
+def test_unknown_compression_rejected(monkeypatch, compression: str):
+    monkeypatch.setenv('CACHE_COMPRESSION', compression)
+    with pytest.raises(ValidationError):
+        AppSettings()
+
+
+@pytest.mark.parametrize('compression', ['', 'gzip', 'zstd'])
+def test_compression_setting(monkeypatch, compression: str):
+    monkeypatch.setenv('CACHE_COMPRESSION', compression)
+    assert AppSettings().CACHE_COMPRESSION == compression
@@ -0,0 +1,106 @@
+"""
+Кэш документов services/entity_cache.py: документ, прочитанный из ES
+до сообщения ETL о его изменении, не должен сохраниться после сброса
+"""
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from services import entity_cache as entity_cache_module
+from services.cache import (ResponseCache, get_entity_tags, get_tag_key,
+                            get_tag_version_key)
+from services.entity_cache import EntityCache, hydrate
+from utilites.memory_cache import MemoryCache
+
+INDEX = 'movies'
+EXPIRE = 60
+
+
+def make_caches(redis: FakeRedis) -> tuple[EntityCache, ResponseCache]:
+    response_cache = ResponseCache(
+        redis=redis,
+        memory=MemoryCache(max_size=100, ttl=60),
+        default_expire=60,
+        max_body_size=1024,
+    )
+    return EntityCache(redis, EXPIRE), response_cache
+
+
+class FakeDataSource:
+    """ES, во время чтения из которого ETL сообщает об изменении документов"""
+
+    def __init__(self, docs: dict, on_read=None):
+        self.docs = docs
+        self.on_read = on_read
+
+    async def mget(self, index: str, body: dict, **kwargs) -> dict:
+        if self.on_read is not None:
+            await self.on_read()
+        return {'docs': [
+            {'_id': id_, 'found': True, '_source': self.docs[id_]}
+            for id_ in body['ids']
+        ]}
+
+
+@pytest.mark.asyncio
+async def test_store_with_current_version():
+    redis = FakeRedis()
+    entity_cache, response_cache = make_caches(redis)
+    await response_cache.invalidate(get_entity_tags(INDEX, ['a']))
+
+    versions = await entity_cache.get_versions(INDEX, ['a', 'b'])
+    assert versions == {'a': b'1'}
+    await entity_cache.set_many(INDEX, {'a': {'id': 'a'}, 'b': {'id': 'b'}},
+                                versions)
+
+    assert await entity_cache.get_many(INDEX, ['a', 'b', 'c']) == {
+        'a': {'id': 'a'}, 'b': {'id': 'b'}}
+    assert await redis.sismember(get_tag_key(f'{INDEX}:a'), 'entity:movies:a')
+    assert 0 < await redis.ttl('entity:movies:a') <= EXPIRE
+    assert await redis.ttl(get_tag_key(f'{INDEX}:a')) >= EXPIRE - 1
+
+
+@pytest.mark.asyncio
+async def test_store_refused_after_version_bump():
+    redis = FakeRedis()
+    entity_cache, response_cache = make_caches(redis)
+    versions = await entity_cache.get_versions(INDEX, ['a', 'b'])
+
+    # ETL сообщил об изменении 'a' после того, как запомнили версии
+    await response_cache.invalidate(get_entity_tags(INDEX, ['a']))
+    assert await redis.get(get_tag_version_key(f'{INDEX}:a')) == b'1'
+    await entity_cache.set_many(INDEX, {'a': {'id': 'a'}, 'b': {'id': 'b'}},
+                                versions)
+
+    assert await entity_cache.get_many(INDEX, ['a', 'b']) == {
+        'b': {'id': 'b'}}
+    assert not await redis.exists(get_tag_key(f'{INDEX}:a'))
+
+
+@pytest.mark.asyncio
+async def test_entity_invalidated_with_tag():
+    redis = FakeRedis()
+    entity_cache, response_cache = make_caches(redis)
+    await entity_cache.set_many(INDEX, {'a': {'id': 'a'}}, {})
+
+    await response_cache.invalidate(get_entity_tags(INDEX, ['a']))
+    assert await entity_cache.get_many(INDEX, ['a']) == {}
+
+
+@pytest.mark.asyncio
+async def test_hydrate_skips_changed_documents(monkeypatch):
+    redis = FakeRedis()
+    entity_cache, response_cache = make_caches(redis)
+    monkeypatch.setattr(entity_cache_module, 'entity_cache', entity_cache)
+
+    async def change_a():
+        await response_cache.invalidate(get_entity_tags(INDEX, ['a']))
+
+    data_source = FakeDataSource({'a': {'id': 'a', 'title': 'old'},
+                                  'b': {'id': 'b', 'title': 'B'}},
+                                 on_read=change_a)
+    docs = await hydrate(data_source, INDEX, ['a', 'b'], fields=['title'])
+
+    # Запрос получает прочитанные документы, но в кэш попадает только 'b'
+    assert docs == [{'id': 'a', 'title': 'old'}, {'id': 'b', 'title': 'B'}]
+    assert await entity_cache.get_many(INDEX, ['a', 'b']) == {
+        'b': {'id': 'b', 'title': 'B'}}
@@ -0,0 +1,91 @@
+"""
+Фильтры существования документов: фильтр, который строит ETL
+(etl/lib/providers/existence_filter.py), API (services/existence.py)
+должен читать из Redis без ложноотрицательных ответов
+"""
+import uuid
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from lib.providers.existence_filter import BloomFilter as ETLBloomFilter
+from lib.providers.existence_filter import MIN_CAPACITY, RedisExistenceFilter
+from services.existence import ExistenceFilters
+from utilites.bloom_filter import BloomFilter
+
+INDEX = 'movies'
+ERROR_RATE = 0.01
+
+
+def make_ids(count: int) -> list[str]:
+    return [str(uuid.uuid4()) for _ in range(count)]
+
+
+def make_filters() -> tuple[RedisExistenceFilter, ExistenceFilters]:
+    redis = FakeRedis()
+    etl_filter = RedisExistenceFilter()
+    etl_filter.redis = redis
+    return etl_filter, ExistenceFilters(redis)
+
+
+def test_bloom_filter_parity():
+    etl_filter = ETLBloomFilter(capacity=1000, error_rate=ERROR_RATE)
+    api_filter = BloomFilter.for_capacity(1000, ERROR_RATE)
+    assert (api_filter.size, api_filter.hashes) == (etl_filter.size,
+                                                    etl_filter.hashes)
+
+    ids = make_ids(500)
+    for id_ in ids:
+        etl_filter.add(id_)
+    api_filter = BloomFilter(etl_filter.size, etl_filter.hashes,
+                             bytes(etl_filter.bits))
+    assert all(id_ in api_filter for id_ in ids)
+    # Повторно добавленная строка не расходует емкость фильтра
+    count = etl_filter.count
+    assert not etl_filter.add(ids[0])
+    assert etl_filter.count == count
+
+
+@pytest.mark.asyncio
+async def test_rebuilt_filter_loaded_by_api():
+    etl_filter, filters = make_filters()
+    ids = make_ids(MIN_CAPACITY)
+    await etl_filter.rebuild(INDEX, ids)
+    assert await filters.load(INDEX) is not None
+
+    assert all(filters.might_contain(INDEX, id_) for id_ in ids)
+    unknown = make_ids(1000)
+    false_positives = sum(filters.might_contain(INDEX, id_) for id_ in unknown)
+    assert false_positives < 1000 * ERROR_RATE * 5
+
+
+@pytest.mark.asyncio
+async def test_added_ids_loaded_by_api():
+    # ETL дописывает биты новых документов через SETBIT: порядок бит
+    # в байте должен совпасть с тем, как их читает API
+    etl_filter, filters = make_filters()
+    await etl_filter.rebuild(INDEX, make_ids(10))
+    ids = make_ids(100)
+    assert await etl_filter.add(INDEX, ids)
+
+    await filters.load(INDEX)
+    assert all(filters.might_contain(INDEX, id_) for id_ in ids)
+
+
+@pytest.mark.asyncio
+async def test_api_filter_updated_by_messages():
+    etl_filter, filters = make_filters()
+    await etl_filter.rebuild(INDEX, make_ids(10))
+    await filters.load(INDEX)
+
+    # Сообщение ETL о документе приходит раньше перезагрузки фильтра
+    id_ = str(uuid.uuid4())
+    filters.add(INDEX, [id_])
+    assert filters.might_contain(INDEX, id_)
+
+
+@pytest.mark.asyncio
+async def test_missing_filter_allows_everything():
+    _, filters = make_filters()
+    assert await filters.load(INDEX) is None
+    assert filters.might_contain(INDEX, uuid.uuid4())
@@ -0,0 +1,156 @@
+"""
+Списки фильмов по рейтингу: то, что строит ETL (etl/lib/providers/list_views.py),
+API (services/list_views.py) должен листать в порядке сортировки ES -
+по убыванию рейтинга и id, фильмы без рейтинга в конце
+"""
+import struct
+import uuid
+
+import orjson
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from lib.providers.list_views import RedisFilmRatingViews
+from services.list_views import MISSING_RATING_SORT_VALUE, FilmRatingViews
+
+GENRE_A, GENRE_B = (str(uuid.uuid4()) for _ in range(2))
+RATINGS = [8.6, 8.6, 8.6, 7.3, 7.3, None, None, 5.0, 9.1, None, 7.3, 0.0]
+
+
+def make_films() -> list[dict]:
+    # Одинаковые рейтинги и отсутствующий рейтинг встречаются в обоих жанрах
+    return [
+        {
+            'id': str(uuid.uuid4()),
+            'imdb_rating': rating,
+            'genre_ids': [[GENRE_A], [GENRE_B], [GENRE_A, GENRE_B]][i % 3],
+        }
+        for i, rating in enumerate(RATINGS)
+    ]
+
+
+def es_float(value: float) -> float:
+    """Рейтинг в том виде, в котором его хранит и сортирует ES (float)"""
+    return struct.unpack('f', struct.pack('f', value))[0]
+
+
+def es_order(films: list[dict], genre_id: str = None) -> list[str]:
+    """Порядок сортировки ES: -imdb_rating, -id, без рейтинга - в конце"""
+    films = [film for film in films
+             if genre_id is None or genre_id in film['genre_ids']]
+    films.sort(key=lambda film: (film['imdb_rating'] is not None,
+                                 es_float(film['imdb_rating'] or 0),
+                                 film['id']),
+               reverse=True)
+    return [film['id'] for film in films]
+
+
+async def make_views(films: list[dict]) -> tuple[RedisFilmRatingViews,
+                                                 FilmRatingViews]:
+    redis = FakeRedis()
+    etl_views = RedisFilmRatingViews()
+    etl_views.redis = redis
+    await etl_views.rebuild(films)
+    return etl_views, FilmRatingViews(redis)
+
+
+async def walk_by_number(views: FilmRatingViews, genre_id, size) -> list[str]:
+    ids, start = [], 0
+    while True:
+        items = await views.get_page(genre_id, start, size)
+        ids += [film_id for film_id, _ in items]
+        if len(items) < size:
+            return ids
+        start += size
+
+
+async def walk_by_cursor(views: FilmRatingViews, genre_id, size,
+                         cursors: list = None) -> list[str]:
+    """Листает список так же, как FilmService._get_page_from_views"""
+    items = await views.get_page(genre_id, 0, size)
+    ids = [film_id for film_id, _ in items]
+    while True:
+        search_after = views.get_search_after(items, size)
+        if search_after is None:
+            return ids
+        # Курсор проходит через клиента в JSON
+        search_after = orjson.loads(orjson.dumps(search_after))
+        if cursors is not None:
+            cursors.append(search_after)
+        start = await views.get_position_after(genre_id, search_after)
+        assert start is not None
+        items = await views.get_page(genre_id, start, size)
+        ids += [film_id for film_id, _ in items]
+
+
+@pytest.mark.parametrize('genre_id', [None, GENRE_A, GENRE_B])
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 20])
+@pytest.mark.asyncio
+async def test_views_order(genre_id, size):
+    films = make_films()
+    _, views = await make_views(films)
+    expected = es_order(films, genre_id)
+
+    assert await walk_by_number(views, genre_id, size) == expected
+    assert await walk_by_cursor(views, genre_id, size) == expected
+
+
+@pytest.mark.asyncio
+async def test_views_missing_rating_cursor():
+    films = make_films()
+    _, views = await make_views(films)
+    cursors = []
+    await walk_by_cursor(views, None, 1, cursors)
+
+    missing = [cursor for cursor in cursors
+               if cursor[0] == MISSING_RATING_SORT_VALUE]
+    # Курсор отдается после каждой полной страницы, в том числе последней
+    assert len(missing) == RATINGS.count(None)
+    # Курсор ES со значением сортировки фильма с рейтингом float
+    film = next(film for film in films if film['imdb_rating'] == 7.3)
+    position = await views.get_position_after(
+        None, [es_float(7.3), film['id']])
+    assert position == es_order(films).index(film['id']) + 1
+
+
+@pytest.mark.asyncio
+async def test_views_update_moves_genres():
+    films = make_films()
+    etl_views, views = await make_views(films)
+    moved = next(film for film in films if film['genre_ids'] == [GENRE_A])
+    old_cursor = [es_float(moved['imdb_rating']), moved['id']]
+    new_film = {'id': str(uuid.uuid4()), 'imdb_rating': 7.3,
+                'genre_ids': [GENRE_A]}
+
+    moved.update(imdb_rating=None, genre_ids=[GENRE_B])
+    await etl_views.update([moved, new_film])
+    films.append(new_film)
+
+    for genre_id in (None, GENRE_A, GENRE_B):
+        assert await walk_by_number(views, genre_id, 2) == es_order(
+            films, genre_id)
+        assert await walk_by_cursor(views, genre_id, 2) == es_order(
+            films, genre_id)
+    assert moved['id'] not in await walk_by_number(views, GENRE_A, 20)
+    # Курсор со старым рейтингом по спискам не продолжается - страницу отдаст ES
+    assert await views.get_position_after(None, old_cursor) is None
+    assert await views.get_position_after(GENRE_A, old_cursor) is None
+
+
+@pytest.mark.asyncio
+async def test_views_rebuild_drops_old_genres():
+    films = make_films()
+    etl_views, views = await make_views(films)
+    for film in films:
+        film['genre_ids'] = [GENRE_B]
+    await etl_views.rebuild(films)
+
+    assert await walk_by_number(views, GENRE_A, 5) == []
+    assert await walk_by_number(views, GENRE_B, 5) == es_order(films)
+
+
+@pytest.mark.asyncio
+async def test_views_not_ready():
+    views = FilmRatingViews(FakeRedis())
+    assert await views.get_page(None, 0, 10) is None
+    assert await views.get_position_after(None, [8.6, 'id']) is None
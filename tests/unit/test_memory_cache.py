@@ -0,0 +1,125 @@
+"""
+Кэш в памяти процесса utilites/memory_cache.py: вытеснение по LRU,
+допуск новых ключей по TinyLFU и ограничение времени жизни записей
+"""
+import time
+
+import pytest
+
+from utilites.memory_cache import FrequencySketch, MemoryCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(time, 'monotonic', clock)
+    return clock
+
+
+def touch(cache: MemoryCache, key: str, times: int) -> None:
+    """Обращения к ключу, которые учитывает политика допуска"""
+    for _ in range(times):
+        cache.get(key)
+
+
+def test_get_set(clock):
+    cache = MemoryCache(max_size=2, ttl=60)
+    assert cache.get('a') is None
+    assert cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert cache.set('a', 2)
+    assert cache.get('a') == 2
+    assert len(cache) == 1
+
+
+def test_zero_size_stores_nothing(clock):
+    cache = MemoryCache(max_size=0, ttl=60)
+    assert not cache.set('a', 1)
+    assert cache.get('a') is None
+
+
+def test_frequent_key_evicts_least_recent(clock):
+    cache = MemoryCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # 'a' использовался недавно, самая старая запись - 'b'
+    touch(cache, 'a', 1)
+    touch(cache, 'c', 2)
+
+    assert cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_rare_key_not_admitted(clock):
+    cache = MemoryCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    touch(cache, 'a', 3)
+    touch(cache, 'b', 3)
+
+    # К новому ключу обращались реже, чем к вытесняемой записи
+    assert not cache.set('c', 3)
+    assert cache.get('c') is None
+    assert cache.get('a') == 1
+    assert cache.get('b') == 2
+
+
+def test_expired_victim_evicted(clock):
+    cache = MemoryCache(max_size=2, ttl=60)
+    touch(cache, 'a', 5)
+    cache.set('a', 1, ttl=10)
+    cache.set('b', 2)
+    clock.now += 11
+
+    # Просроченная запись вытесняется независимо от частоты обращений
+    assert cache.set('c', 3)
+    assert cache.get('c') == 3
+    assert cache.get('b') == 2
+
+
+def test_ttl_capped(clock):
+    cache = MemoryCache(max_size=10, ttl=60)
+    cache.set('short', 1, ttl=10)
+    cache.set('long', 2, ttl=3600)
+    cache.set('default', 3)
+
+    clock.now += 11
+    assert cache.get('short') is None
+    assert cache.get('long') == 2
+    # Время жизни записи не больше времени жизни кэша
+    clock.now += 50
+    assert cache.get('long') is None
+    assert cache.get('default') is None
+
+
+def test_items_skips_expired(clock):
+    cache = MemoryCache(max_size=10, ttl=60)
+    cache.set('a', 1, ttl=10)
+    cache.set('b', 2)
+    clock.now += 11
+
+    assert cache.items() == [('b', 2)]
+    cache.delete('b')
+    assert cache.items() == []
+
+
+def test_sketch_counts_capped_and_halved():
+    sketch = FrequencySketch(capacity=64)
+    for _ in range(FrequencySketch.MAX_COUNT + 5):
+        sketch.increment('a')
+    assert sketch.frequency('a') == FrequencySketch.MAX_COUNT
+
+    # После выборки из 10 * capacity обращений счетчики делятся пополам
+    for i in range(10 * 64):
+        sketch.increment(f'key-{i}')
+    assert sketch.frequency('a') < FrequencySketch.MAX_COUNT
@@ -0,0 +1,153 @@
+"""
+Кэш ответов services/cache.py на fakeredis: ответ, сущности которого
+изменились, пока он формировался, не должен попадать в кэш
+"""
+import asyncio
+import time
+
+import orjson
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from services.cache import (CachedResponse, CachePolicy, ResponseCache,
+                            cache_tags, get_entity_tags, get_tag_key,
+                            tag_response)
+from utilites.memory_cache import MemoryCache
+
+CHANNEL = 'cache_invalidation'
+FILM_ID = '3d825f60-9fff-4dfe-b294-1a45fa1e115d'
+KEY = f'/api/v1/films/{FILM_ID}?'
+POLICY = CachePolicy(expire=60)
+
+
+def make_response_cache(redis: FakeRedis) -> ResponseCache:
+    return ResponseCache(
+        redis=redis,
+        memory=MemoryCache(max_size=100, ttl=60),
+        default_expire=60,
+        max_body_size=1024,
+    )
+
+
+async def lead(response_cache: ResponseCache, body, started_at: float) -> bytes:
+    """Ответ ведущего запроса, отмеченный тегами фильма"""
+    tags = set()
+    cache_tags.set(tags)
+    tag_response(*get_entity_tags('movies', [FILM_ID]))
+    is_leader, _ = await response_cache.join(KEY)
+    assert is_leader
+    chunks = [chunk async for chunk in response_cache.stream_and_store(
+        key=KEY,
+        body_iterator=body,
+        status_code=200,
+        media_type='application/json',
+        headers=[],
+        tags=tags,
+        policy=POLICY,
+        started_at=started_at,
+    )]
+    await asyncio.gather(*response_cache._background_tasks)
+    return b''.join(chunks)
+
+
+async def one_chunk(data: bytes, before=None):
+    if before is not None:
+        await before()
+    yield data
+
+
+async def wait_until(condition, timeout: float = 1.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+
+async def wait_until_subscribed(redis: FakeRedis, timeout: float = 1.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not (await redis.pubsub_numsub(CHANNEL))[0][1]:
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_leader_result_cached():
+    redis = FakeRedis()
+    response_cache = make_response_cache(redis)
+    await lead(response_cache, one_chunk(b'{"title": "old"}'), time.time())
+
+    value, _ = await response_cache.get(KEY)
+    assert value.body == b'{"title": "old"}'
+    assert await redis.sismember(get_tag_key(f'movies:{FILM_ID}'), KEY)
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_slow_leader():
+    redis = FakeRedis()
+    response_cache = make_response_cache(redis)
+    listener = asyncio.create_task(response_cache.listen_invalidations(CHANNEL))
+    try:
+        await wait_until_subscribed(redis)
+
+        async def publish_change():
+            # Документ уже прочитан, а ETL в это время сообщает о его изменении
+            message = {'index': 'movies', 'ids': [FILM_ID]}
+            await redis.publish(CHANNEL, orjson.dumps(message))
+            await wait_until(
+                lambda: f'movies:{FILM_ID}' in response_cache._invalidated_at)
+
+        body = await lead(
+            response_cache,
+            one_chunk(b'{"title": "old"}', before=publish_change),
+            time.time(),
+        )
+    finally:
+        listener.cancel()
+
+    # Клиент ведущего запроса получает то, что успел прочитать
+    assert body == b'{"title": "old"}'
+    # Но в L1 и L2 этот ответ не сохраняется
+    assert await response_cache.get(KEY) == (None, None)
+    assert await redis.get(KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_set_checks_invalidation_after_write():
+    # Сброс, начавшийся до записи, мог прочитать множество тега раньше нее:
+    # set сам удаляет только что записанный ответ
+    redis = FakeRedis()
+    response_cache = make_response_cache(redis)
+    started_at = time.time()
+    await response_cache.invalidate(get_entity_tags('movies', [FILM_ID]))
+
+    value = CachedResponse(
+        body=b'{}', status_code=200, media_type='application/json',
+        tags=(f'movies:{FILM_ID}', ),
+    )
+    assert not await response_cache.set(KEY, value, 60, started_at)
+    assert await response_cache.get(KEY) == (None, None)
+    assert await response_cache.set(KEY, value, 60)
+
+
+@pytest.mark.asyncio
+async def test_old_invalidation_does_not_block_write():
+    redis = FakeRedis()
+    response_cache = make_response_cache(redis)
+    await response_cache.invalidate(get_entity_tags('movies', [FILM_ID]))
+    await asyncio.sleep(0.01)
+
+    await lead(response_cache, one_chunk(b'{"title": "new"}'), time.time())
+    value, _ = await response_cache.get(KEY)
+    assert value.body == b'{"title": "new"}'
+
+
+@pytest.mark.asyncio
+async def test_other_entity_invalidation_does_not_block_write():
+    redis = FakeRedis()
+    response_cache = make_response_cache(redis)
+    started_at = time.time()
+    await response_cache.invalidate({'movies:another-film'})
+
+    await lead(response_cache, one_chunk(b'{"title": "new"}'), started_at)
+    value, _ = await response_cache.get(KEY)
+    assert value.body == b'{"title": "new"}'
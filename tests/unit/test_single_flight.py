@@ -0,0 +1,124 @@
+"""
+Объединение одновременных запросов utilites/single_flight.py: результат
+ведущего участника получают все ожидающие, а ведущий, который не сообщил
+результат, не задерживает их дольше таймаута
+"""
+import asyncio
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from services.cache import CachePolicy, ResponseCache, cache_tags
+from utilites.memory_cache import MemoryCache
+from utilites.single_flight import SingleFlight
+
+KEY = '/api/v1/films/?'
+
+
+async def start_follower(flights: SingleFlight, timeout: float = None) -> asyncio.Task:
+    task = asyncio.create_task(flights.join(KEY, timeout))
+    # Участник должен дойти до ожидания результата ведущего
+    await asyncio.sleep(0)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_followers_get_leader_result():
+    flights = SingleFlight()
+    assert await flights.join(KEY) == (True, None)
+    followers = [await start_follower(flights) for _ in range(3)]
+    assert KEY in flights
+
+    flights.finish(KEY, 'result')
+    assert await asyncio.gather(*followers) == [(False, 'result')] * 3
+    assert len(flights) == 0
+    # Следующая операция с тем же ключом начинается заново
+    assert await flights.join(KEY) == (True, None)
+
+
+@pytest.mark.asyncio
+async def test_follower_timeout_drops_operation():
+    flights = SingleFlight()
+    await flights.join(KEY)
+    follower = await start_follower(flights, timeout=0.01)
+
+    assert await follower == (False, None)
+    assert KEY not in flights
+    assert await flights.join(KEY) == (True, None)
+
+
+@pytest.mark.asyncio
+async def test_finish_ignores_other_operation():
+    flights = SingleFlight()
+    await flights.join(KEY)
+    old_future = flights._calls[KEY]
+    flights.finish(KEY)
+    await flights.join(KEY)
+    follower = await start_follower(flights)
+
+    # Опоздавший участник старой операции не завершает новую
+    flights.finish(KEY, 'stale', old_future)
+    assert KEY in flights
+    assert not follower.done()
+    flights.finish(KEY, 'result')
+    assert await follower == (False, 'result')
+
+
+@pytest.mark.asyncio
+async def test_cancelled_follower_does_not_cancel_others():
+    flights = SingleFlight()
+    await flights.join(KEY)
+    cancelled = await start_follower(flights)
+    follower = await start_follower(flights)
+
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    flights.finish(KEY, 'result')
+    assert await follower == (False, 'result')
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_abandons_response():
+    response_cache = ResponseCache(
+        redis=FakeRedis(),
+        memory=MemoryCache(max_size=100, ttl=60),
+        default_expire=60,
+        max_body_size=1024,
+        lock_timeout=10,
+    )
+    cache_tags.set(set())
+    body_started = asyncio.Event()
+
+    async def endless_body():
+        body_started.set()
+        await asyncio.Event().wait()
+        yield b''
+
+    async def lead():
+        is_leader, _ = await response_cache.join(KEY)
+        assert is_leader
+        async for _ in response_cache.stream_and_store(
+                key=KEY,
+                body_iterator=endless_body(),
+                status_code=200,
+                media_type='application/json',
+                headers=[],
+                tags=set(),
+                policy=CachePolicy(expire=60),
+                started_at=0,
+        ):
+            pass
+
+    leader = asyncio.create_task(lead())
+    await body_started.wait()
+    follower = asyncio.create_task(response_cache.join(KEY))
+    await asyncio.sleep(0)
+
+    # Клиент ведущего запроса отключился: ожидающий запрос не ждет
+    # таймаута объединения, а сразу формирует ответ сам
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert await asyncio.wait_for(follower, 1) == (False, None)
+    assert KEY not in response_cache.flights